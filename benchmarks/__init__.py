@@ -0,0 +1,4 @@
+"""
+性能基准测试
+可离线运行的基准脚本，用于度量识别与翻译热点路径
+"""
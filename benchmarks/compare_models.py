@@ -0,0 +1,158 @@
+"""
+模型变体对比
+在本地样本集上依次测量各模型变体的加载耗时、常驻内存、识别耗时与准确率，
+便于为不同部署选择速度与精度的平衡点。每个变体在独立子进程中测量，互不影响内存读数
+
+样本目录中每张图片（png/jpg）可附带同名 .txt 作为标准文本，每行一个文本行；
+未指定样本目录时使用合成截图。
+
+用法:
+    python -m benchmarks.compare_models
+    python -m benchmarks.compare_models --samples D:/ocr_samples --variants ppocrv3 ppocrv4 --output models.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import cv2
+
+from benchmarks.suite import measure, text_accuracy
+from benchmarks.synthetic import SCENARIOS, scenario
+from src.core.model_registry import load_variants
+from src.utils.logging_config import ROOT_DIR
+from src.utils.metrics import process_rss_bytes
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+MB = 1024 * 1024
+
+
+def load_samples(directory):
+    """读取样本目录
+
+    Returns:
+        [(名称, 图片路径, 标准文本行列表或 None)]
+    """
+    samples = []
+    for file_name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(file_name)
+        if ext.lower() not in IMAGE_EXTENSIONS:
+            continue
+        truth_path = os.path.join(directory, stem + '.txt')
+        lines = None
+        if os.path.isfile(truth_path):
+            with open(truth_path, 'r', encoding='utf-8') as f:
+                lines = [line.strip() for line in f if line.strip()]
+        samples.append((file_name, os.path.join(directory, file_name), lines))
+    return samples
+
+
+def _read_sample(path):
+    if path.startswith('synthetic:'):
+        return scenario(path.split(':', 1)[1]).image
+    return cv2.imread(path)
+
+
+def measure_variant(variant, modelpath, samples, repeat):
+    """在当前进程加载变体并测量，由子进程调用"""
+    from src.core.ocr_processor import OCRProcessor
+
+    rss_before = process_rss_bytes()
+    start = time.perf_counter()
+    processor = OCRProcessor(modelpath, copy_to_clipboard=False, variant=variant)
+    processor._ensure_models()
+    load_ms = (time.perf_counter() - start) * 1000
+    rss_loaded = process_rss_bytes()
+
+    latencies, accuracies, per_sample = [], [], {}
+    for name, path, lines in samples:
+        image = _read_sample(path)
+        samples_ms, result = measure(lambda: processor.recognize(image), repeat)
+        latencies.extend(samples_ms)
+        entry = {'median_ms': round(statistics.median(samples_ms), 2), 'lines': len(result.text)}
+        if lines is not None:
+            entry['accuracy'] = text_accuracy(lines, list(result.text))
+            accuracies.append(entry['accuracy'])
+        per_sample[name] = entry
+
+    return {
+        'description': variant.description,
+        'load_ms': round(load_ms, 1),
+        'engine_memory_mb': round((rss_loaded - rss_before) / MB, 1),
+        'peak_rss_mb': round(process_rss_bytes() / MB, 1),
+        'median_ms': round(statistics.median(latencies), 2) if latencies else None,
+        'p95_ms': round(sorted(latencies)[int(len(latencies) * 0.95)], 2) if latencies else None,
+        'accuracy': round(statistics.fmean(accuracies), 4) if accuracies else None,
+        'samples': per_sample,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", help="样本目录，默认使用合成截图")
+    parser.add_argument("--variants", nargs='*', help="参与对比的变体，默认为全部可用变体")
+    parser.add_argument("--modelpath", help="模型根目录，默认读取配置文件")
+    parser.add_argument("--repeat", type=int, default=3, help="每张样本的计时次数")
+    parser.add_argument("--output", help="结果 JSON 保存路径")
+    args = parser.parse_args()
+
+    import yaml
+    with open(os.path.join(ROOT_DIR, 'config.yml'), 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+    modelpath = (args.modelpath or (config.get('snipaste') or {}).get('modelpath')
+                 or os.path.join(ROOT_DIR, 'models'))
+    variants = load_variants(config.get('models'))
+
+    if args.samples:
+        samples = load_samples(args.samples)
+        if not samples:
+            print(f"error: no images in {args.samples}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        samples = [(name, f'synthetic:{name}', scenario(name).lines) for name in SCENARIOS]
+
+    names = args.variants or list(variants)
+    unknown = [name for name in names if name not in variants]
+    if unknown:
+        print(f"error: unknown variants: {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(1)
+
+    results, skipped = {}, {}
+    for name in names:
+        problems = variants[name].validate(modelpath)
+        if problems:
+            skipped[name] = problems
+            continue
+        print(f"measuring {name} ...", file=sys.stderr)
+        # 每个变体使用新的子进程，内存读数只包含该变体
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            try:
+                results[name] = executor.submit(measure_variant, variants[name], modelpath,
+                                                samples, args.repeat).result()
+            except Exception as e:
+                skipped[name] = [str(e)]
+
+    print(f"{'variant':<16} {'load ms':>9} {'engine MB':>10} {'median ms':>10} {'p95 ms':>9} {'accuracy':>9}")
+    for name, result in results.items():
+        accuracy = f"{result['accuracy']:.4f}" if result['accuracy'] is not None else '-'
+        print(f"{name:<16} {result['load_ms']:>9.1f} {result['engine_memory_mb']:>10.1f} "
+              f"{result['median_ms']:>10.2f} {result['p95_ms']:>9.2f} {accuracy:>9}")
+    for name, problems in skipped.items():
+        print(f"skipped {name}: {problems[0]}" + (f" (+{len(problems) - 1} more)" if len(problems) > 1 else ''))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'modelpath': modelpath,
+                       'samples': [name for name, _, _ in samples], 'results': results,
+                       'skipped': skipped}, f, ensure_ascii=False, indent=2)
+        print(f"results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
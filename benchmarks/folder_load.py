@@ -0,0 +1,204 @@
+"""
+文件夹监控端到端压测
+按设定的速率与突发模式向监控目录写入 Snipaste 命名的截图，经由真实的
+FolderMonitor / OCRThread 流水线与 Qt 信号投递，统计从文件创建到检测结果、
+识别结果送达主线程的延迟分位数与吞吐。使用 Qt offscreen 平台，无需图形界面。
+
+用法:
+    python -m benchmarks.folder_load --count 50 --rate 2
+    python -m benchmarks.folder_load --pattern burst --burst-size 5 --burst-interval 3
+    python -m benchmarks.folder_load --partial-chunks 4 --partial-delay 50
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import cv2
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+
+from benchmarks.synthetic import SCENARIOS, scenario
+from src.core.ocr_thread import OCRThread
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def schedule(args):
+    """生成每个文件相对开始时刻的写入时间（秒）"""
+    rng = random.Random(args.seed)
+    times, now = [], 0.0
+    for index in range(args.count):
+        if args.pattern == 'steady':
+            now = index / args.rate
+        elif args.pattern == 'poisson':
+            now += rng.expovariate(args.rate)
+        else:  # burst: 每组文件同时写入，组间间隔固定
+            now = (index // args.burst_size) * args.burst_interval
+        times.append(now)
+    return times
+
+
+def write_png(path, data, chunks, delay):
+    """写入 PNG，chunks 大于 1 时分块写入以模拟截图工具尚未写完文件"""
+    with open(path, 'wb') as f:
+        if chunks <= 1:
+            f.write(data)
+            return
+        size = -(-len(data) // chunks)
+        for start in range(0, len(data), size):
+            f.write(data[start:start + size])
+            f.flush()
+            time.sleep(delay / 1000)
+
+
+class LoadGenerator:
+    def __init__(self, args, directory):
+        """在后台线程中按计划写入截图，并记录文件创建与结果送达时刻
+
+        Args:
+            args: 命令行参数
+            directory: 被监控目录
+        """
+        self.args = args
+        self.directory = directory
+        self.images = [cv2.imencode('.png', scenario(args.scenario, seed).image)[1].tobytes()
+                       for seed in range(args.variants)]
+        self.created = {}
+        self.detected = {}
+        self.completed = {}
+        self.errors = []
+        self.done_writing = threading.Event()
+        self._lock = threading.Lock()
+
+    def run(self):
+        start = time.perf_counter()
+        stamp = time.strftime('%Y-%m-%d_%H-%M-%S')
+        for index, offset in enumerate(schedule(self.args)):
+            delay = start + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            path = os.path.join(self.directory, f'Snipaste_{stamp}_{index:05d}.png')
+            with self._lock:
+                self.created[self._key(path)] = time.perf_counter()
+            write_png(path, self.images[index % len(self.images)],
+                      self.args.partial_chunks, self.args.partial_delay)
+        self.done_writing.set()
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.normpath(path))
+
+    def on_detection(self, image_path, boxes):
+        self.detected.setdefault(self._key(image_path), time.perf_counter())
+
+    def on_result(self, image_path, result):
+        self.completed.setdefault(self._key(image_path), time.perf_counter())
+
+    def on_error(self, message):
+        self.errors.append(message)
+
+    def finished(self):
+        with self._lock:
+            return self.done_writing.is_set() and len(self.completed) >= len(self.created)
+
+    def report(self):
+        with self._lock:
+            created = dict(self.created)
+        detect_latencies = [(self.detected[path] - t) * 1000 for path, t in created.items() if path in self.detected]
+        result_latencies = [(self.completed[path] - t) * 1000 for path, t in created.items() if path in self.completed]
+        span = (max(self.completed.values()) - min(created.values())) if self.completed else 0.0
+        return {
+            'pattern': self.args.pattern,
+            'scenario': self.args.scenario,
+            'sent': len(created),
+            'completed': len(result_latencies),
+            'lost': len(created) - len(result_latencies),
+            'throughput_per_s': len(result_latencies) / span if span else 0.0,
+            'detection_ms': {f'p{q}': percentile(detect_latencies, q) for q in (50, 95, 99)},
+            'result_ms': {f'p{q}': percentile(result_latencies, q) for q in (50, 95, 99)},
+            'result_max_ms': max(result_latencies, default=0.0),
+            'errors': self.errors,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20, help="写入的截图数量")
+    parser.add_argument("--pattern", choices=('steady', 'poisson', 'burst'), default='steady', help="写入节奏")
+    parser.add_argument("--rate", type=float, default=1.0, help="steady/poisson 模式下每秒写入数量")
+    parser.add_argument("--burst-size", type=int, default=5, help="burst 模式下每组文件数")
+    parser.add_argument("--burst-interval", type=float, default=5.0, help="burst 模式下组间隔（秒）")
+    parser.add_argument("--partial-chunks", type=int, default=1, help="分块写入的块数，大于 1 时模拟未写完的文件")
+    parser.add_argument("--partial-delay", type=float, default=20, help="分块之间的间隔（毫秒）")
+    parser.add_argument("--scenario", choices=tuple(SCENARIOS), default='medium', help="合成截图场景")
+    parser.add_argument("--variants", type=int, default=4, help="轮流使用的不同截图数量")
+    parser.add_argument("--timeout", type=float, default=30, help="写入结束后等待结果的最长时间（秒）")
+    parser.add_argument("--modelpath", default=os.path.join(ROOT, 'models'), help="OCR 模型目录")
+    parser.add_argument("--seed", type=int, default=0, help="poisson 模式的随机种子")
+    parser.add_argument("--output", help="结果 JSON 保存路径")
+    args = parser.parse_args()
+
+    app = QApplication([])
+    with tempfile.TemporaryDirectory() as directory:
+        generator = LoadGenerator(args, directory)
+        thread = OCRThread(path=directory, modelpath=args.modelpath)
+        thread.detection_signal.connect(generator.on_detection)
+        thread.preview_signal.connect(generator.on_result)
+        thread.error_signal.connect(generator.on_error)
+        thread.error_signal.connect(lambda message: app.quit())
+        thread.start()
+        thread.wait()  # FolderMonitor 在 run 中创建并开始监控
+
+        writer = threading.Thread(target=generator.run, daemon=True)
+        deadline = []
+
+        def poll():
+            if generator.finished():
+                app.quit()
+            elif generator.done_writing.is_set():
+                if not deadline:
+                    deadline.append(time.perf_counter() + args.timeout)
+                elif time.perf_counter() > deadline[0]:
+                    app.quit()
+
+        timer = QTimer()
+        timer.timeout.connect(poll)
+        timer.start(50)
+        if not generator.errors:
+            writer.start()
+            app.exec()
+        timer.stop()
+        thread.stop()
+
+        report = generator.report()
+    print(f"sent {report['sent']}, completed {report['completed']}, lost {report['lost']}, "
+          f"throughput {report['throughput_per_s']:.2f}/s")
+    print(f"{'':<10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name in ('detection', 'result'):
+        latencies = report[f'{name}_ms']
+        print(f"{name:<10} {latencies['p50']:>9.1f} {latencies['p95']:>9.1f} {latencies['p99']:>9.1f}")
+    for message in report['errors']:
+        print(f"error: {message}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+热点路径基准套件
+在合成截图上度量 OCRProcessor.process_image、合批识别、_parse_result、段落合并，
+以及本地 TMT 替身服务上的翻译耗时。无需网络与图形界面，结果保存为 JSON，
+指定基线时任一用例中位耗时回退超过阈值即以非零状态码退出。
+
+用法:
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --baseline bench.json --threshold 0.2
+"""
+
+import argparse
+import difflib
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import cv2
+
+from benchmarks.synthetic import SCENARIOS, scenario
+from src.core.ocr_processor import OCRProcessor
+from src.utils.paragraph_merger import build_paragraphs
+from src.utils.tmt_standin import StandinServer
+from src.utils.translator import StandinTranslator
+from src.utils.translation_scheduler import TranslationScheduler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(func, repeat, warmup=1):
+    """重复执行 func，返回每次耗时（毫秒）与最后一次的返回值"""
+    result = None
+    for _ in range(warmup):
+        result = func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, result
+
+
+def summarize(samples, **extra):
+    summary = {
+        'runs': len(samples),
+        'median_ms': round(statistics.median(samples), 4),
+        'min_ms': round(min(samples), 4),
+        'mean_ms': round(statistics.fmean(samples), 4),
+    }
+    summary.update(extra)
+    return summary
+
+
+def text_accuracy(expected, recognized):
+    """识别文本与已知文本的相似度"""
+    return round(difflib.SequenceMatcher(None, ' '.join(expected), ' '.join(recognized)).ratio(), 4)
+
+
+def bench_ocr(args, results, skipped):
+    try:
+        processor = OCRProcessor(args.modelpath, copy_to_clipboard=False)
+    except FileNotFoundError as e:
+        skipped['ocr'] = str(e)
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        for name in SCENARIOS:
+            case = f'ocr/{name}'
+            if not args.only.search(case):
+                continue
+            shot = scenario(name)
+            path = os.path.join(directory, f'Snipaste_bench_{name}.png').replace('\\', '/')
+            cv2.imwrite(path, shot.image)
+            samples, result = measure(lambda: processor.process_image(path), args.repeat)
+            results[case] = summarize(samples, lines=len(shot.lines),
+                                      accuracy=text_accuracy(shot.lines, list(result.text)))
+
+    # 同一组小截图逐张识别与合批识别的对比
+    images = [scenario(name).image for name in ('small', 'medium') for _ in range(4)]
+    for case, func in (('ocr_batch/sequential', lambda: [processor.recognize(image) for image in images]),
+                       ('ocr_batch/batched', lambda: processor.recognize_batch(images))):
+        if args.only.search(case):
+            samples, _ = measure(func, args.repeat)
+            results[case] = summarize(samples, images=len(images))
+
+
+def bench_layout(args, results):
+    parser = OCRProcessor.__new__(OCRProcessor)  # _parse_result 不依赖模型，无需加载
+    for name in SCENARIOS:
+        shot = scenario(name)
+        fake_result = SimpleNamespace(boxes=shot.boxes, text=shot.lines)
+        for case, func in ((f'parse_result/{name}', lambda: parser._parse_result(fake_result)),
+                           (f'paragraphs/{name}', lambda: build_paragraphs(shot.boxes, shot.lines))):
+            if args.only.search(case):
+                samples, _ = measure(func, args.repeat * 10)
+                results[case] = summarize(samples, lines=len(shot.lines))
+
+
+def bench_translation(args, results):
+    lines = scenario('dense').lines
+    with StandinServer(latency_ms=args.latency, seed=0) as server:
+        def translator():
+            return StandinTranslator('bench-id', 'bench-key', host=server.host, port=server.port)
+
+        cases = {
+            'translate/per-line': lambda t: [t.translate(line) for line in lines[:20]],
+            'translate/batch': lambda t: t.translate_batch(lines),
+            'translate/scheduler': lambda t: TranslationScheduler(t, qps=100, concurrency=4).translate_batch(lines),
+        }
+        for case, func in cases.items():
+            if not args.only.search(case):
+                continue
+            backend = translator()
+            samples, _ = measure(lambda: func(backend), args.repeat)
+            backend.close()
+            results[case] = summarize(samples, lines=20 if case.endswith('per-line') else len(lines))
+
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """与基线对比，返回 [(用例, 基线中位数, 当前中位数)] 形式的回退列表"""
+    regressions = []
+    for case, current in results.items():
+        previous = baseline.get('results', {}).get(case)
+        if previous is None:
+            continue
+        old, new = previous['median_ms'], current['median_ms']
+        change = (new - old) / old if old else 0.0
+        marker = ''
+        if new > old * (1 + threshold) and new - old > min_delta_ms:
+            regressions.append((case, old, new))
+            marker = '  REGRESSION'
+        print(f"  {case:<28} {old:>10.3f} -> {new:>10.3f} ms ({change:+.1%}){marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="结果 JSON 保存路径")
+    parser.add_argument("--baseline", help="用于对比的历史结果 JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="允许的中位耗时增幅，默认 20%%")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="小于该绝对增量的变化不视为回退")
+    parser.add_argument("--repeat", type=int, default=5, help="每个用例的计时次数")
+    parser.add_argument("--latency", type=float, default=5, help="替身服务基础延迟（毫秒）")
+    parser.add_argument("--modelpath", default=os.path.join(ROOT, 'models'), help="OCR 模型目录")
+    parser.add_argument("--only", default='', help="只运行名称匹配该正则的用例")
+    args = parser.parse_args()
+    args.only = re.compile(args.only)
+
+    results, skipped = {}, {}
+    bench_ocr(args, results, skipped)
+    bench_layout(args, results)
+    bench_translation(args, results)
+
+    print(f"{'case':<28} {'median ms':>10} {'min ms':>10}")
+    for case, summary in results.items():
+        print(f"{case:<28} {summary['median_ms']:>10.3f} {summary['min_ms']:>10.3f}")
+    for group, reason in skipped.items():
+        print(f"skipped {group}: {reason}")
+
+    report = {
+        'commit': current_commit(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+        'skipped': skipped,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"comparing with {args.baseline} ({baseline.get('commit')}):")
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+合成截图生成
+按指定尺寸、行数与分栏绘制已知文本，并给出每行对应的文本框
+"""
+
+import random
+
+import cv2
+import numpy as np
+
+WORDS = ("screen", "capture", "text", "recognition", "preview", "window", "model",
+         "latency", "benchmark", "layout", "paragraph", "translate", "result",
+         "detect", "classify", "offline", "python", "quick", "brown", "fox")
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+FONT_SCALE = 0.7
+THICKNESS = 2
+LINE_SPACING = 1.8  # 行距与字高之比
+MARGIN = 24
+COLUMN_GAP = 48
+
+# 基准场景：名称 -> (宽, 高, 行数, 栏数)
+SCENARIOS = {
+    'small': (640, 160, 3, 1),
+    'medium': (1280, 720, 18, 1),
+    'large': (1920, 1080, 24, 1),
+    'two-column': (1920, 1080, 48, 2),
+    'dense': (2560, 1440, 60, 2),
+}
+
+
+class SyntheticScreenshot:
+    def __init__(self, image, lines, boxes):
+        """合成截图
+
+        Args:
+            image: BGR 图像
+            lines: 每行文本，按栏内从上到下、栏间从左到右排列
+            boxes: 与 lines 对应的 [x1, y1, x2, y2, x3, y3, x4, y4] 文本框
+        """
+        self.image = image
+        self.lines = lines
+        self.boxes = boxes
+
+
+def random_line(rng, max_width):
+    """生成宽度不超过 max_width 像素的随机英文文本行"""
+    words = []
+    while True:
+        candidate = ' '.join(words + [rng.choice(WORDS)])
+        (width, _), _ = cv2.getTextSize(candidate, FONT, FONT_SCALE, THICKNESS)
+        if width > max_width and words:
+            return ' '.join(words)
+        words = candidate.split(' ')
+        if len(words) >= 12:
+            return candidate
+
+
+def make_screenshot(width, height, line_count, columns=1, seed=0):
+    """绘制白底黑字的合成截图，行数超出版面时截断
+
+    Args:
+        width: 图片宽度
+        height: 图片高度
+        line_count: 文本行数
+        columns: 分栏数
+        seed: 随机种子，相同参数生成相同图片
+
+    Returns:
+        SyntheticScreenshot
+    """
+    rng = random.Random(seed)
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    (_, text_height), baseline = cv2.getTextSize('Ag', FONT, FONT_SCALE, THICKNESS)
+    line_height = int((text_height + baseline) * LINE_SPACING)
+    column_width = (width - MARGIN * 2 - COLUMN_GAP * (columns - 1)) // columns
+    rows = max(1, (height - MARGIN * 2) // line_height)
+    per_column = min(rows, -(-line_count // columns))
+
+    lines, boxes = [], []
+    for index in range(line_count):
+        column, row = divmod(index, per_column)
+        if column >= columns:
+            break
+        x = MARGIN + column * (column_width + COLUMN_GAP)
+        y = MARGIN + row * line_height + text_height
+        text = random_line(rng, column_width)
+        (text_width, _), _ = cv2.getTextSize(text, FONT, FONT_SCALE, THICKNESS)
+        cv2.putText(image, text, (x, y), FONT, FONT_SCALE, (0, 0, 0), THICKNESS, cv2.LINE_AA)
+        top, bottom = y - text_height - 2, y + baseline + 2
+        lines.append(text)
+        boxes.append([x, top, x + text_width, top, x + text_width, bottom, x, bottom])
+    return SyntheticScreenshot(image, lines, boxes)
+
+
+def scenario(name, seed=0):
+    """按 SCENARIOS 中的名称生成合成截图"""
+    width, height, line_count, columns = SCENARIOS[name]
+    return make_screenshot(width, height, line_count, columns, seed)
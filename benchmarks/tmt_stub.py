@@ -0,0 +1,53 @@
+"""
+腾讯云 TMT 接口本地 HTTPS 桩服务
+在 TMT 替身服务外包一层自签名证书 TLS，用于离线度量 TLS 握手与连接开销
+"""
+
+import os
+import ssl
+import subprocess
+import tempfile
+
+from src.utils.tmt_standin import StandinServer
+
+
+def generate_self_signed_cert(directory):
+    """调用 openssl 生成 localhost 自签名证书
+
+    Args:
+        directory: 证书输出目录
+
+    Returns:
+        (证书路径, 私钥路径)
+    """
+    cert_file = os.path.join(directory, "stub_cert.pem")
+    key_file = os.path.join(directory, "stub_key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+         "-keyout", key_file, "-out", cert_file, "-days", "1",
+         "-subj", "/CN=localhost"],
+        check=True, capture_output=True)
+    return cert_file, key_file
+
+
+class TMTStubServer(StandinServer):
+    """以 HTTPS 方式运行的 TMT 替身服务"""
+
+    def __init__(self, host="127.0.0.1", port=0, **kwargs):
+        self._tempdir = tempfile.TemporaryDirectory()
+        cert_file, key_file = generate_self_signed_cert(self._tempdir.name)
+
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_file, key_file)
+        super().__init__(host, port, ssl_context=context, **kwargs)
+
+    def client_context(self):
+        """信任自签名证书的客户端 SSL 上下文"""
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return context
+
+    def stop(self):
+        super().stop()
+        self._tempdir.cleanup()
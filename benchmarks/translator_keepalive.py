@@ -0,0 +1,52 @@
+"""
+翻译连接复用基准
+对比每次新建 HTTPS 连接与连接池长连接两种方式下的单行翻译耗时
+
+用法:
+    python -m benchmarks.translator_keepalive --requests 200
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks.tmt_stub import TMTStubServer
+from src.utils.translator import TencentTranslator
+
+
+def run(translator, count):
+    """顺序翻译 count 行，返回每次请求耗时（毫秒）"""
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        translator.translate(f"line {i}", source_lang='en', target_lang='zh')
+        latencies.append((time.perf_counter() - start) * 1000)
+    translator.close()
+    return latencies
+
+
+def report(name, latencies):
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{name:<12} total={sum(latencies):8.1f}ms  "
+          f"mean={statistics.mean(latencies):6.2f}ms  "
+          f"p50={statistics.median(latencies):6.2f}ms  p95={p95:6.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="每种模式的请求数")
+    args = parser.parse_args()
+
+    with TMTStubServer() as server:
+        for name, pool_size in (("new-conn", 0), ("keep-alive", 4)):
+            translator = TencentTranslator("stub-id", "stub-key",
+                                           host=server.host, port=server.port,
+                                           ssl_context=server.client_context(),
+                                           pool_size=pool_size)
+            report(name, run(translator, args.requests))
+
+
+if __name__ == "__main__":
+    main()
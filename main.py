@@ -6,10 +6,13 @@
 """
 
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
 from src.ui.main_window import MainWindow
 
 def main():
+    # 打包后的程序以 spawn 方式启动 OCR 工作进程时需要
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     mainWindow = MainWindow()
     mainWindow.show()
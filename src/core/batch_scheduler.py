@@ -0,0 +1,128 @@
+"""
+OCR 微批调度模块
+在引擎前收集短时间内到达的识别请求，凑满一批或等待超时后一次推理，
+再将各自的结果交回调用方的 Future
+"""
+
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+
+from src.utils.metrics import BATCH_SIZE, FAILURES
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+# 调度预设：latency 不等待凑批，throughput 以少量延迟换取更大的批
+PRESETS = {
+    'latency': {'max_batch': 1, 'max_wait_ms': 0},
+    'balanced': {'max_batch': 8, 'max_wait_ms': 5},
+    'throughput': {'max_batch': 16, 'max_wait_ms': 20},
+}
+
+
+class BatchScheduler:
+    def __init__(self, get_processor, max_batch=8, max_wait_ms=5, rec_batch_size=32):
+        """初始化微批调度器
+
+        Args:
+            get_processor: 返回当前常驻 OCRProcessor 的函数，引擎未就绪时返回 None
+            max_batch: 每批最多合并的请求数
+            max_wait_ms: 收到第一个请求后最多等待凑批的毫秒数，为 0 时只合并已在排队的请求
+            rec_batch_size: 识别阶段每批文本行数量，各请求的文本行汇集后再分批
+        """
+        self.get_processor = get_processor
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, max_wait_ms / 1000)
+        self.rec_batch_size = rec_batch_size
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='ocr-batch', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, get_processor, config):
+        """按配置创建调度器，preset 给出默认值，单独配置的参数优先"""
+        options = dict(PRESETS.get(config.get('preset', 'balanced'), PRESETS['balanced']))
+        for key in ('max_batch', 'max_wait_ms', 'rec_batch_size'):
+            if config.get(key) is not None:
+                options[key] = config[key]
+        return cls(get_processor, **options)
+
+    def submit(self, image, trace=None):
+        """提交一张 BGR 图像
+
+        Returns:
+            concurrent.futures.Future，结果为 OCRResult
+        """
+        future = Future()
+        self._queue.put((image, trace, future))
+        return future
+
+    def recognize(self, image, trace=None):
+        """同步识别，在调用线程等待所在批次完成"""
+        return self.submit(image, trace).result()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _collect(self, first):
+        """以 first 开头收集一批请求
+
+        Returns:
+            (请求列表, 是否收到了停止信号)
+        """
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch, stopping = self._collect(item)
+            self._dispatch([request for request in batch if request[2].set_running_or_notify_cancel()])
+
+    def _dispatch(self, batch):
+        if not batch:
+            return
+        images, traces, futures = zip(*batch)
+        processor = self.get_processor()
+        if processor is None:
+            for future in futures:
+                future.set_exception(RuntimeError("OCR engine is not ready"))
+            return
+
+        BATCH_SIZE.observe(len(batch))
+        try:
+            results = processor.recognize_batch(list(images), list(traces), self.rec_batch_size)
+        except Exception as e:
+            FAILURES.inc(component='batch')
+            if len(batch) == 1:
+                logger.error("OCR request failed: %s", e)
+                futures[0].set_exception(e)
+                return
+            # 逐张重试，单个异常请求不影响同批的其他请求
+            logger.warning("Batch of %d OCR requests failed, retrying one at a time: %s", len(batch), e)
+            for image, trace, future in batch:
+                try:
+                    future.set_result(processor.recognize(image, trace=trace))
+                except Exception as error:
+                    logger.error("OCR request failed: %s", error)
+                    future.set_exception(error)
+            return
+        for future, result in zip(futures, results):
+            future.set_result(result)
@@ -0,0 +1,165 @@
+"""
+剪贴板图片来源
+将剪贴板中的图片直接转换为数组交给 OCR 引擎，不编码、不写文件，
+结果通过与文件夹监控相同的信号交给界面
+"""
+
+import os
+import sys
+import logging
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from src.utils.latency_trace import latency_recorder
+from src.utils.profiler import profiler
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+# 剪贴板图片的标识前缀，用于代替图片路径
+KEY_PREFIX = 'clipboard:'
+# Snipaste 放入剪贴板的截图同时保存到监控文件夹，由文件夹监控识别
+SNIPASTE_PROCESSES = ('snipaste.exe',)
+
+
+def clipboard_owner_process():
+    """返回剪贴板所有者进程的可执行文件名（小写），仅 Windows 可用，其他平台或无法获取时返回 None"""
+    if sys.platform != 'win32':
+        return None
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    kernel32 = ctypes.windll.kernel32
+    user32.GetClipboardOwner.restype = wintypes.HWND
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+    hwnd = user32.GetClipboardOwner()
+    if not hwnd:
+        return None
+    pid = wintypes.DWORD()
+    user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+    handle = kernel32.OpenProcess(0x1000, False, pid.value)  # PROCESS_QUERY_LIMITED_INFORMATION
+    if not handle:
+        return None
+    try:
+        size = wintypes.DWORD(1024)
+        buffer = ctypes.create_unicode_buffer(size.value)
+        if not kernel32.QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+            return None
+        return os.path.basename(buffer.value).lower()
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def qimage_to_array(image):
+    """将 QImage 转为 BGR 数组
+
+    Args:
+        image: QImage
+
+    Returns:
+        独立于 QImage 内存的 uint8 BGR 数组
+    """
+    image = image.convertToFormat(QImage.Format.Format_BGR888)
+    width, height = image.width(), image.height()
+    buffer = image.constBits()
+    buffer.setsize(image.sizeInBytes())
+    # 每行末尾可能有对齐填充，按 bytesPerLine 取行后截去
+    rows = np.frombuffer(buffer, dtype=np.uint8).reshape(height, image.bytesPerLine())
+    return rows[:, :width * 3].reshape(height, width, 3).copy()
+
+
+class ClipboardSource(QObject):
+    result_signal = pyqtSignal(str, object)  # 图片标识和OCR结果
+    boxes_signal = pyqtSignal(str, object)  # 检测完成信号：图片标识和文本框列表
+    lines_signal = pyqtSignal(str, int, object)  # 识别进度信号：图片标识、起始下标和该批文本
+    error_signal = pyqtSignal(str, str)  # 图片标识和错误信息
+
+    def __init__(self, get_processor, parent=None):
+        """初始化剪贴板图片来源
+
+        Args:
+            get_processor: 返回当前常驻 OCRProcessor 的函数，引擎未就绪时返回 None
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.get_processor = get_processor
+        self._ids = itertools.count(1)
+        # 单个工作线程，剪贴板图片按到达顺序识别
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='clipboard-ocr')
+
+    def next_key(self):
+        return f"{KEY_PREFIX}{next(self._ids)}"
+
+    def submit(self, image, key=None):
+        """提交一张图片识别
+
+        Args:
+            image: BGR / BGRA / 灰度数组或编码后的字节
+            key: 图片标识，默认新分配；已通过 latency_recorder.start(key) 开始追踪时沿用该追踪
+
+        Returns:
+            该图片的标识，结果信号以此代替图片路径
+        """
+        key = key or self.next_key()
+        trace = latency_recorder.get(key) or latency_recorder.start(key)
+        trace.mark('ready')
+        self._executor.submit(self._process, key, image, trace)
+        return key
+
+    def capture(self, clipboard, skip_snipaste=False):
+        """识别剪贴板中的图片，须在界面线程调用
+
+        Args:
+            clipboard: QClipboard
+            skip_snipaste: 是否跳过 Snipaste 自身放入剪贴板的截图，这些截图已由文件夹监控识别
+
+        Returns:
+            图片标识与 BGR 数组，剪贴板中没有图片或被跳过时返回 (None, None)
+        """
+        mime = clipboard.mimeData()
+        if mime is None or not mime.hasImage():
+            return None, None
+        if skip_snipaste and clipboard_owner_process() in SNIPASTE_PROCESSES:
+            logger.debug("Skipped clipboard image placed by Snipaste")
+            return None, None
+        key = self.next_key()
+        latency_recorder.start(key)
+        qimage = clipboard.image()
+        if qimage.isNull():
+            latency_recorder.discard(key)
+            return None, None
+        image = qimage_to_array(qimage)
+        return self.submit(image, key), image
+
+    def _process(self, key, image, trace):
+        processor = self.get_processor()
+        if processor is None:
+            latency_recorder.discard(key)
+            self.error_signal.emit(key, "OCR服务尚未启动，无法识别剪贴板图片")
+            return
+        logger.info("Processing clipboard image %s (%dx%d)", key, image.shape[1], image.shape[0])
+        try:
+            with profiler.capture():
+                # 结果不写回剪贴板，以免覆盖用户刚复制的图片
+                result = processor.process_array(
+                    image,
+                    on_boxes=lambda boxes: self.boxes_signal.emit(key, boxes),
+                    on_lines=lambda start, texts: self.lines_signal.emit(key, start, texts),
+                    trace=trace,
+                    copy_to_clipboard=False
+                )
+            self.result_signal.emit(key, result)
+        except Exception as e:
+            latency_recorder.discard(key)
+            logger.error("Error processing clipboard image %s: %s", key, e)
+            self.error_signal.emit(key, f"剪贴板图片识别失败: {str(e)}")
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
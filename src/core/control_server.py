@@ -0,0 +1,144 @@
+"""
+本地控制通道
+通过 QLocalServer（Windows 命名管道 / Unix 域套接字）接收运行中实例的控制命令，
+每行一个 JSON 请求 {"command": ..., "args": {...}}，返回一行 JSON 响应
+
+用法:
+    python -m src.core.control_server profile start --mode sampling --seconds 30
+    python -m src.core.control_server profile start --mode cprofile --captures 5
+    python -m src.core.control_server profile stop
+"""
+
+import sys
+import json
+import logging
+import argparse
+from PyQt6.QtCore import QObject
+from PyQt6.QtNetwork import QAbstractSocket, QLocalServer, QLocalSocket
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+SERVER_NAME = 'SnipasteOCR-control'
+
+
+class ControlServer(QObject):
+    def __init__(self, parent=None, name=SERVER_NAME):
+        """初始化控制服务
+
+        Args:
+            parent: 父对象
+            name: 本地套接字名称
+        """
+        super().__init__(parent)
+        self.name = name
+        self.handlers = {}
+        self.server = QLocalServer(self)
+        # 只允许当前用户连接，其他本机用户不能控制本实例
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._on_connection)
+
+    def register(self, command, handler):
+        """注册命令处理函数，处理函数以请求中的 args 为关键字参数，返回值需可序列化为 JSON"""
+        self.handlers[command] = handler
+
+    def start(self):
+        # 限制访问权限时 Qt 会把新套接字改名覆盖到同名路径上，需先确认没有其他实例在监听
+        if self._server_alive():
+            logger.warning("Control server %s is already used by another instance", self.name)
+            return False
+        listening = self.server.listen(self.name)
+        if not listening and self.server.serverError() == QAbstractSocket.SocketError.AddressInUseError:
+            # 无法连接说明是上次异常退出遗留的套接字文件，清理后重试
+            QLocalServer.removeServer(self.name)
+            listening = self.server.listen(self.name)
+        if not listening:
+            logger.error("Failed to start control server %s: %s", self.name, self.server.errorString())
+            return False
+        logger.info("Control server listening on %s", self.server.fullServerName())
+        return True
+
+    def stop(self):
+        self.server.close()
+
+    def _server_alive(self, timeout_ms=500):
+        """同名套接字上是否有正在监听的实例"""
+        socket = QLocalSocket()
+        socket.connectToServer(self.name)
+        alive = socket.waitForConnected(timeout_ms)
+        socket.abort()
+        return alive
+
+    def _on_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self._on_ready_read(socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def _on_ready_read(self, socket):
+        while socket.canReadLine():
+            line = bytes(socket.readLine()).decode('utf-8').strip()
+            if line:
+                socket.write((json.dumps(self._dispatch(line), ensure_ascii=False) + '\n').encode('utf-8'))
+        socket.flush()
+
+    def _dispatch(self, line):
+        try:
+            request = json.loads(line)
+            handler = self.handlers.get(request.get('command'))
+            if handler is None:
+                return {'ok': False, 'error': f"Unknown command: {request.get('command')}"}
+            return {'ok': True, 'result': handler(**(request.get('args') or {}))}
+        except Exception as e:
+            logger.error("Control command failed: %s", e)
+            return {'ok': False, 'error': str(e)}
+
+
+def send_command(command, name=SERVER_NAME, timeout_ms=5000, **args):
+    """向运行中的实例发送命令并等待响应
+
+    Returns:
+        响应中的 result 字段
+
+    Raises:
+        ConnectionError: 无法连接到运行中的实例
+        RuntimeError: 命令执行失败
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(name)
+    if not socket.waitForConnected(timeout_ms):
+        raise ConnectionError(f"Cannot connect to {name}: {socket.errorString()}")
+    socket.write((json.dumps({'command': command, 'args': args}) + '\n').encode('utf-8'))
+    socket.waitForBytesWritten(timeout_ms)
+    while not socket.canReadLine():
+        if not socket.waitForReadyRead(timeout_ms):
+            raise ConnectionError(f"No response from {name}")
+    response = json.loads(bytes(socket.readLine()).decode('utf-8'))
+    socket.disconnectFromServer()
+    if not response.get('ok'):
+        raise RuntimeError(response.get('error'))
+    return response.get('result')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    profile = subparsers.add_parser('profile', help='启停性能分析')
+    profile.add_argument('action', choices=('start', 'stop', 'status'))
+    profile.add_argument('--mode', choices=('sampling', 'cprofile'), default='sampling')
+    profile.add_argument('--seconds', type=float, help='分析持续秒数')
+    profile.add_argument('--captures', type=int, help='分析的截图次数')
+    args = parser.parse_args()
+
+    try:
+        result = send_command('profile', action=args.action, mode=args.mode,
+                              seconds=args.seconds, captures=args.captures)
+    except (ConnectionError, RuntimeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
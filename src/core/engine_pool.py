@@ -0,0 +1,519 @@
+"""
+多进程 OCR 引擎池
+在独立的工作进程中加载并运行 OCR 模型，解码后的图像经共享内存环形缓冲区传递，
+不经 pickle 序列化。定期检查工作进程，崩溃或卡住时结束并重启，不影响界面进程
+"""
+
+import os
+import time
+import logging
+import itertools
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+
+import numpy as np
+import fastdeploy as fd
+
+from src.utils.metrics import ENGINES, ENGINES_BUSY, WORKER_RESTARTS, process_rss_bytes
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+# 等待工作进程加载模型的最长时间（秒）
+STARTUP_TIMEOUT = 120
+# 连续多少次未就绪即退出后不再重启，通常为模型文件损坏或缺失
+MAX_STARTUP_FAILURES = 3
+
+
+class EngineWorkerError(RuntimeError):
+    """工作进程在处理请求期间崩溃、超时或被重启"""
+
+
+def result_to_dict(result):
+    """OCRResult 无法 pickle，跨进程时转为基本类型"""
+    return {
+        'boxes': [list(box) for box in result.boxes],
+        'text': list(result.text),
+        'rec_scores': list(result.rec_scores),
+        'cls_labels': list(result.cls_labels),
+        'cls_scores': list(result.cls_scores),
+    }
+
+
+def result_from_dict(data):
+    result = fd.C.vision.OCRResult()
+    for key, value in data.items():
+        setattr(result, key, value)
+    return result
+
+
+class SharedRing:
+    def __init__(self, slots, slot_bytes):
+        """共享内存环形缓冲区，按槽位轮流分配
+
+        Args:
+            slots: 槽位数量
+            slot_bytes: 每个槽位的字节数
+        """
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        self._free = deque(range(slots))
+        self._available = threading.Semaphore(slots)
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def acquire(self, timeout=None):
+        """取出一个空闲槽位，超时返回 None"""
+        if not self._available.acquire(timeout=timeout):
+            return None
+        with self._lock:
+            return self._free.popleft()
+
+    def release(self, slot):
+        with self._lock:
+            self._free.append(slot)
+        self._available.release()
+
+    def write(self, slot, image):
+        view = np.ndarray(image.shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+        view[:] = image
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _worker_main(modelpath, variant, cpu_threads, ring_name, slot_bytes, connection):
+    """工作进程入口，加载模型后循环处理请求直到收到 stop 或连接断开"""
+    # 子进程中才导入，避免与 ocr_processor 循环导入
+    from src.core.ocr_processor import OCRProcessor
+
+    ring = shared_memory.SharedMemory(name=ring_name)
+    processor = OCRProcessor(modelpath, copy_to_clipboard=False, cpu_threads=cpu_threads, variant=variant)
+    processor._ensure_models()
+    connection.send(('ready', os.getpid(), process_rss_bytes()))
+
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, OSError):
+            break
+        if message[0] == 'stop':
+            break
+        if message[0] == 'ping':
+            # 顺带报告本进程常驻内存，供界面进程的内存管控统计
+            connection.send(('pong', process_rss_bytes()))
+            continue
+
+        _, request_id, slot, shm_name, shape = message
+        shm = None
+        image = None
+        try:
+            if shm_name is None:
+                image = np.ndarray(shape, dtype=np.uint8, buffer=ring.buf, offset=slot * slot_bytes)
+            else:
+                shm = shared_memory.SharedMemory(name=shm_name)
+                image = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+            trace = _RemoteTrace(connection, request_id)
+            result = processor.recognize(
+                image,
+                on_boxes=lambda boxes: connection.send(('boxes', request_id, boxes)),
+                on_lines=lambda start, texts: connection.send(('lines', request_id, start, list(texts))),
+                trace=trace
+            )
+            connection.send(('done', request_id, result_to_dict(result)))
+        except Exception as e:
+            connection.send(('error', request_id, str(e)))
+        finally:
+            image = None
+            if shm is not None:
+                shm.close()
+    image = None
+    ring.close()
+
+
+class _RemoteTrace:
+    """工作进程中的计时回调，阶段完成时通知主进程记录"""
+
+    def __init__(self, connection, request_id):
+        self.connection = connection
+        self.request_id = request_id
+
+    def mark(self, stage):
+        self.connection.send(('mark', self.request_id, stage))
+
+
+class _Request:
+    def __init__(self, future, on_boxes, on_lines, trace, slot, shm):
+        self.future = future
+        self.on_boxes = on_boxes
+        self.on_lines = on_lines
+        self.trace = trace
+        self.slot = slot
+        self.shm = shm  # 超出槽位大小时单独创建的共享内存
+        self.started = time.monotonic()
+
+
+class _Worker:
+    def __init__(self, index, process, connection):
+        self.index = index
+        self.process = process
+        self.connection = connection
+        self.pending = {}
+        self.ready = False
+        self.draining = False  # 滚动重启时不再分配新请求，处理完已有请求后退出
+        self.retired = False
+        self.replaces = None  # 滚动重启时被替换的旧进程，本进程就绪后旧进程才开始退出
+        self.rss = 0  # 最近一次报告的常驻内存
+        self.ping_sent = None
+        self.send_lock = threading.Lock()
+
+    def send(self, message):
+        with self.send_lock:
+            self.connection.send(message)
+
+
+class EnginePool:
+    def __init__(self, modelpath, workers=2, slot_mb=12, slots=None,
+                 request_timeout_s=30, health_interval_s=2, variant=None):
+        """初始化多进程引擎池
+
+        Args:
+            modelpath: 模型文件路径
+            workers: 工作进程数量
+            slot_mb: 环形缓冲区每个槽位的大小，更大的图像单独创建共享内存
+            slots: 槽位数量，默认为每个工作进程 2 个
+            request_timeout_s: 单个请求的最长处理时间，超时视为工作进程卡住
+            health_interval_s: 健康检查间隔
+            variant: 工作进程加载的 ModelVariant，默认为内置默认变体
+        """
+        self.modelpath = modelpath
+        self.variant = variant
+        self.workers_count = max(1, int(workers))
+        self.ring = SharedRing(slots or self.workers_count * 2, int(slot_mb * MB))
+        # 各工作进程平分 CPU 核心，避免推理线程数超过核心数
+        self.cpu_threads = max(1, (os.cpu_count() or 1) // self.workers_count)
+        self.request_timeout = request_timeout_s
+        self.health_interval = health_interval_s
+        self.workers = []
+        self.restarts = 0
+        self._startup_failures = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._stopping = threading.Event()
+        # spawn 启动的子进程不继承界面进程的 Qt 状态与线程
+        self._context = multiprocessing.get_context('spawn')
+        self._monitor = None
+
+    def start(self):
+        with self._lock:
+            for index in range(self.workers_count):
+                self.workers.append(self._spawn(index))
+        self._monitor = threading.Thread(target=self._monitor_loop, name='engine-pool-monitor', daemon=True)
+        self._monitor.start()
+        logger.info("Started %d OCR engine worker processes", self.workers_count)
+        return self
+
+    def _spawn(self, index):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self.modelpath, self.variant, self.cpu_threads, self.ring.name, self.ring.slot_bytes, child_conn),
+            name=f'ocr-engine-{index}', daemon=True)
+        process.start()
+        child_conn.close()
+        worker = _Worker(index, process, parent_conn)
+        threading.Thread(target=self._read_loop, args=(worker,), name=f'engine-pool-reader-{index}',
+                         daemon=True).start()
+        return worker
+
+    def submit(self, image, on_boxes=None, on_lines=None, trace=None):
+        """提交一张 BGR 图像
+
+        Returns:
+            concurrent.futures.Future，结果为 OCRResult
+        """
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        future = Future()
+        slot = shm = None
+        if image.nbytes <= self.ring.slot_bytes:
+            slot = self.ring.acquire(timeout=self.request_timeout)
+        if slot is not None:
+            self.ring.write(slot, image)
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=max(1, image.nbytes))
+            np.ndarray(image.shape, dtype=np.uint8, buffer=shm.buf)[:] = image
+        request = _Request(future, on_boxes, on_lines, trace, slot, shm)
+
+        request_id = next(self._ids)
+        try:
+            worker = self._assign(request_id, request)
+        except EngineWorkerError as e:
+            self._complete(request, error=e)
+            return future
+        ENGINES_BUSY.inc()
+        try:
+            worker.send(('ocr', request_id, slot, shm.name if shm is not None else None, image.shape))
+        except OSError as e:
+            # 进程已退出时请求可能已被重启流程处理
+            self._finish(worker, request_id, error=EngineWorkerError(str(e)))
+        return future
+
+    def recognize(self, image, on_boxes=None, on_lines=None, trace=None):
+        """同步识别，接口与 OCRProcessor.recognize 一致"""
+        return self.submit(image, on_boxes, on_lines, trace).result()
+
+    def _assign(self, request_id, request):
+        """把请求登记到进行中请求最少的就绪工作进程，没有就绪进程时等待
+
+        选择与登记在同一次加锁内完成，请求不会落到刚被重启流程淘汰的进程上
+
+        Returns:
+            接收该请求的工作进程
+        """
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        with self._ready:
+            while True:
+                candidates = [worker for worker in self.workers
+                              if worker.ready and not worker.draining and not worker.retired]
+                if candidates:
+                    worker = min(candidates, key=lambda worker: len(worker.pending))
+                    worker.pending[request_id] = request
+                    return worker
+                if self._stopping.is_set():
+                    raise EngineWorkerError("Engine pool is stopped")
+                if not self.workers:
+                    raise EngineWorkerError("OCR engine workers failed to start")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise EngineWorkerError("No OCR engine worker became ready")
+                self._ready.wait(remaining)
+
+    def _read_loop(self, worker):
+        while True:
+            try:
+                message = worker.connection.recv()
+            except (EOFError, OSError):
+                break
+            kind = message[0]
+            worker.ping_sent = None  # 任何消息都说明进程仍在响应
+            if kind == 'ready':
+                with self._ready:
+                    worker.ready = True
+                    worker.rss = message[2]
+                    self._startup_failures = 0
+                    if worker.replaces is not None:
+                        # 替换进程已就绪，旧进程不再接收新请求
+                        worker.replaces.draining = True
+                        worker.replaces = None
+                    self._update_engine_count()
+                    self._ready.notify_all()
+                logger.info("OCR engine worker %d ready (pid %s)", worker.index, message[1])
+                continue
+            if kind == 'pong':
+                worker.rss = message[1]
+                continue
+
+            request = worker.pending.get(message[1])
+            if request is None:
+                continue
+            try:
+                if kind == 'mark':
+                    if request.trace is not None:
+                        request.trace.mark(message[2])
+                elif kind == 'boxes':
+                    if request.on_boxes is not None:
+                        request.on_boxes(message[2])
+                elif kind == 'lines':
+                    if request.on_lines is not None:
+                        request.on_lines(message[2], message[3])
+                elif kind == 'done':
+                    self._finish(worker, message[1], result=result_from_dict(message[2]))
+                elif kind == 'error':
+                    self._finish(worker, message[1], error=RuntimeError(message[2]))
+            except Exception as e:
+                logger.error("Error handling message from OCR engine worker %d: %s", worker.index, e)
+
+        if not worker.retired and not self._stopping.is_set():
+            self._restart(worker, 'crash')
+        # 连接已断开，不会再有回复，仍在等待的请求全部失败
+        with self._lock:
+            pending, worker.pending = worker.pending, {}
+        for request in pending.values():
+            ENGINES_BUSY.dec()
+            self._complete(request, error=EngineWorkerError("OCR engine worker exited"))
+
+    def _finish(self, worker, request_id, result=None, error=None):
+        with self._lock:
+            request = worker.pending.pop(request_id, None)
+        if request is not None:
+            ENGINES_BUSY.dec()
+            self._complete(request, result, error)
+
+    def _complete(self, request, result=None, error=None):
+        if request.slot is not None:
+            self.ring.release(request.slot)
+        if request.shm is not None:
+            request.shm.close()
+            request.shm.unlink()
+        if error is not None:
+            request.future.set_exception(error)
+        else:
+            request.future.set_result(result)
+
+    def _monitor_loop(self):
+        while not self._stopping.wait(self.health_interval):
+            for worker in list(self.workers):
+                try:
+                    self._check(worker)
+                except Exception as e:
+                    logger.error("Health check of OCR engine worker %d failed: %s", worker.index, e)
+
+    def _check(self, worker):
+        """检查一个工作进程，已退出、请求超时或不响应时重启"""
+        if worker.retired:
+            return
+        if not worker.process.is_alive():
+            self._restart(worker, 'crash')
+            return
+        now = time.monotonic()
+        with self._lock:
+            oldest = min((request.started for request in worker.pending.values()), default=None)
+        if oldest is not None and now - oldest > self.request_timeout:
+            self._restart(worker, 'timeout')
+            return
+        if worker.draining and not worker.pending:
+            self._retire(worker)
+            return
+        if worker.ready and oldest is None:
+            if worker.ping_sent is not None and now - worker.ping_sent > self.health_interval * 2:
+                self._restart(worker, 'unresponsive')
+            elif worker.ping_sent is None:
+                worker.ping_sent = now
+                worker.send(('ping',))
+
+    def _restart(self, worker, reason):
+        """结束工作进程并以新进程替换，进行中的请求以 EngineWorkerError 失败"""
+        with self._lock:
+            if worker.retired or self._stopping.is_set():
+                return
+            worker.retired = True
+            pending, worker.pending = worker.pending, {}
+            if not worker.ready:
+                self._startup_failures += 1
+            if worker.draining or any(other.replaces is worker for other in self.workers):
+                # 滚动重启中已有替换进程
+                self.workers.remove(worker)
+            elif self._startup_failures >= MAX_STARTUP_FAILURES:
+                self.workers.remove(worker)
+                if worker.replaces is not None:
+                    worker.replaces.draining = False  # 替换失败，旧进程继续服务
+                logger.error("OCR engine worker %d failed to start %d times, giving up",
+                             worker.index, self._startup_failures)
+            else:
+                replacement = self._spawn(worker.index)
+                replacement.replaces = worker.replaces
+                self.workers[self.workers.index(worker)] = replacement
+            self._update_engine_count()
+            self._ready.notify_all()
+        self.restarts += 1
+        WORKER_RESTARTS.inc(reason=reason)
+        logger.warning("OCR engine worker %d (pid %s) stopped: %s, %d requests failed",
+                       worker.index, worker.process.pid, reason, len(pending))
+        self._terminate(worker)
+        for request in pending.values():
+            ENGINES_BUSY.dec()
+            self._complete(request, error=EngineWorkerError(f"OCR engine worker {reason}"))
+
+    def _retire(self, worker):
+        with self._lock:
+            worker.retired = True
+            if worker in self.workers:
+                self.workers.remove(worker)
+            self._update_engine_count()
+        try:
+            worker.send(('stop',))
+        except OSError:
+            pass
+        worker.process.join(timeout=5)
+        self._terminate(worker)
+        logger.info("Retired OCR engine worker %d (pid %s)", worker.index, worker.process.pid)
+
+    @staticmethod
+    def _terminate(worker):
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join(timeout=2)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+        worker.connection.close()
+
+    def _update_engine_count(self):
+        ENGINES.set(sum(1 for worker in self.workers if worker.ready and not worker.retired))
+
+    def restart_all(self):
+        """滚动重启全部工作进程，新进程就绪后旧进程处理完已有请求再退出
+
+        替换进程加载模型期间旧进程照常接收请求，识别不会因重启而等待。
+
+        Returns:
+            是否开始了重启
+        """
+        with self._lock:
+            if self._stopping.is_set() or any(worker.draining or worker.replaces is not None
+                                              for worker in self.workers):
+                return False
+            old = [worker for worker in self.workers if not worker.retired]
+            for worker in old:
+                replacement = self._spawn(worker.index)
+                replacement.replaces = worker
+                self.workers.append(replacement)
+        logger.info("Rolling restart of %d OCR engine workers", len(old))
+        return True
+
+    def status(self):
+        with self._lock:
+            return [{'index': worker.index, 'pid': worker.process.pid, 'ready': worker.ready,
+                     'draining': worker.draining, 'pending': len(worker.pending), 'rss': worker.rss}
+                    for worker in self.workers]
+
+    def memory_usage(self):
+        """各工作进程最近报告的常驻内存之和"""
+        with self._lock:
+            return sum(worker.rss for worker in self.workers if not worker.retired)
+
+    def stop(self):
+        self._stopping.set()
+        with self._ready:
+            self._ready.notify_all()
+            workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.retired = True
+            try:
+                worker.send(('stop',))
+            except OSError:
+                pass
+        for worker in workers:
+            worker.process.join(timeout=5)
+            self._terminate(worker)
+            # 读取线程可能仍在移除请求，先在锁内取出
+            with self._lock:
+                pending, worker.pending = worker.pending, {}
+            for request in pending.values():
+                ENGINES_BUSY.dec()
+                self._complete(request, error=EngineWorkerError("Engine pool is stopped"))
+        if self._monitor is not None:
+            self._monitor.join(timeout=self.health_interval + 1)
+        ENGINES.set(0)
+        self.ring.close()
+        logger.info("Stopped OCR engine worker processes")
@@ -4,26 +4,46 @@
 """
 
 import os
+import time
 import logging
 from PyQt6.QtCore import QObject, pyqtSignal
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
 from src.core.ocr_processor import OCRProcessor
+from src.utils.latency_trace import latency_recorder
+from src.utils.metrics import QUEUE_DEPTH
+from src.utils.profiler import profiler
+
+# PNG 文件结尾的 IEND 块
+PNG_TRAILER = b'IEND\xaeB`\x82'
+# 等待截图文件写完的最长时间与轮询间隔（秒）
+READY_TIMEOUT = 2.0
+READY_POLL_INTERVAL = 0.01
 
 class FolderMonitor(QObject):
     result_signal = pyqtSignal(str, object)  # 添加信号：图片路径和OCR结果
+    boxes_signal = pyqtSignal(str, object)  # 检测完成信号：图片路径和文本框列表
+    lines_signal = pyqtSignal(str, int, object)  # 识别进度信号：图片路径、起始下标和该批文本
     
-    def __init__(self, path, modelpath):
+    def __init__(self, path, modelpath, engine_config=None, variant=None):
         """初始化文件夹监控器
 
         Args:
             path: 要监控的文件夹路径
             modelpath: OCR模型路径
+            engine_config: 引擎配置，workers 大于 0 时模型在独立进程中运行
+            variant: 使用的 ModelVariant，默认为内置默认变体
         """
         super().__init__()
         self.path = path
-        self.ocr_processor = OCRProcessor(modelpath)
+        engine_config = engine_config or {}
+        self.ocr_processor = OCRProcessor(
+            modelpath,
+            workers=engine_config.get('workers', 0),
+            worker_options={'request_timeout_s': engine_config.get('request_timeout_s', 30)},
+            variant=variant
+        )
         self.event_handler = FileSystemEventHandler()
         self.event_handler.on_created = self.on_created
         self.observer = Observer()
@@ -39,9 +59,10 @@ class FolderMonitor(QObject):
             
         # 初始化已存在的文件列表
         self.processed_files = set(os.listdir(path))
-        logging.debug(f"Initial files in directory: {self.processed_files}")
+        logging.debug("Initial files in directory: %d files", len(self.processed_files))
         
         self.observer.start()
+        QUEUE_DEPTH.set_function(self.observer.event_queue.qsize)
         logging.info(f"Started monitoring directory: {path}")
 
     def on_created(self, event):
@@ -49,13 +70,47 @@ class FolderMonitor(QObject):
             file = os.path.basename(event.src_path)
             if file.startswith('Snipaste') and file.endswith('.png'):
                 full_path = event.src_path.replace('\\', '/')
-                logging.info(f"Processing new file: {full_path}")
+                trace = latency_recorder.start(full_path)
+                if not self._wait_until_ready(full_path):
+                    logging.warning("File may be incomplete after %ss: %s", READY_TIMEOUT, full_path)
+                logging.info("Processing new file: %s", full_path)
+                trace.mark('ready')
                 try:
-                    result = self.ocr_processor.process_image(full_path)
+                    with profiler.capture():
+                        result = self.ocr_processor.process_image(
+                            full_path,
+                            on_boxes=lambda boxes: self.boxes_signal.emit(full_path, boxes),
+                            on_lines=lambda start, texts: self.lines_signal.emit(full_path, start, texts),
+                            trace=trace
+                        )
                     self.result_signal.emit(full_path, result)
-                    logging.info(f"Successfully processed file: {full_path}")
+                    logging.info("Successfully processed file: %s", full_path)
                 except Exception as e:
-                    logging.error(f"Error processing file {full_path}: {str(e)}")
+                    logging.error("Error processing file %s: %s", full_path, e)
+
+    def _wait_until_ready(self, path):
+        """等待截图工具写完文件，以 PNG 结尾块出现为准
+
+        Args:
+            path: 图片路径
+
+        Returns:
+            超时前文件是否已完整
+        """
+        deadline = time.monotonic() + READY_TIMEOUT
+        while True:
+            try:
+                with open(path, 'rb') as f:
+                    f.seek(0, os.SEEK_END)
+                    if f.tell() >= len(PNG_TRAILER):
+                        f.seek(-len(PNG_TRAILER), os.SEEK_END)
+                        if f.read() == PNG_TRAILER:
+                            return True
+            except OSError:
+                pass  # Windows 下截图工具写入期间文件可能被独占
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(READY_POLL_INTERVAL)
 
     def stop(self):
         """停止文件监控"""
@@ -63,4 +118,6 @@ class FolderMonitor(QObject):
         self.running = False
         self.observer.stop()
         self.observer.join()
+        QUEUE_DEPTH.set_function(None)
+        self.ocr_processor.close()
         logging.info("Folder monitor stopped successfully") 
\ No newline at end of file
@@ -0,0 +1,383 @@
+"""
+本地 IPC OCR 通道
+通过 Unix 域套接字（Windows 为命名管道）接收长度前缀的二进制消息，
+复用常驻 OCR 引擎识别后返回结果，较大的原始图像经共享内存传递
+
+请求消息: REQUEST 头 + 负载
+    KIND_ENCODED  负载为 png/jpg 等编码后的图片
+    KIND_RAW      负载为 height*width*channels 字节的 BGR / BGRA / 灰度像素
+    KIND_SHARED   负载为共享内存名称，像素位于该共享内存开头
+响应消息: 1 字节状态 + UTF-8 JSON，成功时与 HTTP 服务的响应体一致
+
+默认套接字位于当前用户私有的运行时目录，连接需通过 multiprocessing 的 authkey
+认证，密钥由服务端启动时生成并写入运行时目录下仅当前用户可读的文件。
+
+用法:
+    python -m src.core.ipc_server image.png --repeat 20
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import socket
+import struct
+import getpass
+import hashlib
+import logging
+import secrets
+import argparse
+import tempfile
+import threading
+import statistics
+from multiprocessing import AuthenticationError, shared_memory
+from multiprocessing.connection import Client, Listener, answer_challenge, deliver_challenge
+
+import cv2
+import numpy as np
+
+from src.core.ocr_processor import to_bgr
+from src.core.ocr_service import result_to_dict
+from src.utils.latency_trace import CaptureTrace
+from src.utils.metrics import FAILURES
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 1
+# 版本、类型、保留位、高、宽、通道数
+REQUEST = struct.Struct('<BBHIIB')
+KIND_ENCODED, KIND_RAW, KIND_SHARED = 0, 1, 2
+STATUS_OK, STATUS_ERROR = 0, 1
+# 原始像素超过该字节数时客户端改用共享内存
+SHARED_THRESHOLD = 256 * 1024
+# 单条消息上限，超出时服务端断开连接
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+# 客户端创建的共享内存名称，服务端只接受该格式的名称
+SHARED_PREFIX = 'snipocr_'
+SHARED_NAME = re.compile(r'^snipocr_[0-9a-f]{16}$')
+AUTHKEY_BYTES = 32
+
+
+def runtime_dir():
+    """当前用户私有的运行时目录，存放套接字与认证密钥"""
+    xdg_runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if sys.platform != 'win32' and xdg_runtime and os.path.isdir(xdg_runtime):
+        return xdg_runtime
+    path = os.path.join(tempfile.gettempdir(), f'SnipasteOCR-{getpass.getuser()}')
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if sys.platform != 'win32':
+        st = os.stat(path)
+        if st.st_uid != os.getuid() or st.st_mode & 0o077:
+            raise PermissionError(f"Runtime directory {path} is not private to the current user")
+    return path
+
+
+def default_address():
+    if sys.platform == 'win32':
+        return rf'\\.\pipe\SnipasteOCR-ocr-{getpass.getuser()}'
+    return os.path.join(runtime_dir(), 'SnipasteOCR-ocr.sock')
+
+
+def _family(address):
+    return 'AF_PIPE' if address.startswith('\\\\') else 'AF_UNIX'
+
+
+def _authkey_path(address):
+    digest = hashlib.sha1(address.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(runtime_dir(), f'SnipasteOCR-ocr-{digest}.key')
+
+
+def _write_authkey(address, authkey):
+    path = _authkey_path(address)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(authkey)
+    if sys.platform != 'win32':
+        os.chmod(path, 0o600)
+
+
+def read_authkey(address):
+    """读取服务端为该地址生成的认证密钥
+
+    Raises:
+        OSError: 服务端未运行，密钥文件不存在
+    """
+    with open(_authkey_path(address), 'rb') as f:
+        return f.read()
+
+
+def _unix_socket_alive(path):
+    """套接字文件上是否有正在监听的进程"""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def _attach_shared(name):
+    """只读方式使用客户端创建的共享内存，生命周期由客户端负责"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python 3.13 之前附加的共享内存也会被 resource_tracker 登记，退出时误删
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix':
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class IPCServer:
+    def __init__(self, get_processor, address=None):
+        """初始化 IPC 服务
+
+        Args:
+            get_processor: 返回当前常驻 OCRProcessor 的函数，引擎未就绪时返回 None
+            address: 套接字路径或命名管道名，默认见 default_address
+        """
+        self.get_processor = get_processor
+        self.address = address or default_address()
+        self.authkey = None
+        self.listener = None
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        family = _family(self.address)
+        if family == 'AF_UNIX' and os.path.exists(self.address):
+            if _unix_socket_alive(self.address):
+                raise OSError(f"OCR IPC address {self.address} is used by another instance")
+            # 无法连接说明是上次异常退出遗留的套接字文件
+            os.unlink(self.address)
+        self.authkey = secrets.token_bytes(AUTHKEY_BYTES)
+        # 认证在各连接的线程中进行，握手慢或失败的客户端不会阻塞 accept
+        self.listener = Listener(self.address, family)
+        if family == 'AF_UNIX':
+            os.chmod(self.address, 0o600)
+        _write_authkey(self.address, self.authkey)
+        self._thread = threading.Thread(target=self._accept_loop, name='ocr-ipc', daemon=True)
+        self._thread.start()
+        logger.info("OCR IPC listening on %s", self.address)
+        return self
+
+    def stop(self):
+        if self.listener is None:
+            return
+        self._stopping = True
+        try:
+            # 连接一次以唤醒阻塞在 accept 的线程
+            Client(self.address, _family(self.address)).close()
+        except OSError:
+            pass
+        self._thread.join(timeout=5)
+        self.listener.close()
+        self.listener = None
+        try:
+            os.remove(_authkey_path(self.address))
+        except OSError:
+            pass
+
+    def _accept_loop(self):
+        while not self._stopping:
+            try:
+                connection = self.listener.accept()
+            except OSError as e:
+                if not self._stopping:
+                    logger.error("OCR IPC accept failed: %s", e)
+                break
+            if self._stopping:
+                connection.close()
+                break
+            threading.Thread(target=self._serve, args=(connection,), name='ocr-ipc-conn', daemon=True).start()
+
+    def _serve(self, connection):
+        with connection:
+            try:
+                deliver_challenge(connection, self.authkey)
+                answer_challenge(connection, self.authkey)
+            except (AuthenticationError, EOFError, OSError) as e:
+                logger.warning("Rejected OCR IPC connection: %s", e)
+                return
+            while True:
+                try:
+                    message = connection.recv_bytes(MAX_MESSAGE_BYTES)
+                except (EOFError, OSError):
+                    return
+                status, body = self.handle(message)
+                connection.send_bytes(bytes([status]) + json.dumps(body, ensure_ascii=False).encode('utf-8'))
+
+    def handle(self, message):
+        """处理一条请求消息
+
+        Returns:
+            (状态码, 响应体)
+        """
+        trace = CaptureTrace('ipc')
+        trace.mark('file_event')
+        shm = image = None
+        try:
+            processor = self.get_processor()
+            if processor is None:
+                return STATUS_ERROR, {'error': 'OCR engine is not ready'}
+            version, kind, _, height, width, channels = REQUEST.unpack_from(message)
+            if version != PROTOCOL_VERSION:
+                return STATUS_ERROR, {'error': f'Unsupported protocol version {version}'}
+            payload = memoryview(message)[REQUEST.size:]
+            shape = (height, width) if channels == 1 else (height, width, channels)
+            nbytes = height * width * channels
+            if kind != KIND_ENCODED and (not height or not width or channels not in (1, 3, 4)):
+                return STATUS_ERROR, {'error': f'Invalid image shape {height}x{width}x{channels}'}
+
+            if kind == KIND_ENCODED:
+                image = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if image is None:
+                    return STATUS_ERROR, {'error': 'Cannot decode image'}
+            elif kind == KIND_RAW:
+                if len(payload) < nbytes:
+                    return STATUS_ERROR, {'error': f'Expected {nbytes} bytes of pixels, got {len(payload)}'}
+                image = np.frombuffer(payload, dtype=np.uint8, count=nbytes).reshape(shape)
+            elif kind == KIND_SHARED:
+                name = bytes(payload).decode('utf-8', errors='replace')
+                # 只附加本协议客户端创建的共享内存，不接受任意名称
+                if not SHARED_NAME.match(name):
+                    return STATUS_ERROR, {'error': 'Invalid shared memory name'}
+                shm = _attach_shared(name)
+                if nbytes > shm.size:
+                    return STATUS_ERROR, {'error': f'Image of {nbytes} bytes exceeds shared memory size {shm.size}'}
+                image = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+            else:
+                return STATUS_ERROR, {'error': f'Unknown request kind {kind}'}
+            image = to_bgr(image)
+            trace.mark('decode')
+
+            result = processor.recognize(image, trace=trace)
+            body = result_to_dict(processor, result)
+            trace.mark('layout')
+            body['timing_ms'] = {stage: round(ms, 3) for stage, ms in trace.durations().items()}
+            return STATUS_OK, body
+        except Exception as e:
+            FAILURES.inc(component='ipc')
+            logger.error("OCR IPC request failed: %s", e)
+            return STATUS_ERROR, {'error': str(e)}
+        finally:
+            image = None  # 关闭共享内存前释放对其缓冲区的引用
+            if shm is not None:
+                shm.close()
+
+
+class IPCClient:
+    """IPC 客户端，连接在多次请求间复用，共享内存按需扩容复用"""
+
+    def __init__(self, address=None):
+        self.address = address or default_address()
+        self.connection = Client(self.address, _family(self.address), authkey=read_authkey(self.address))
+        self._shm = None
+        self._shm_address = None
+
+    def recognize_encoded(self, data):
+        """识别 png/jpg 等编码后的图片字节"""
+        return self._request(REQUEST.pack(PROTOCOL_VERSION, KIND_ENCODED, 0, 0, 0, 0) + bytes(data))
+
+    def shared_array(self, shape):
+        """返回位于共享内存开头的 uint8 图像数组
+
+        调用方直接将像素写入该数组再传给 recognize，可省去一次拷贝；
+        再次调用且需要更大空间时旧数组失效。
+        """
+        self._ensure_shared(int(np.prod(shape)))
+        return np.ndarray(shape, dtype=np.uint8, buffer=self._shm.buf)
+
+    def recognize(self, image):
+        """识别 uint8 BGR 图像，较大的图像经共享内存传递"""
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        if image.ndim == 2:
+            image = image[:, :, np.newaxis]
+        height, width, channels = image.shape
+        in_shared = self._shm_address is not None and image.ctypes.data == self._shm_address
+        if image.nbytes < SHARED_THRESHOLD and not in_shared:
+            return self._request(REQUEST.pack(PROTOCOL_VERSION, KIND_RAW, 0, height, width, channels)
+                                 + image.tobytes())
+        if not in_shared:
+            self.shared_array(image.shape)[:] = image
+        return self._request(REQUEST.pack(PROTOCOL_VERSION, KIND_SHARED, 0, height, width, channels)
+                             + self._shm.name.encode('utf-8'))
+
+    def _request(self, message):
+        self.connection.send_bytes(message)
+        response = self.connection.recv_bytes()
+        body = json.loads(response[1:])
+        if response[0] != STATUS_OK:
+            raise RuntimeError(body.get('error'))
+        return body
+
+    def _ensure_shared(self, nbytes):
+        if self._shm is not None and self._shm.size >= nbytes:
+            return
+        self._release_shared()
+        self._shm = shared_memory.SharedMemory(name=SHARED_PREFIX + secrets.token_hex(8), create=True, size=nbytes)
+        self._shm_address = np.frombuffer(self._shm.buf, dtype=np.uint8, count=1).ctypes.data
+
+    def _release_shared(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+            self._shm_address = None
+
+    def close(self):
+        self._release_shared()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('image', help='待识别的图片')
+    parser.add_argument('--address', help='套接字路径或命名管道名')
+    parser.add_argument('--repeat', type=int, default=1, help='重复请求次数，大于 1 时输出往返耗时统计')
+    parser.add_argument('--encoded', action='store_true', help='发送编码后的文件字节而不是解码后的像素')
+    args = parser.parse_args()
+
+    if args.encoded:
+        with open(args.image, 'rb') as f:
+            data = f.read()
+        send = lambda client: client.recognize_encoded(data)
+    else:
+        image = cv2.imread(args.image)
+        if image is None:
+            print(f"error: cannot read {args.image}", file=sys.stderr)
+            sys.exit(1)
+        send = lambda client: client.recognize(image)
+
+    try:
+        with IPCClient(args.address) as client:
+            overheads = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                body = send(client)
+                elapsed = (time.perf_counter() - start) * 1000
+                overheads.append(elapsed - sum(body['timing_ms'].values()))
+    except (OSError, RuntimeError, AuthenticationError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(body['text'])
+    if args.repeat > 1:
+        print(f"round-trip overhead: median {statistics.median(overheads):.3f} ms, "
+              f"max {max(overheads):.3f} ms over {args.repeat} requests", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+模型变体注册表
+内置常用的 PP-OCR 模型组合（移动版、INT8 量化、服务器版、PP-OCRv4、多语言识别），
+配置文件 models.variants 可覆盖或新增变体，models.active 指定使用的变体
+
+用法:
+    python -m src.core.model_registry            列出全部变体及其文件是否齐全
+    python -m src.core.model_registry --modelpath D:/models
+"""
+
+import os
+import sys
+import argparse
+
+import yaml
+
+from src.utils.logging_config import ROOT_DIR
+
+DEFAULT_VARIANT = 'ppocrv3'
+MODEL_FILES = ('inference.pdmodel', 'inference.pdiparams')
+# 配置文件中变体可设置的字段
+VARIANT_FIELDS = ('det', 'rec', 'cls', 'labels', 'rec_image_shape', 'description')
+
+
+class ModelVariant:
+    def __init__(self, name, det, rec, cls, labels='labels.txt', rec_image_shape=None, description=''):
+        """一组检测、方向分类、识别模型
+
+        Args:
+            name: 变体名称
+            det: 检测模型目录，相对于模型根目录
+            rec: 识别模型目录
+            cls: 方向分类模型目录
+            labels: 识别字典文件
+            rec_image_shape: 识别模型输入尺寸 [C, H, W]，为 None 时使用 FastDeploy 默认值
+            description: 说明
+        """
+        self.name = name
+        self.det = det
+        self.rec = rec
+        self.cls = cls
+        self.labels = labels
+        self.rec_image_shape = list(rec_image_shape) if rec_image_shape else None
+        self.description = description
+
+    def paths(self, modelpath):
+        """各模型目录与字典文件的完整路径"""
+        return {
+            'det': os.path.join(modelpath, self.det),
+            'rec': os.path.join(modelpath, self.rec),
+            'cls': os.path.join(modelpath, self.cls),
+            'labels': os.path.join(modelpath, self.labels),
+        }
+
+    def validate(self, modelpath):
+        """检查变体在模型根目录下是否可用
+
+        Returns:
+            问题描述列表，为空表示可用
+        """
+        problems = []
+        paths = self.paths(modelpath)
+        for stage in ('det', 'cls', 'rec'):
+            for file_name in MODEL_FILES:
+                file_path = os.path.join(paths[stage], file_name)
+                if not os.path.isfile(file_path):
+                    problems.append(f"Model file not found: {file_path}")
+        if not os.path.isfile(paths['labels']):
+            problems.append(f"Label file not found: {paths['labels']}")
+        elif os.path.getsize(paths['labels']) == 0:
+            problems.append(f"Label file is empty: {paths['labels']}")
+        if self.rec_image_shape is not None and (
+                len(self.rec_image_shape) != 3 or not all(isinstance(v, int) and v > 0
+                                                          for v in self.rec_image_shape)):
+            problems.append(f"Invalid rec_image_shape: {self.rec_image_shape}")
+        return problems
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in VARIANT_FIELDS}
+
+
+# 内置变体，目录名与 PaddleOCR 发布的推理模型压缩包一致
+BUILTIN_VARIANTS = {
+    'ppocrv3': ModelVariant(
+        'ppocrv3', 'ch_PP-OCRv3_det_infer', 'ch_PP-OCRv3_rec_infer', 'ch_ppocr_mobile_v2.0_cls_infer',
+        description='PP-OCRv3 中英文移动版（默认）'),
+    'ppocrv3-int8': ModelVariant(
+        'ppocrv3-int8', 'ch_PP-OCRv3_det_slim_infer', 'ch_PP-OCRv3_rec_slim_infer',
+        'ch_ppocr_mobile_v2.0_cls_slim_infer',
+        description='PP-OCRv3 INT8 量化移动版，体积与 CPU 耗时更低'),
+    'ppocrv4': ModelVariant(
+        'ppocrv4', 'ch_PP-OCRv4_det_infer', 'ch_PP-OCRv4_rec_infer', 'ch_ppocr_mobile_v2.0_cls_infer',
+        description='PP-OCRv4 中英文移动版'),
+    'ppocrv4-server': ModelVariant(
+        'ppocrv4-server', 'ch_PP-OCRv4_det_server_infer', 'ch_PP-OCRv4_rec_server_infer',
+        'ch_ppocr_mobile_v2.0_cls_infer',
+        description='PP-OCRv4 服务器版，精度更高但更慢、占用更多内存'),
+    'en': ModelVariant(
+        'en', 'ch_PP-OCRv3_det_infer', 'en_PP-OCRv3_rec_infer', 'ch_ppocr_mobile_v2.0_cls_infer',
+        labels='en_dict.txt', description='英文识别'),
+    'japan': ModelVariant(
+        'japan', 'ch_PP-OCRv3_det_infer', 'japan_PP-OCRv3_rec_infer', 'ch_ppocr_mobile_v2.0_cls_infer',
+        labels='japan_dict.txt', description='日文识别'),
+    'korean': ModelVariant(
+        'korean', 'ch_PP-OCRv3_det_infer', 'korean_PP-OCRv3_rec_infer', 'ch_ppocr_mobile_v2.0_cls_infer',
+        labels='korean_dict.txt', description='韩文识别'),
+}
+
+
+def load_variants(models_config=None):
+    """合并内置变体与配置文件中的变体
+
+    Args:
+        models_config: 配置文件 models 分组
+
+    Returns:
+        {名称: ModelVariant}
+
+    Raises:
+        ValueError: 配置中的变体缺少必要字段或含有未知字段
+    """
+    variants = dict(BUILTIN_VARIANTS)
+    for name, values in ((models_config or {}).get('variants') or {}).items():
+        values = values or {}
+        unknown = [key for key in values if key not in VARIANT_FIELDS]
+        if unknown:
+            raise ValueError(f"Model variant '{name}' has unknown fields: {', '.join(unknown)}")
+        # 与内置变体同名时只覆盖给出的字段
+        fields = variants[name].to_dict() if name in variants else {}
+        fields.update(values)
+        missing = [key for key in ('det', 'rec', 'cls') if not fields.get(key)]
+        if missing:
+            raise ValueError(f"Model variant '{name}' is missing {', '.join(missing)}")
+        variants[name] = ModelVariant(name, **fields)
+    return variants
+
+
+def resolve_variant(models_config=None, name=None):
+    """返回指定名称或配置中选中的变体
+
+    Raises:
+        ValueError: 变体不存在
+    """
+    variants = load_variants(models_config)
+    name = name or (models_config or {}).get('active') or DEFAULT_VARIANT
+    if name not in variants:
+        raise ValueError(f"Unknown model variant '{name}', available: {', '.join(variants)}")
+    return variants[name]
+
+
+def _load_config():
+    with open(os.path.join(ROOT_DIR, 'config.yml'), 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modelpath', help='模型根目录，默认读取配置文件')
+    args = parser.parse_args()
+
+    config = _load_config()
+    modelpath = (args.modelpath or (config.get('snipaste') or {}).get('modelpath')
+                 or os.path.join(ROOT_DIR, 'models'))
+    models_config = config.get('models') or {}
+    try:
+        variants = load_variants(models_config)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(1)
+    active = models_config.get('active') or DEFAULT_VARIANT
+
+    for name, variant in variants.items():
+        problems = variant.validate(modelpath)
+        marker = '*' if name == active else ' '
+        print(f"{marker} {name:<16} {'ok' if not problems else 'unavailable':<12} {variant.description}")
+        for problem in problems:
+            print(f"      {problem}")
+
+
+if __name__ == "__main__":
+    main()
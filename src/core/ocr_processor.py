@@ -6,29 +6,94 @@ OCR处理模块
 import os
 import cv2
 import logging
+import threading
+import numpy as np
 import fastdeploy as fd
 import pyperclip
+from src.core.engine_pool import EnginePool
+from src.core.model_registry import BUILTIN_VARIANTS, DEFAULT_VARIANT
 from src.utils.logging_config import setup_logging
+from src.utils.metrics import (ENGINE_RECYCLES, ENGINES, ENGINES_BUSY, FAILURES, IMAGES_PROCESSED,
+                               process_rss_bytes)
 
 # Initialize logger for this module
 logger = logging.getLogger(__name__)
 
+# 方向分类置信度阈值，超过该值且判定为倒置时将文本行旋转180度
+CLS_THRESH = 0.9
+# 识别阶段每批文本行数量，每完成一批即回调一次
+REC_BATCH_SIZE = 16
+# 批量检测时按缩放后尺寸分桶的粒度（像素），同桶图像补齐后尺寸相近
+DET_BUCKET_SIZE = 128
+
+
+def _no_mark(stage):
+    """未启用延迟追踪时的空计时回调"""
+
+
+def to_bgr(image):
+    """将内存中的图像统一为 uint8 BGR 数组
+
+    Args:
+        image: BGR / BGRA / 灰度 ndarray，或 png/jpg 等编码后的字节
+
+    Returns:
+        BGR 图像，已是 BGR 时原样返回不拷贝
+    """
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        decoded = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if decoded is None:
+            raise ValueError("Failed to decode image bytes")
+        return decoded
+    image = np.asarray(image)
+    if image.dtype != np.uint8:
+        raise ValueError(f"Unsupported image dtype: {image.dtype}")
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    if image.ndim == 3 and image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+    if image.ndim == 3 and image.shape[2] == 3:
+        return image
+    raise ValueError(f"Unsupported image shape: {image.shape}")
+
 class OCRProcessor:
-    def __init__(self, modelpath):
+    def __init__(self, modelpath, copy_to_clipboard=True, cpu_threads=6, workers=0, worker_options=None,
+                 variant=None):
         """初始化OCR处理器
 
         Args:
             modelpath: 模型文件路径
+            copy_to_clipboard: 识别完成后是否将结果复制到剪贴板
+            cpu_threads: 推理线程数
+            workers: 大于 0 时模型在该数量的工作进程中运行，见 EnginePool
+            worker_options: 传给 EnginePool 的其他参数
+            variant: 使用的 ModelVariant，默认为内置的 PP-OCRv3 移动版
         """
         setup_logging()
-        logger.info(f"Initializing OCR processor with model path: {modelpath}")
-        
-        self.det_model = os.path.join(modelpath, 'ch_PP-OCRv3_det_infer')
-        self.rec_model = os.path.join(modelpath, 'ch_PP-OCRv3_rec_infer')
-        self.cls_model = os.path.join(modelpath, 'ch_ppocr_mobile_v2.0_cls_infer')
-        self.label_file = os.path.join(modelpath, 'labels.txt')
+        self.variant = variant or BUILTIN_VARIANTS[DEFAULT_VARIANT]
+        logger.info(f"Initializing OCR processor with model path: {modelpath}, variant: {self.variant.name}")
+
+        paths = self.variant.paths(modelpath)
+        self.det_model = paths['det']
+        self.rec_model = paths['rec']
+        self.cls_model = paths['cls']
+        self.label_file = paths['labels']
+        self.copy_to_clipboard = copy_to_clipboard
+        self.cpu_threads = cpu_threads
+
+        self.det_runtime = None
+        self.cls_runtime = None
+        self.rec_runtime = None
+        self._engine_memory = 0  # 构建模型前后的常驻内存差，作为引擎占用的估计
+        self._engine_lock = threading.Lock()
+        # 同一组模型不支持并发推理，文件监控与本地服务的请求在此串行
+        self._inference_lock = threading.Lock()
+        self._recycle_thread = None
+        self.pool = None
 
         self.init_model()
+        if workers:
+            self.pool = EnginePool(modelpath, workers, variant=self.variant, **(worker_options or {})).start()
 
     def init_model(self):
         """初始化模型文件路径"""
@@ -55,67 +120,370 @@ class OCRProcessor:
     def build_option(self):
         """构建运行时选项"""
         option = fd.RuntimeOption()
-        option.set_cpu_thread_num(6)
+        option.set_cpu_thread_num(self.cpu_threads)
         option.use_cpu() # Use default CPU backend
         logger.info("Using default CPU backend for FastDeploy.")
         return option
 
-    def process_image(self, image_path):
+    def _ensure_models(self):
+        """按需构建检测、分类、识别模型，构建后常驻复用
+
+        Returns:
+            (检测, 分类, 识别) 模型，调用方在整次推理中使用这一组模型，
+            期间即使引擎被回收替换也不受影响
+        """
+        with self._engine_lock:
+            if self.det_runtime is None:
+                rss = process_rss_bytes()
+                self.det_runtime, self.cls_runtime, self.rec_runtime = self._build_runtimes()
+                self._engine_memory = max(0, process_rss_bytes() - rss)
+                ENGINES.set(1)
+            return self.det_runtime, self.cls_runtime, self.rec_runtime
+
+    def _build_runtimes(self):
+        option = self.build_option()
+
+        # 初始化检测模型
+        det_option = option
+        det_option.set_trt_input_shape("x", [1, 3, 64, 64], [1, 3, 640, 640],
+                                   [1, 3, 960, 960])
+        det_runtime = fd.vision.ocr.DBDetector(
+            self.det_model_file, self.det_params_file, runtime_option=det_option)
+
+        # 初始化分类模型
+        cls_option = option
+        cls_option.set_trt_input_shape("x", [1, 3, 48, 10], [10, 3, 48, 320],
+                                       [64, 3, 48, 1024])
+        cls_runtime = fd.vision.ocr.Classifier(
+            self.cls_model_file, self.cls_params_file, runtime_option=cls_option)
+
+        # 初始化识别模型
+        rec_option = option
+        rec_option.set_trt_input_shape("x", [1, 3, 48, 10], [10, 3, 48, 320],
+                                       [64, 3, 48, 2304])
+        rec_runtime = fd.vision.ocr.Recognizer(
+            self.rec_model_file, self.rec_params_file, self.rec_label_file, runtime_option=rec_option)
+        if self.variant.rec_image_shape is not None:
+            rec_runtime.preprocessor.rec_image_shape = self.variant.rec_image_shape
+        return det_runtime, cls_runtime, rec_runtime
+
+    @property
+    def engine_memory(self):
+        """引擎占用的内存，使用工作进程时为各工作进程的常驻内存之和"""
+        if self.pool is not None:
+            return self.pool.memory_usage()
+        return self._engine_memory
+
+    def recycle_engines(self):
+        """在后台线程重建模型后替换当前模型，释放累积的原生内存
+
+        正在进行的识别继续使用旧模型直至完成，旧模型随最后一个引用释放。
+
+        Returns:
+            是否开始了新的回收，已有回收进行中或模型尚未加载时返回 False
+        """
+        if self.pool is not None:
+            return self.pool.restart_all()
+        if self.det_runtime is None:
+            return False
+        if self._recycle_thread is not None and self._recycle_thread.is_alive():
+            return False
+        self._recycle_thread = threading.Thread(target=self._recycle, name='engine-recycle', daemon=True)
+        self._recycle_thread.start()
+        return True
+
+    def _recycle(self):
+        logger.info("Rebuilding OCR engines in the background")
+        try:
+            runtimes = self._build_runtimes()
+        except Exception as e:
+            logger.error("Failed to rebuild OCR engines: %s", e)
+            return
+        with self._engine_lock:
+            old = (self.det_runtime, self.cls_runtime, self.rec_runtime)
+            self.det_runtime, self.cls_runtime, self.rec_runtime = runtimes
+        del old
+        ENGINE_RECYCLES.inc()
+        logger.info("Swapped in rebuilt OCR engines, RSS now %.1f MB", process_rss_bytes() / 1024 / 1024)
+
+    def process_image(self, image_path, on_boxes=None, on_lines=None, trace=None):
         """处理图片
 
+        检测完成后先通过 on_boxes 回调交出文本框，识别阶段每完成一批
+        文本行就通过 on_lines 回调交出该批结果，便于界面渐进式显示。
+
         Args:
             image_path: 图片路径
+            on_boxes: 检测完成回调，参数为排序后的文本框列表
+            on_lines: 识别进度回调，参数为起始下标和该批识别文本
+            trace: 可选的 CaptureTrace，记录各阶段完成时刻
 
         Returns:
             OCR识别结果
         """
-        logger.info(f"Processing image: {image_path}")
+        logger.info("Processing image: %s", image_path)
         try:
-            option = self.build_option()
-
-            # 初始化检测模型
-            det_option = option
-            det_option.set_trt_input_shape("x", [1, 3, 64, 64], [1, 3, 640, 640],
-                                       [1, 3, 960, 960])
-            det_model = fd.vision.ocr.DBDetector(
-                self.det_model_file, self.det_params_file, runtime_option=det_option)
-
-            # 初始化分类模型
-            cls_option = option
-            cls_option.set_trt_input_shape("x", [1, 3, 48, 10], [10, 3, 48, 320],
-                                           [64, 3, 48, 1024])
-            cls_model = fd.vision.ocr.Classifier(
-                self.cls_model_file, self.cls_params_file, runtime_option=cls_option)
-
-            # 初始化识别模型
-            rec_option = option
-            rec_option.set_trt_input_shape("x", [1, 3, 48, 10], [10, 3, 48, 320],
-                                           [64, 3, 48, 2304])
-            rec_model = fd.vision.ocr.Recognizer(
-                self.rec_model_file, self.rec_params_file, self.rec_label_file, runtime_option=rec_option)
-
-            # 组合成完整的OCR系统
-            ppocr_v3 = fd.vision.ocr.PPOCRv3(
-                det_model=det_model, cls_model=cls_model, rec_model=rec_model)
-
-            # 预测图片
+            mark = trace.mark if trace is not None else _no_mark
+
             image = cv2.imread(image_path)
             if image is None:
                 raise ValueError(f"Failed to read image: {image_path}")
+            mark('decode')
 
-            result = ppocr_v3.predict(image)
+            result = self.recognize(image, on_boxes, on_lines, trace)
 
             # 处理结果
             content = self._parse_result(result)
+            mark('layout')
             self._save_to_file(image_path.replace('.png', '.txt'), content)
-            pyperclip.copy(content)
+            mark('file_write')
+            if self.copy_to_clipboard:
+                pyperclip.copy(content)
+            mark('clipboard')
+            IMAGES_PROCESSED.inc()
             
             return result
             
         except Exception as e:
-            logger.error(f"Error processing image {image_path}: {str(e)}")
+            FAILURES.inc(component='ocr')
+            logger.error("Error processing image %s: %s", image_path, e)
+            raise
+
+    def process_array(self, image, on_boxes=None, on_lines=None, trace=None, copy_to_clipboard=None):
+        """处理内存中的图像，与 process_image 相同但不读写磁盘
+
+        Args:
+            image: BGR / BGRA / 灰度 ndarray，或 png/jpg 等编码后的字节
+            on_boxes: 检测完成回调
+            on_lines: 识别进度回调
+            trace: 可选的 CaptureTrace
+            copy_to_clipboard: 是否将结果复制到剪贴板，默认沿用初始化时的设置
+
+        Returns:
+            OCR识别结果
+        """
+        try:
+            mark = trace.mark if trace is not None else _no_mark
+
+            image = to_bgr(image)
+            mark('decode')
+
+            result = self.recognize(image, on_boxes, on_lines, trace)
+
+            content = self._parse_result(result)
+            mark('layout')
+            if self.copy_to_clipboard if copy_to_clipboard is None else copy_to_clipboard:
+                pyperclip.copy(content)
+            mark('clipboard')
+            IMAGES_PROCESSED.inc()
+
+            return result
+
+        except Exception as e:
+            FAILURES.inc(component='ocr')
+            logger.error("Error processing in-memory image: %s", e)
             raise
 
+    def recognize(self, image, on_boxes=None, on_lines=None, trace=None):
+        """识别内存中的图像，不写结果文件也不复制到剪贴板
+
+        Args:
+            image: BGR 图像
+            on_boxes: 检测完成回调
+            on_lines: 识别进度回调
+            trace: 可选的 CaptureTrace
+
+        Returns:
+            OCR识别结果
+        """
+        if self.pool is not None:
+            return self.pool.recognize(image, on_boxes, on_lines, trace)
+        runtimes = self._ensure_models()
+        mark = trace.mark if trace is not None else _no_mark
+        with self._inference_lock:
+            ENGINES_BUSY.inc()
+            try:
+                return self._predict(image, on_boxes, on_lines, mark, runtimes)
+            finally:
+                ENGINES_BUSY.dec()
+
+    def recognize_batch(self, images, traces=None, rec_batch_size=REC_BATCH_SIZE):
+        """一次推理识别多张内存中的图像
+
+        检测按缩放后尺寸分桶批量进行，所有图像的文本行汇集后统一分类，
+        并按宽高比排序分批识别，减少补齐带来的无效计算。
+
+        Args:
+            images: BGR 图像列表
+            traces: 与 images 对应的 CaptureTrace 列表，可为 None
+            rec_batch_size: 识别阶段每批文本行数量
+
+        Returns:
+            与 images 一一对应的 OCRResult 列表
+        """
+        if self.pool is not None:
+            # 多进程模式下各图像分发到不同工作进程并行识别
+            futures = [self.pool.submit(image, trace=trace)
+                       for image, trace in zip(images, traces or [None] * len(images))]
+            return [future.result() for future in futures]
+        runtimes = self._ensure_models()
+        marks = [trace.mark if trace is not None else _no_mark for trace in (traces or [None] * len(images))]
+        with self._inference_lock:
+            ENGINES_BUSY.inc()
+            try:
+                return self._predict_batch(images, marks, runtimes, rec_batch_size)
+            finally:
+                ENGINES_BUSY.dec()
+
+    def _predict_batch(self, images, marks, runtimes, rec_batch_size=REC_BATCH_SIZE):
+        det_runtime, cls_runtime, rec_runtime = runtimes
+        boxes = [[] for _ in images]
+        for bucket in self._det_buckets(images, det_runtime.max_side_len).values():
+            det_results = det_runtime.batch_predict([images[i] for i in bucket])
+            for i, det_result in zip(bucket, det_results):
+                if det_result.boxes:
+                    boxes[i] = fd.vision.ocr.sort_boxes([list(box) for box in det_result.boxes])
+                marks[i]('det')
+
+        # 按图像顺序汇集所有文本行，识别后按各图像的文本框数切回
+        crops = []
+        for image, image_boxes in zip(images, boxes):
+            crops.extend(self._crop_box(image, box) for box in image_boxes)
+
+        cls_labels, cls_scores = self._classify(cls_runtime, crops, rec_batch_size)
+        for mark in marks:
+            mark('cls')
+
+        # 宽高比相近的文本行放在同一批，批内补齐的宽度更小
+        texts, rec_scores = [None] * len(crops), [0.0] * len(crops)
+        order = sorted(range(len(crops)), key=lambda k: crops[k].shape[1] / crops[k].shape[0])
+        for start in range(0, len(order), rec_batch_size):
+            batch = order[start:start + rec_batch_size]
+            rec_result = rec_runtime.batch_predict([crops[k] for k in batch])
+            for k, text, score in zip(batch, rec_result.text, rec_result.rec_scores):
+                texts[k], rec_scores[k] = text, score
+        for mark in marks:
+            mark('rec')
+
+        results = []
+        offset = 0
+        for image_boxes in boxes:
+            end = offset + len(image_boxes)
+            result = fd.C.vision.OCRResult()
+            result.boxes = image_boxes
+            result.text = texts[offset:end]
+            result.rec_scores = rec_scores[offset:end]
+            result.cls_labels = list(cls_labels[offset:end])
+            result.cls_scores = list(cls_scores[offset:end])
+            results.append(result)
+            offset = end
+        return results
+
+    @staticmethod
+    def _det_buckets(images, max_side_len):
+        """按检测模型缩放后的尺寸对图像分桶
+
+        Returns:
+            {(高度桶, 宽度桶): [图像下标]}
+        """
+        buckets = {}
+        for i, image in enumerate(images):
+            height, width = image.shape[:2]
+            ratio = min(1.0, max_side_len / max(height, width))
+            key = (int(height * ratio) // DET_BUCKET_SIZE, int(width * ratio) // DET_BUCKET_SIZE)
+            buckets.setdefault(key, []).append(i)
+        return buckets
+
+    def _predict(self, image, on_boxes=None, on_lines=None, mark=None, runtimes=None):
+        """按 检测 -> 方向分类 -> 识别 的顺序逐阶段推理
+
+        Args:
+            image: BGR 图像
+            on_boxes: 检测完成回调
+            on_lines: 识别进度回调
+            mark: 阶段完成时的计时回调
+            runtimes: (检测, 分类, 识别) 模型，默认为当前常驻模型
+
+        Returns:
+            与 PPOCRv3.predict 结构一致的 OCRResult
+        """
+        mark = mark or _no_mark
+        det_runtime, cls_runtime, rec_runtime = runtimes or (self.det_runtime, self.cls_runtime, self.rec_runtime)
+        det_result = det_runtime.predict(image)
+        boxes = fd.vision.ocr.sort_boxes([list(box) for box in det_result.boxes]) if det_result.boxes else []
+        mark('det')
+        if on_boxes is not None:
+            on_boxes(boxes)
+
+        crops = [self._crop_box(image, box) for box in boxes]
+        cls_labels, cls_scores = self._classify(cls_runtime, crops)
+        mark('cls')
+
+        texts, rec_scores = [], []
+        for start in range(0, len(crops), REC_BATCH_SIZE):
+            rec_result = rec_runtime.batch_predict(crops[start:start + REC_BATCH_SIZE])
+            texts.extend(rec_result.text)
+            rec_scores.extend(rec_result.rec_scores)
+            if on_lines is not None:
+                on_lines(start, list(rec_result.text))
+        mark('rec')
+
+        result = fd.C.vision.OCRResult()
+        result.boxes = boxes
+        result.text = texts
+        result.rec_scores = rec_scores
+        result.cls_labels = list(cls_labels)
+        result.cls_scores = list(cls_scores)
+        return result
+
+    @staticmethod
+    def _classify(cls_runtime, crops, batch_size=REC_BATCH_SIZE):
+        """方向分类，判定为倒置的文本行原地旋转180度
+
+        Args:
+            cls_runtime: 方向分类模型
+            crops: 文本行图像列表
+            batch_size: 每批分类的文本行数量，避免文本行很多时一次占用大量内存
+
+        Returns:
+            (方向标签列表, 置信度列表)
+        """
+        cls_labels, cls_scores = [], []
+        for start in range(0, len(crops), batch_size):
+            cls_result = cls_runtime.batch_predict(crops[start:start + batch_size])
+            cls_labels.extend(cls_result.cls_labels)
+            cls_scores.extend(cls_result.cls_scores)
+        for i, (label, score) in enumerate(zip(cls_labels, cls_scores)):
+            if label % 2 == 1 and score > CLS_THRESH:
+                crops[i] = cv2.rotate(crops[i], cv2.ROTATE_180)
+        return cls_labels, cls_scores
+
+    def _crop_box(self, image, box):
+        """按四点文本框透视裁剪出文本行图像
+
+        Args:
+            image: BGR 图像
+            box: [x1, y1, x2, y2, x3, y3, x4, y4] 形式的文本框
+
+        Returns:
+            水平方向的文本行图像
+        """
+        points = np.array(box, dtype=np.float32).reshape(4, 2)
+        crop_width = max(1, int(max(np.linalg.norm(points[0] - points[1]),
+                                    np.linalg.norm(points[2] - points[3]))))
+        crop_height = max(1, int(max(np.linalg.norm(points[0] - points[3]),
+                                     np.linalg.norm(points[1] - points[2]))))
+        target = np.float32([[0, 0], [crop_width, 0],
+                             [crop_width, crop_height], [0, crop_height]])
+        matrix = cv2.getPerspectiveTransform(points, target)
+        crop = cv2.warpPerspective(image, matrix, (crop_width, crop_height),
+                                   borderMode=cv2.BORDER_REPLICATE,
+                                   flags=cv2.INTER_CUBIC)
+        # 竖排文本旋转为横排，与 FastDeploy 内部裁剪逻辑保持一致
+        if crop.shape[0] >= crop.shape[1] * 1.5:
+            crop = np.rot90(crop)
+        return np.ascontiguousarray(crop)
+
     def _parse_result(self, result):
         """解析OCR结果
 
@@ -136,6 +504,12 @@ class OCRProcessor:
             content += t
         return content
 
+    def close(self):
+        """停止工作进程，进程内模型随对象释放"""
+        if self.pool is not None:
+            self.pool.stop()
+            self.pool = None
+
     def _save_to_file(self, file_path, content):
         """保存结果到文件
 
@@ -0,0 +1,177 @@
+"""
+本地 HTTP OCR 服务
+在后台线程运行 uvicorn，复用文件监控所用的常驻 OCR 引擎，
+接收图片字节或本地路径并返回结构化识别结果
+
+接口:
+    POST /ocr          请求体为图片字节（png/jpg 等）
+    POST /ocr/path     请求体为 {"path": "..."}
+    GET  /health
+    GET  /metrics      Prometheus 文本格式指标
+"""
+
+import time
+import asyncio
+import logging
+import threading
+
+import cv2
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel
+
+from src.core.batch_scheduler import BatchScheduler
+from src.utils.latency_trace import CaptureTrace
+from src.utils.metrics import FAILURES, registry
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+# 单张图片请求体上限
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+# Server-Timing 中的阶段名，ready 为等待并发名额的时间
+TIMING_NAMES = {'ready': 'queue'}
+
+
+class PathRequest(BaseModel):
+    path: str
+
+
+def result_to_dict(processor, result):
+    """将 OCRResult 转为可序列化的结构"""
+    lines = []
+    for i, box in enumerate(result.boxes):
+        lines.append({
+            'text': result.text[i],
+            'score': float(result.rec_scores[i]) if i < len(result.rec_scores) else None,
+            'box': [int(v) for v in box],
+        })
+    return {'text': processor._parse_result(result), 'lines': lines}
+
+
+def create_app(get_processor, max_concurrency=2, max_queue=16, scheduler=None):
+    """创建 OCR 服务应用
+
+    Args:
+        get_processor: 返回当前常驻 OCRProcessor 的函数，引擎未就绪时返回 None
+        max_concurrency: 同时进入推理的请求数，启用微批时为同时解码的请求数
+        max_queue: 排队与推理中的请求总数上限，超出时返回 503
+        scheduler: 可选的 BatchScheduler，解码后的图像交由其合批推理
+    """
+    app = FastAPI(title="SnipasteOCR", docs_url=None, redoc_url=None)
+    state = {'pending': 0, 'semaphore': None}
+    lock = threading.Lock()
+
+    async def run(decode):
+        processor = get_processor()
+        if processor is None:
+            return JSONResponse({'error': 'OCR engine is not ready'}, status_code=503)
+        with lock:
+            if state['pending'] >= max_queue:
+                return JSONResponse({'error': 'Too many pending requests'}, status_code=503,
+                                    headers={'Retry-After': '1'})
+            state['pending'] += 1
+        if state['semaphore'] is None:
+            state['semaphore'] = asyncio.Semaphore(max_concurrency)
+
+        trace = CaptureTrace('http')
+        trace.mark('file_event')
+        try:
+            async with state['semaphore']:
+                trace.mark('ready')
+                image = await run_in_threadpool(decode)
+                if image is None:
+                    return JSONResponse({'error': 'Cannot decode image'}, status_code=400)
+                trace.mark('decode')
+                if scheduler is None:
+                    result = await run_in_threadpool(processor.recognize, image, None, None, trace)
+            if scheduler is not None:
+                result = await asyncio.wrap_future(scheduler.submit(image, trace))
+            body = result_to_dict(processor, result)
+            trace.mark('layout')
+        except Exception as e:
+            FAILURES.inc(component='service')
+            logger.error("OCR service request failed: %s", e)
+            return JSONResponse({'error': str(e)}, status_code=500)
+        finally:
+            with lock:
+                state['pending'] -= 1
+
+        durations = trace.durations()
+        body['timing_ms'] = {TIMING_NAMES.get(stage, stage): round(ms, 3) for stage, ms in durations.items()}
+        headers = {
+            'Server-Timing': ', '.join(f"{TIMING_NAMES.get(stage, stage)};dur={ms:.2f}"
+                                       for stage, ms in durations.items()),
+            'X-Processing-Time-Ms': f"{trace.total():.2f}",
+        }
+        return JSONResponse(body, headers=headers)
+
+    @app.post('/ocr')
+    async def ocr_bytes(request: Request):
+        data = await request.body()
+        if not data:
+            return JSONResponse({'error': 'Empty request body'}, status_code=400)
+        if len(data) > MAX_IMAGE_BYTES:
+            return JSONResponse({'error': 'Image too large'}, status_code=413)
+        return await run(lambda: cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR))
+
+    @app.post('/ocr/path')
+    async def ocr_path(request: PathRequest):
+        return await run(lambda: cv2.imread(request.path))
+
+    @app.get('/health')
+    async def health():
+        return {'ready': get_processor() is not None}
+
+    @app.get('/metrics')
+    async def metrics():
+        return PlainTextResponse(registry.render(), media_type='text/plain; version=0.0.4')
+
+    return app
+
+
+class OCRService:
+    """在后台线程运行的 uvicorn 服务"""
+
+    def __init__(self, get_processor, host="127.0.0.1", port=8765, max_concurrency=2, max_queue=16,
+                 batching=None):
+        """初始化 OCR 服务
+
+        Args:
+            get_processor: 返回当前常驻 OCRProcessor 的函数
+            host: 监听地址，默认仅本机可访问
+            port: 监听端口
+            max_concurrency: 同时进入推理的请求数
+            max_queue: 排队与推理中的请求总数上限
+            batching: 微批调度配置，见 BatchScheduler.from_config，为 None 时逐个推理
+        """
+        self.host = host
+        self.port = port
+        self.scheduler = BatchScheduler.from_config(get_processor, batching) if batching is not None else None
+        self.app = create_app(get_processor, max_concurrency, max_queue, self.scheduler)
+        self.server = uvicorn.Server(uvicorn.Config(self.app, host=host, port=port,
+                                                    log_level="warning", access_log=False))
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.run, name='ocr-service', daemon=True)
+        self._thread.start()
+        # 等待端口开始监听，失败时线程会直接退出
+        while not self.server.started and self._thread.is_alive():
+            time.sleep(0.01)
+        if not self.server.started:
+            if self.scheduler is not None:
+                self.scheduler.close()
+            raise OSError(f"OCR service failed to listen on {self.host}:{self.port}")
+        logger.info("OCR service listening on http://%s:%s", self.host, self.port)
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self.scheduler is not None:
+            self.scheduler.close()
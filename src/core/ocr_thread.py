@@ -4,16 +4,25 @@ import logging
 from PyQt6.QtCore import QThread, pyqtSignal
 from PyQt6.QtWidgets import QMessageBox
 from src.core.folder_monitor import FolderMonitor
-from src.utils.logging_config import setup_logging
+from src.core.model_registry import resolve_variant
+from src.utils.logging_config import setup_logging, summarize
 
 # Initialize logger for this module
 logger = logging.getLogger(__name__)
 
 class OCRThread(QThread):
     preview_signal = pyqtSignal(str, object)
+    detection_signal = pyqtSignal(str, object)
+    lines_signal = pyqtSignal(str, int, object)
     error_signal = pyqtSignal(str)
     
-    def __init__(self):
+    def __init__(self, path=None, modelpath=None):
+        """初始化OCR线程
+
+        Args:
+            path: 监控目录，默认读取配置文件
+            modelpath: 模型目录，默认读取配置文件
+        """
         super().__init__()
         setup_logging()
         self.running = True
@@ -25,8 +34,10 @@ class OCRThread(QThread):
             
             with open(config_path, 'r') as f:
                 config = yaml.safe_load(f)
-                self.path = config['snipaste']['path']
-                self.modelpath = config['snipaste'].get('modelpath', os.path.join(current_path, 'models'))
+                self.path = path or config['snipaste']['path']
+                self.modelpath = modelpath or config['snipaste'].get('modelpath', os.path.join(current_path, 'models'))
+                self.engine_config = config.get('engine') or {}
+                self.variant = resolve_variant(config.get('models'))
                 
                 # Validate model path
                 if not self.modelpath or not os.path.exists(self.modelpath):
@@ -42,8 +53,10 @@ class OCRThread(QThread):
     def run(self):
         logger.info("Starting OCR thread")
         try:
-            self.FolderMonitor = FolderMonitor(self.path, self.modelpath)
+            self.FolderMonitor = FolderMonitor(self.path, self.modelpath, self.engine_config, self.variant)
             self.FolderMonitor.result_signal.connect(self.handle_result)
+            self.FolderMonitor.boxes_signal.connect(self.handle_boxes)
+            self.FolderMonitor.lines_signal.connect(self.handle_lines)
         except Exception as e:
             error_msg = f"启动OCR服务失败: {str(e)}"
             logger.error(error_msg)
@@ -51,8 +64,19 @@ class OCRThread(QThread):
         
     def handle_result(self, image_path, result):
         if self.running:
-            logging.info(f"Received result: \n\n{result}\n\n")
+            logger.info("Received result for %s: %d lines", image_path, len(result.text))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Result text: %s", summarize(' | '.join(result.text)))
             self.preview_signal.emit(image_path, result)
+
+    def handle_boxes(self, image_path, boxes):
+        if self.running:
+            logger.info("Detected %d text boxes in %s", len(boxes), image_path)
+            self.detection_signal.emit(image_path, boxes)
+
+    def handle_lines(self, image_path, start, texts):
+        if self.running:
+            self.lines_signal.emit(image_path, start, texts)
             
     def stop(self):
         """停止OCR线程并清理资源"""
@@ -61,6 +85,8 @@ class OCRThread(QThread):
         if hasattr(self, 'FolderMonitor'):
             try:
                 self.FolderMonitor.result_signal.disconnect()
+                self.FolderMonitor.boxes_signal.disconnect()
+                self.FolderMonitor.lines_signal.disconnect()
             except Exception:
                 pass
             self.FolderMonitor.stop()
@@ -1,5 +1,5 @@
 import os
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QIcon, QCursor, QAction, QPalette
 from PyQt6.QtWidgets import (QMainWindow, QVBoxLayout, QLabel, QWidget, 
                           QMenu, QSystemTrayIcon, QFrame, QMessageBox, QHBoxLayout, QLineEdit, QPushButton, QFileDialog, QDialog, QFormLayout, QDialogButtonBox, QComboBox, QApplication)
@@ -10,7 +10,18 @@ import platform
 import pathlib
 
 from src.core.ocr_thread import OCRThread
-from src.ui.preview_window import PreviewWindow
+from src.core.control_server import ControlServer
+from src.core.ocr_service import OCRService
+from src.core.ipc_server import IPCServer
+from src.core.clipboard_source import ClipboardSource
+from src.ui.preview_manager import PreviewManager
+from src.utils.translator import TRANSLATOR_BACKENDS, create_translator
+from src.utils.translation_cache import TranslationCache, CachedTranslator
+from src.utils.translation_scheduler import TranslationScheduler
+from src.utils.latency_trace import latency_recorder
+from src.utils.metrics import MetricsServer
+from src.utils.profiler import profiler
+from src.utils.memory_governor import MemoryGovernor
 from src.utils.logging_config import setup_logging
 from ..core.resource_path import get_resource_path
 
@@ -20,6 +31,8 @@ logger = logging.getLogger(__name__)
 APP_NAME = "SnipasteOCR"
 
 class MainWindow(QMainWindow):
+    profile_finished = pyqtSignal(object)  # 性能分析结束信号，参数为结果文件路径列表
+
     def __init__(self):
         super().__init__()
         # Initialize logging
@@ -30,8 +43,15 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.central_widget)
         
         self.ocrThread = None
-        self.preview_window = None
+        self.preview_manager = PreviewManager(self)
         self.preview_enabled = True
+        # 剪贴板图片直接识别，不经过截图文件
+        self.clipboard_source = ClipboardSource(self._ocr_processor, self)
+        self.clipboard_source.result_signal.connect(self.show_preview)
+        self.clipboard_source.boxes_signal.connect(self.show_detection)
+        self.clipboard_source.lines_signal.connect(self.update_preview_lines)
+        self.clipboard_source.error_signal.connect(self.show_clipboard_error)
+        self.clipboard_watch = False
         
         # 添加翻译设置
         self.translation_settings = {
@@ -40,6 +60,16 @@ class MainWindow(QMainWindow):
             'from_lang': 'auto',
             'to_lang': 'zh'
         }
+        self.translator = None
+        self.translator_credentials = None
+        self.translation_options = {}
+        self.translation_cache = None
+        self.metrics_server = None
+        self.memory_governor = None
+        self.ocr_service = None
+        self.ipc_server = None
+        self.memory_timer = QTimer(self)
+        self.memory_timer.timeout.connect(self.check_memory)
         
         # 检测系统是否为暗色模式
         self.is_dark_mode = self.check_dark_mode()
@@ -51,6 +81,13 @@ class MainWindow(QMainWindow):
         
         # 创建翻译设置菜单
         self.create_translation_settings_menu()
+
+        # 本地控制通道，供命令行启停性能分析
+        self.profile_finished.connect(self.on_profile_finished)
+        profiler.on_finished = self.profile_finished.emit
+        self.control_server = ControlServer(self)
+        self.control_server.register('profile', self.handle_profile_command)
+        self.control_server.start()
         
     def initUI(self):
         self.setObjectName("MainWindow")
@@ -107,6 +144,34 @@ class MainWindow(QMainWindow):
         restartAction.setIcon(QIcon(get_resource_path('assets/icon.png')))
         restartAction.triggered.connect(self.restart)
         self.trayIconMenu.addAction(restartAction)
+
+        # 识别剪贴板图片
+        clipboardAction = QAction("识别剪贴板图片", self)
+        clipboardAction.setIcon(QIcon(get_resource_path('assets/icon.png')))
+        clipboardAction.triggered.connect(lambda: self.ocr_clipboard())
+        self.trayIconMenu.addAction(clipboardAction)
+
+        # 延迟统计
+        latencyAction = QAction("延迟统计", self)
+        latencyAction.setIcon(QIcon(get_resource_path('assets/icon.png')))
+        latencyAction.triggered.connect(self.showLatencyStats)
+        self.trayIconMenu.addAction(latencyAction)
+
+        # 性能分析
+        profileMenu = QMenu("性能分析", self)
+        profileMenu.setIcon(QIcon(get_resource_path('assets/icon.png')))
+        for text, mode, seconds, captures in (("采样分析 30 秒", 'sampling', 30, None),
+                                              ("采样分析 10 次截图", 'sampling', None, 10),
+                                              ("cProfile 分析 30 秒", 'cprofile', 30, None),
+                                              ("cProfile 分析 10 次截图", 'cprofile', None, 10)):
+            action = QAction(text, self)
+            action.triggered.connect(lambda checked, m=mode, s=seconds, c=captures: self.start_profiling(m, s, c))
+            profileMenu.addAction(action)
+        profileMenu.addSeparator()
+        stopProfileAction = QAction("停止并保存", self)
+        stopProfileAction.triggered.connect(profiler.stop)
+        profileMenu.addAction(stopProfileAction)
+        self.trayIconMenu.addMenu(profileMenu)
         
         self.trayIconMenu.addSeparator()
         
@@ -144,6 +209,8 @@ class MainWindow(QMainWindow):
             try:
                 self.ocrThread = OCRThread()
                 self.ocrThread.preview_signal.connect(self.show_preview)
+                self.ocrThread.detection_signal.connect(self.show_detection)
+                self.ocrThread.lines_signal.connect(self.update_preview_lines)
                 self.ocrThread.error_signal.connect(self.show_ocr_error)
                 self.ocrThread.start()
                 if hasattr(self, 'preview_button'):
@@ -631,18 +698,14 @@ class MainWindow(QMainWindow):
         self.loadConfig()
 
     def closeEvent(self, event):
-        if self.preview_window is not None:
-            self.preview_window.close()
-            self.preview_window = None
+        self.preview_manager.close_all()
         event.ignore()
         self.hide()
 
     def quit(self):
         try:
             logger.info("Quitting application")
-            if self.preview_window is not None:
-                self.preview_window.close()
-                self.preview_window = None
+            self.preview_manager.close_all()
 
             if self.ocrThread is not None and self.ocrThread.isRunning():
                 self.ocrThread.stop()
@@ -652,6 +715,26 @@ class MainWindow(QMainWindow):
                     self.ocrThread.terminate()
                     self.ocrThread.wait()
                 self.ocrThread = None
+
+            if self.translation_cache is not None:
+                self.translation_cache.close()
+
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+                self.metrics_server = None
+
+            if self.ocr_service is not None:
+                self.ocr_service.stop()
+                self.ocr_service = None
+
+            if self.ipc_server is not None:
+                self.ipc_server.stop()
+                self.ipc_server = None
+
+            self.clipboard_source.close()
+
+            profiler.stop()
+            self.control_server.stop()
             
             QApplication.quit()
         except Exception as e:
@@ -668,12 +751,29 @@ class MainWindow(QMainWindow):
         elif reason == QSystemTrayIcon.ActivationReason.DoubleClick and not self.isHidden():
             self.hide()
 
+    def show_detection(self, image_path, boxes):
+        """检测完成后立即显示带占位符的预览窗口"""
+        if self.preview_enabled:
+            self.preview_manager.open(image_path, boxes=boxes)
+
+    def update_preview_lines(self, image_path, start, texts):
+        """将新识别出的文本行填入对应的预览窗口"""
+        window = self.preview_manager.find(image_path)
+        if window is not None:
+            window.update_lines(start, texts)
+
     def show_preview(self, image_path, result):
         if self.preview_enabled:  # 只在开启预览时显示窗口
-            if self.preview_window is not None:
-                self.preview_window.close()
-            self.preview_window = PreviewWindow(self, image_path, result)
-            self.preview_window.show()
+            window = self.preview_manager.find(image_path)
+            if window is not None:
+                window.set_result(result)
+            elif not self.preview_manager.was_closed(image_path):  # 用户已在识别过程中关闭该预览时不再弹出
+                window = self.preview_manager.open(image_path, result)
+            trace = latency_recorder.get(image_path)
+            if window is not None and trace is not None:
+                trace.mark('preview_shown')
+        self.preview_manager.discard_image(image_path)
+        latency_recorder.finish(image_path)
 
     def toggleWindow(self):
         if self.isHidden():
@@ -700,8 +800,52 @@ class MainWindow(QMainWindow):
                               <p>4. 同时会显示识别预览窗口</p>
                               <h3>快捷操作：</h3>
                               <p>- 双击托盘图标：显示/隐藏主窗口</p>
+                              <p>- 托盘菜单「识别剪贴板图片」：直接识别剪贴板中的图片</p>
                               <p>- ESC键：关闭预览窗口</p>""")
 
+    def showLatencyStats(self):
+        summary = latency_recorder.summary()
+        box = QMessageBox(self)
+        box.setWindowTitle("延迟统计")
+        if latency_recorder.histograms['total'].count:
+            box.setText(f"<p>各阶段耗时（毫秒）：</p><pre>{summary}</pre>")
+        else:
+            box.setText("暂无截图识别记录")
+        export_button = box.addButton("导出JSON", QMessageBox.ButtonRole.ActionRole)
+        box.addButton(QMessageBox.StandardButton.Close)
+        box.exec()
+        if box.clickedButton() == export_button:
+            path, _ = QFileDialog.getSaveFileName(self, '导出延迟统计', 'latency.json', 'JSON (*.json)')
+            if path:
+                try:
+                    latency_recorder.export_json(path)
+                except Exception as e:
+                    logger.error(f"Failed to export latency statistics: {str(e)}")
+                    QMessageBox.warning(self, '错误', f'导出延迟统计失败: {str(e)}')
+
+    def start_profiling(self, mode, seconds=None, captures=None):
+        try:
+            profiler.start(mode, seconds=seconds, captures=captures)
+        except RuntimeError as e:
+            QMessageBox.warning(self, '性能分析', f'无法开始分析: {str(e)}')
+            return
+        limit = f'{seconds} 秒' if seconds is not None else f'{captures} 次截图'
+        self.trayIcon.showMessage('性能分析', f'已开始 {mode} 分析，持续 {limit}')
+
+    def handle_profile_command(self, action, mode='sampling', seconds=None, captures=None):
+        """控制通道的 profile 命令"""
+        if action == 'start':
+            profiler.start(mode, seconds=seconds, captures=captures)
+            return profiler.status()
+        if action == 'stop':
+            return {'files': profiler.stop()}
+        return profiler.status()
+
+    def on_profile_finished(self, paths):
+        logger.info("Profiling results: %s", paths)
+        if paths:
+            self.trayIcon.showMessage('性能分析', f'分析结果已保存到 {os.path.dirname(paths[0])}')
+
     def setupSettings(self):
         # Snipaste path setting
         snipaste_layout = QHBoxLayout()
@@ -771,6 +915,17 @@ class MainWindow(QMainWindow):
                         'from_lang': config['translation'].get('from_lang', 'auto'),
                         'to_lang': config['translation'].get('to_lang', 'zh')
                     })
+                    self.translation_options = config['translation']
+
+                preview_config = config.get('preview') or {}
+                self.preview_manager.max_open = preview_config.get('max_open', 1)
+                self.preview_manager.pool_size = preview_config.get('pool_size', 2)
+
+                self.apply_metrics_config(config.get('metrics') or {})
+                self.apply_memory_config(config.get('memory') or {})
+                self.apply_service_config(config.get('service') or {})
+                self.apply_ipc_config(config.get('ipc') or {})
+                self.apply_clipboard_config(config.get('clipboard') or {})
         except FileNotFoundError:
             logger.warning(f"Configuration file not found at {config_path}. Using defaults.")
             if hasattr(self, 'snipaste_path'):
@@ -818,8 +973,12 @@ class MainWindow(QMainWindow):
                 }
             }
             
-            # 合并配置
-            existing_config.update(config)
+            # 合并配置，保留各分组中未在界面上编辑的其他配置项
+            for section, values in config.items():
+                if isinstance(existing_config.get(section), dict):
+                    existing_config[section].update(values)
+                else:
+                    existing_config[section] = values
             
             # 保存配置
             with open(config_path, 'w', encoding='utf-8') as f:
@@ -837,6 +996,8 @@ class MainWindow(QMainWindow):
             # 创建新的OCR线程
             self.ocrThread = OCRThread()
             self.ocrThread.preview_signal.connect(self.show_preview)
+            self.ocrThread.detection_signal.connect(self.show_detection)
+            self.ocrThread.lines_signal.connect(self.update_preview_lines)
             self.ocrThread.error_signal.connect(self.show_ocr_error)
             self.ocrThread.start()
 
@@ -853,9 +1014,7 @@ class MainWindow(QMainWindow):
     def restart(self):
         try:
             logger.info("Restarting application")
-            if self.preview_window is not None:
-                self.preview_window.close()
-                self.preview_window = None
+            self.preview_manager.close_all()
 
             if self.ocrThread is not None and self.ocrThread.isRunning():
                 self.ocrThread.stop()
@@ -968,9 +1127,180 @@ class MainWindow(QMainWindow):
             # 保存配置
             self.saveConfig()
             
+    def apply_metrics_config(self, metrics_config):
+        """按配置启动或停止本地指标端点"""
+        address = (metrics_config.get('host', '127.0.0.1'), metrics_config.get('port', 9464))
+        if self.metrics_server is not None:
+            if metrics_config.get('enabled') and (self.metrics_server.host, self.metrics_server.port) == address:
+                return
+            self.metrics_server.stop()
+            self.metrics_server = None
+        if metrics_config.get('enabled'):
+            try:
+                self.metrics_server = MetricsServer(*address).start()
+            except OSError as e:
+                logger.error(f"Failed to start metrics endpoint on {address[0]}:{address[1]}: {str(e)}")
+
+    def apply_service_config(self, service_config):
+        """按配置启动或停止本地 HTTP OCR 服务"""
+        address = (service_config.get('host', '127.0.0.1'), service_config.get('port', 8765))
+        if self.ocr_service is not None:
+            if service_config.get('enabled') and (self.ocr_service.host, self.ocr_service.port) == address:
+                return
+            self.ocr_service.stop()
+            self.ocr_service = None
+        if service_config.get('enabled'):
+            try:
+                self.ocr_service = OCRService(self._ocr_processor, *address,
+                                              max_concurrency=service_config.get('max_concurrency', 2),
+                                              max_queue=service_config.get('max_queue', 16),
+                                              batching=service_config.get('batching')).start()
+            except OSError as e:
+                logger.error(f"Failed to start OCR service on {address[0]}:{address[1]}: {str(e)}")
+
+    def apply_ipc_config(self, ipc_config):
+        """按配置启动或停止本地 IPC OCR 通道"""
+        address = ipc_config.get('address') or None
+        if self.ipc_server is not None:
+            if ipc_config.get('enabled') and address in (None, self.ipc_server.address):
+                return
+            self.ipc_server.stop()
+            self.ipc_server = None
+        if ipc_config.get('enabled'):
+            try:
+                self.ipc_server = IPCServer(self._ocr_processor, address).start()
+            except OSError as e:
+                logger.error(f"Failed to start OCR IPC channel: {str(e)}")
+
+    def apply_clipboard_config(self, clipboard_config):
+        """按配置开关剪贴板监听，开启后复制到剪贴板的图片自动识别"""
+        watch = bool(clipboard_config.get('watch', False))
+        if watch == self.clipboard_watch:
+            return
+        clipboard = QApplication.clipboard()
+        if watch:
+            clipboard.dataChanged.connect(self.on_clipboard_changed)
+        else:
+            clipboard.dataChanged.disconnect(self.on_clipboard_changed)
+        self.clipboard_watch = watch
+
+    def on_clipboard_changed(self):
+        # 识别结果写回剪贴板时同样会触发，此时剪贴板中只有文本；
+        # Snipaste 的截图已保存到监控文件夹，跳过以免重复识别
+        self.ocr_clipboard(notify=False, skip_snipaste=True)
+
+    def ocr_clipboard(self, notify=True, skip_snipaste=False):
+        """识别剪贴板中的图片
+
+        Args:
+            notify: 剪贴板中没有图片时是否提示
+            skip_snipaste: 是否跳过 Snipaste 自身放入剪贴板的截图
+        """
+        key, image = self.clipboard_source.capture(QApplication.clipboard(), skip_snipaste)
+        if key is None:
+            if notify:
+                self.trayIcon.showMessage(APP_NAME, "剪贴板中没有图片")
+            return
+        if self.preview_enabled:
+            self.preview_manager.register_image(key, image)
+
+    def show_clipboard_error(self, key, error_msg):
+        self.preview_manager.discard_image(key)
+        self.trayIcon.showMessage(APP_NAME, error_msg, QSystemTrayIcon.MessageIcon.Warning)
+
+    def apply_memory_config(self, memory_config):
+        """按配置启停内存管控"""
+        self.memory_timer.stop()
+        if not memory_config.get('enabled', True):
+            self.memory_governor = None
+            return
+        governor = MemoryGovernor(ceiling_mb=memory_config.get('ceiling_mb', 1536),
+                                  growth_mb=memory_config.get('growth_mb', 200))
+        governor.register('engines', lambda: getattr(self._ocr_processor(), 'engine_memory', 0))
+        governor.register('translation_cache',
+                          lambda: self.translation_cache.memory_usage() if self.translation_cache else 0,
+                          lambda: self.translation_cache and self.translation_cache.clear_memory())
+        governor.register('previews', self.preview_manager.memory_usage, self.preview_manager.trim)
+        governor.recycle = lambda: bool(self._ocr_processor() and self._ocr_processor().recycle_engines())
+        # 使用工作进程时引擎内存不在本进程中，需另外计入
+        governor.external_rss = lambda: (self._ocr_processor().engine_memory
+                                         if self._ocr_processor() and self._ocr_processor().pool else 0)
+        self.memory_governor = governor
+        self.memory_timer.start(int(memory_config.get('check_interval_s', 15) * 1000))
+
+    def check_memory(self):
+        if self.memory_governor is not None:
+            self.memory_governor.check()
+
+    def _ocr_processor(self):
+        """当前 OCR 线程使用的处理器，服务未启动时返回 None"""
+        monitor = getattr(self.ocrThread, 'FolderMonitor', None)
+        return monitor.ocr_processor if monitor is not None else None
+
     def get_translation_settings(self):
         return self.translation_settings.copy()
 
+    def get_translation_options(self):
+        return dict(self.translation_options)
+
+    def get_translator(self):
+        """获取共享的翻译器，后端或密钥变更时重建，以便跨预览窗口复用长连接"""
+        engine = self.get_translation_engine()
+        secret_id = self.translation_settings.get('secret_id', '')
+        secret_key = self.translation_settings.get('secret_key', '')
+        if self.translator is None or self.translator_credentials != (engine, secret_id, secret_key):
+            if self.translator is not None:
+                self.translator.close()
+            translator = TranslationScheduler(
+                create_translator(engine, {**self.translation_options, **self.translation_settings}),
+                qps=self.translation_options.get('qps', 5),
+                concurrency=self.translation_options.get('concurrency', 4),
+                max_retries=self.translation_options.get('max_retries', 3)
+            )
+            cache = self.get_translation_cache()
+            self.translator = CachedTranslator(translator, cache) if cache is not None else translator
+            self.translator_credentials = (engine, secret_id, secret_key)
+        return self.translator
+
+    def get_translation_engine(self):
+        """配置中的翻译后端名称，未知名称回退为腾讯云"""
+        engine = self.translation_options.get('engine', 'tencent')
+        if engine not in TRANSLATOR_BACKENDS:
+            logger.warning(f"Unknown translation engine {engine}, falling back to tencent")
+            return 'tencent'
+        return engine
+
+    def is_translation_configured(self):
+        """当前翻译后端所需的密钥是否已填写"""
+        if not TRANSLATOR_BACKENDS[self.get_translation_engine()].requires_credentials:
+            return True
+        return bool(self.translation_settings.get('secret_id') and self.translation_settings.get('secret_key'))
+
+    def get_speculative_budget(self):
+        """开启预翻译时返回每日字符预算，未开启或缺少密钥、缓存时返回 None"""
+        if not self.translation_options.get('speculative', False):
+            return None
+        if not self.is_translation_configured():
+            return None
+        if self.get_translation_cache() is None:
+            return None
+        return self.translation_options.get('daily_char_budget', 20000)
+
+    def get_translation_cache(self):
+        """获取翻译缓存，未启用或打开失败时返回 None"""
+        cache_settings = self.translation_options.get('cache') or {}
+        if self.translation_cache is None and cache_settings.get('enabled', True):
+            try:
+                self.translation_cache = TranslationCache(
+                    memory_size=cache_settings.get('memory_size', 2048),
+                    max_entries=cache_settings.get('max_entries', 50000),
+                    max_age_days=cache_settings.get('max_age_days', 30)
+                )
+            except Exception as e:
+                logger.error(f"Failed to open translation cache: {str(e)}")
+                self.translation_options['cache'] = dict(cache_settings, enabled=False)
+        return self.translation_cache
+
     def toggle_autostart(self):
         """切换开机自启动状态 (Cross-platform)"""
         current_os = platform.system()
@@ -0,0 +1,126 @@
+"""
+预览窗口管理模块
+复用少量预览窗口并限制同时打开的数量，窗口关闭后立即释放图片与识别结果
+"""
+
+import logging
+from collections import OrderedDict, deque
+
+from src.core.clipboard_source import KEY_PREFIX
+from src.ui.preview_window import PreviewWindow
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+
+class PreviewManager:
+    def __init__(self, parent, max_open=1, pool_size=2):
+        """初始化预览管理器
+
+        Args:
+            parent: 主窗口
+            max_open: 同时打开的预览窗口上限，超出时关闭最早打开的窗口
+            pool_size: 关闭后保留以备复用的空闲窗口数量
+        """
+        self.parent = parent
+        self.max_open = max_open
+        self.pool_size = pool_size
+        self.open_windows = []  # 按打开顺序排列
+        self.idle_windows = []
+        # 最近关闭的预览对应的图片，识别结果稍后到达时不再重新弹出
+        self.recently_closed = deque(maxlen=16)
+        # 不经过磁盘的图片，按标识保存到对应预览打开或识别结束为止
+        self.memory_images = OrderedDict()
+
+    def register_image(self, key, image):
+        """登记内存中的图片，之后以 key 打开预览时直接使用
+
+        识别队列本身持有这些图片，在识别结束前保留不会额外占用内存
+
+        Args:
+            key: 代替图片路径的标识
+            image: BGR 图片
+        """
+        self.memory_images[key] = image
+
+    def discard_image(self, key):
+        """识别结束或失败后丢弃尚未显示的内存图片"""
+        self.memory_images.pop(key, None)
+
+    def open(self, image_path, ocr_result=None, boxes=None):
+        """打开一个预览窗口，优先复用空闲窗口
+
+        Returns:
+            打开的预览窗口，内存图片已不可用时返回 None
+        """
+        if image_path.startswith(KEY_PREFIX) and image_path not in self.memory_images:
+            logger.warning("Skipped preview of %s, image is no longer available", image_path)
+            return None
+        while len(self.open_windows) >= max(1, self.max_open):
+            oldest = self.open_windows[0]
+            oldest.close()
+            if oldest in self.open_windows:
+                self._on_closed(oldest)
+
+        window = self.idle_windows.pop() if self.idle_windows else self._create()
+        window.load(image_path, ocr_result, boxes, self.memory_images.pop(image_path, None))
+        if image_path in self.recently_closed:
+            self.recently_closed.remove(image_path)
+        self.open_windows.append(window)
+        window.show()
+        self.log_usage()
+        return window
+
+    def find(self, image_path):
+        """返回正在显示该图片的预览窗口，没有时返回 None"""
+        for window in reversed(self.open_windows):
+            if window.image_path == image_path:
+                return window
+        return None
+
+    def was_closed(self, image_path):
+        """该图片的预览是否已被关闭"""
+        return image_path in self.recently_closed
+
+    def close_all(self):
+        for window in list(self.open_windows):
+            window.close()
+
+    def trim(self):
+        """销毁全部空闲窗口，内存紧张时调用"""
+        while self.idle_windows:
+            self._destroy(self.idle_windows.pop())
+
+    def memory_usage(self):
+        """所有预览窗口持有的内存字节数"""
+        return (sum(window.memory_usage() for window in self.open_windows + self.idle_windows)
+                + sum(image.nbytes for image in self.memory_images.values()))
+
+    def log_usage(self):
+        logger.info(f"Previews: {len(self.open_windows)} open, {len(self.idle_windows)} pooled, "
+                    f"holding {self.memory_usage() / 1024 / 1024:.1f} MB")
+
+    def _create(self):
+        window = PreviewWindow(self.parent)
+        window.closed.connect(self._on_closed)
+        return window
+
+    def _on_closed(self, window):
+        if window not in self.open_windows:
+            return
+        self.open_windows.remove(window)
+        self.recently_closed.append(window.image_path)
+        window.release()
+        if len(self.idle_windows) < self.pool_size:
+            self.idle_windows.append(window)
+        else:
+            self._destroy(window)
+        self.log_usage()
+
+    def _destroy(self, window):
+        """销毁窗口，预翻译线程仍在运行时等其结束后再销毁"""
+        window.closed.disconnect(self._on_closed)
+        if window.speculative_thread is not None:
+            window.speculative_thread.finished.connect(window.deleteLater)
+        else:
+            window.deleteLater()
@@ -1,62 +1,118 @@
 import cv2
-from PyQt6.QtCore import Qt, QRect, QThread, pyqtSignal
-from PyQt6.QtGui import QFont, QPainter, QPixmap, QImage, QColor
+import logging
+import math
+import threading
+from PyQt6.QtCore import Qt, QPoint, QPointF, QRect, QRectF, QThread, QTimer, pyqtSignal
+from PyQt6.QtGui import QFont, QPainter, QPixmap, QImage, QColor, QTransform
 from PyQt6.QtWidgets import QWidget, QApplication, QPushButton, QMessageBox, QLabel
-from src.utils.translator import TencentTranslator
+from src.utils.paragraph_merger import paragraph_sources, translate_by_paragraph
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
 
 class TranslationThread(QThread):
     finished = pyqtSignal(list)  # 翻译完成信号
     error = pyqtSignal(str)      # 错误信号
     
-    def __init__(self, translator, texts, source_lang, target_lang):
+    def __init__(self, translator, texts, source_lang, target_lang, boxes=None):
         super().__init__()
         self.translator = translator
         self.texts = texts
         self.source_lang = source_lang
         self.target_lang = target_lang
+        self.boxes = boxes  # 提供文本框时先合并段落再翻译
         
     def run(self):
         try:
-            translated_texts = []
-            for text in self.texts:
-                translated = self.translator.translate(
-                    text,
+            # 批量接口按限制自动分片，通常一次请求即可完成整张截图
+            def translate_batch(texts):
+                return self.translator.translate_batch(
+                    texts,
                     source_lang=self.source_lang,
                     target_lang=self.target_lang
                 )
-                translated_texts.append(translated)
+
+            if self.boxes is not None:
+                translated_texts, count = translate_by_paragraph(translate_batch, self.boxes, self.texts)
+                logger.info("Merged %d lines into %d paragraphs for translation", len(self.texts), count)
+            else:
+                translated_texts = translate_batch(self.texts)
             self.finished.emit(translated_texts)
         except Exception as e:
             self.error.emit(str(e))
 
+class SpeculativeTranslationThread(QThread):
+    """识别完成后在后台低优先级预翻译，结果只写入翻译缓存"""
+
+    def __init__(self, translator, texts, source_lang, target_lang, daily_char_budget, boxes=None):
+        super().__init__()
+        self.translator = translator
+        # 与 TranslationThread 使用相同的段落合并，保证缓存键一致
+        self.texts = paragraph_sources(boxes, texts)[1] if boxes is not None else texts
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.daily_char_budget = daily_char_budget
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            self.translator.prefetch(
+                self.texts,
+                self.source_lang,
+                self.target_lang,
+                self.daily_char_budget,
+                cancel_event=self.cancel_event
+            )
+        except Exception as e:
+            logger.warning("Speculative translation failed: %s", e)
+
+    def cancel(self):
+        self.cancel_event.set()
+
 class PreviewWindow(QWidget):
-    def __init__(self, parent, image_path, ocr_result):
+    PLACEHOLDER_TEXT = '识别中...'
+    BG_COLOR = QColor(0, 0, 0, 160)  # 黑色背景，透明度为160
+    BORDER_COLOR = QColor(46, 204, 113, 200)  # 绿色边框
+    TEXT_COLOR = QColor(255, 255, 255)  # 白色文本
+    PLACEHOLDER_COLOR = QColor(160, 160, 160)
+    OVERLAY_FONT = None  # 首次创建窗口时初始化，QFont 需要在 QApplication 之后创建
+    FIT_MARGIN = 0.9  # 预览窗口最多占用可用屏幕区域的比例
+    MAX_ZOOM = 4.0  # 相对原图的最大放大倍数
+    ZOOM_STEP = 1.25
+
+    closed = pyqtSignal(object)  # 窗口关闭信号，参数为窗口自身
+
+    def __init__(self, parent, image_path=None, ocr_result=None, boxes=None):
         super().__init__(parent, Qt.WindowType.Window)
         self.parent = parent
-        self.image_path = image_path
-        self.ocr_result = ocr_result
+        self.image_path = None
+        self.image = None  # 不经过磁盘的图片，如剪贴板图片
+        self.ocr_result = None
+        # 文本框与逐行文本，识别完成前未返回的行为 None，以占位符显示
+        self.boxes = []
+        self.texts = []
+        self.pixmap = None  # 按屏幕缩小后的位图
+        self.full_pixmap = None  # 原图位图，仅在放大后载入
+        self.image_size = (0, 0)
+        self.fit_scale = 1.0  # 适应屏幕时窗口像素与原图像素之比
+        self.zoom = 1.0  # 在适应屏幕基础上的放大倍数
+        self.offset = QPointF(0, 0)  # 窗口左上角对应的原图坐标
+        self._drag_pos = None
         self.translated_text = []  # 存储翻译后的文本
         self.is_translated = False  # 是否显示翻译
         self.translation_thread = None  # 翻译线程
+        self.speculative_thread = None  # 预翻译线程，取消后保留到其 finished 为止
+        self._speculative_pending = False  # 上一个预翻译线程结束后再开始预翻译
+        self._frame = None  # 缓存的图片与文本框叠加层
+        self._frame_origin = QPointF(0, 0)  # 叠加层左上角对应的原图坐标
+        if PreviewWindow.OVERLAY_FONT is None:
+            PreviewWindow.OVERLAY_FONT = QFont('Microsoft YaHei', 11)  # 使用微软雅黑字体
+            PreviewWindow.OVERLAY_FONT.setWeight(QFont.Weight.Medium)
         self.initUI()
+        if image_path is not None:
+            self.load(image_path, ocr_result, boxes)
         
     def initUI(self):
-        # 读取图片并获取尺寸
-        image = cv2.imread(self.image_path)
-        height, width = image.shape[:2]
-        
-        # 设置窗口大小和位置
-        self.setGeometry(0, 0, width, height)
-        screen = QApplication.primaryScreen().geometry()
-        self.move(int((screen.width() - width) / 2), int((screen.height() - height) / 2))
-        
-        # 转换图片为QPixmap
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        h, w, ch = image_rgb.shape
-        bytes_per_line = ch * w
-        image_qt = QImage(image_rgb.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-        self.pixmap = QPixmap.fromImage(image_qt)
-        
         # 添加翻译按钮
         self.translate_btn = QPushButton('翻译', self)
         self.translate_btn.setGeometry(10, 10, 60, 30)
@@ -96,35 +152,245 @@ class PreviewWindow(QWidget):
                 background-color: transparent;
             }
         """)
+
+    def load(self, image_path, ocr_result=None, boxes=None, image=None):
+        """载入截图及其识别结果，窗口关闭后可被预览管理器重复使用
+
+        Args:
+            image_path: 图片路径，内存图片时为其标识
+            ocr_result: 完整识别结果，渐进显示时为 None
+            boxes: 仅有检测结果时的文本框列表
+            image: 内存中的 BGR 图片，提供时不再读取 image_path
+        """
+        self.image_path = image_path
+        self.image = image
+        self.ocr_result = ocr_result
+        if ocr_result is not None:
+            self.boxes = list(ocr_result.boxes)
+            self.texts = list(ocr_result.text)
+        else:
+            self.boxes = list(boxes or [])
+            self.texts = [None] * len(self.boxes)
+        self.translated_text = []
+        self.is_translated = False
+        self.translate_btn.setText('翻译')
+        self.translate_btn.setEnabled(ocr_result is not None)
+        self.loading_label.hide()
+        self._load_image()
+        self._frame = None
+        if ocr_result is not None:
+            self.start_speculative_translation()
+
+    def _load_image(self):
+        # 读取图片并获取尺寸
+        image = self._read_image()
+        height, width = image.shape[:2]
+        self.image_size = (width, height)
+
+        # 按可用屏幕区域缩放窗口，大截图不再超出屏幕
+        screen = QApplication.primaryScreen()
+        available = screen.availableGeometry()
+        self.fit_scale = min(1.0, available.width() * self.FIT_MARGIN / width,
+                             available.height() * self.FIT_MARGIN / height)
+        self.zoom = 1.0
+        self.offset = QPointF(0, 0)
+        view_width = max(1, round(width * self.fit_scale))
+        view_height = max(1, round(height * self.fit_scale))
+        self.setGeometry(0, 0, view_width, view_height)
+        self.move(available.x() + (available.width() - view_width) // 2,
+                  available.y() + (available.height() - view_height) // 2)
+
+        # 只按显示所需的物理像素构建一次缩小的位图，原图在放大时才载入
+        pixel_scale = self.fit_scale * screen.devicePixelRatio()
+        if pixel_scale < 1.0:
+            size = (max(1, round(width * pixel_scale)), max(1, round(height * pixel_scale)))
+            self.pixmap = self._to_pixmap(cv2.resize(image, size, interpolation=cv2.INTER_AREA))
+            self.full_pixmap = None
+        else:
+            self.pixmap = self._to_pixmap(image)
+            self.full_pixmap = self.pixmap
+
+    @staticmethod
+    def _to_pixmap(image):
+        # 转换图片为QPixmap
+        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        h, w, ch = image_rgb.shape
+        bytes_per_line = ch * w
+        image_qt = QImage(image_rgb.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
+        return QPixmap.fromImage(image_qt)
+
+    def _read_image(self):
+        return self.image if self.image is not None else cv2.imread(self.image_path)
+
+    def _source_pixmap(self):
+        """返回当前缩放下绘制所用的位图，放大超过缩小位图的精度时载入原图"""
+        needed = self.fit_scale * self.zoom * self.devicePixelRatioF()
+        if self.full_pixmap is None and needed > self.pixmap.width() / self.image_size[0]:
+            self.full_pixmap = self._to_pixmap(self._read_image())
+            logger.info("Loaded full resolution preview for %s", self.image_path)
+        return self.full_pixmap if self.full_pixmap is not None else self.pixmap
+
+    def _transform(self, origin=None):
+        """原图坐标到窗口坐标的变换，origin 为窗口左上角对应的原图坐标，默认为当前偏移"""
+        scale = self.fit_scale * self.zoom
+        origin = self.offset if origin is None else origin
+        return QTransform().scale(scale, scale).translate(-origin.x(), -origin.y())
+
+    def _clamp_offset(self):
+        scale = self.fit_scale * self.zoom
+        max_x = max(0.0, self.image_size[0] - self.width() / scale)
+        max_y = max(0.0, self.image_size[1] - self.height() / scale)
+        self.offset = QPointF(min(max(self.offset.x(), 0.0), max_x),
+                              min(max(self.offset.y(), 0.0), max_y))
+
+    def set_zoom(self, zoom, anchor=None):
+        """以窗口坐标 anchor 为中心缩放，zoom 为 1 时适应屏幕
+
+        Args:
+            zoom: 在适应屏幕基础上的放大倍数
+            anchor: 缩放中心，默认为窗口中心
+        """
+        if not self.image_size[0]:
+            return
+        if anchor is None:
+            anchor = QPointF(self.width() / 2, self.height() / 2)
+        zoom = min(max(zoom, 1.0), max(1.0, self.MAX_ZOOM / self.fit_scale))
+        old_scale = self.fit_scale * self.zoom
+        new_scale = self.fit_scale * zoom
+        image_point = self.offset + anchor / old_scale
+        self.zoom = zoom
+        self.offset = image_point - anchor / new_scale
+        self._clamp_offset()
+        if zoom == 1.0 and self.full_pixmap is not self.pixmap:
+            self.full_pixmap = None  # 回到适应屏幕后释放原图
+        self.invalidate_overlay()
+
+    def release(self):
+        """释放图片、叠加层与识别结果，窗口关闭后调用"""
+        self._stop_threads()
+        self.image = None
+        self.pixmap = None
+        self.full_pixmap = None
+        self._frame = None
+        self.ocr_result = None
+        self.boxes = []
+        self.texts = []
+        self.translated_text = []
+
+    def memory_usage(self):
+        """估算窗口持有的图片、叠加层与识别结果占用的字节数"""
+        total = 0
+        pixmaps = [self.pixmap, self._frame]
+        if self.full_pixmap is not self.pixmap:
+            pixmaps.append(self.full_pixmap)
+        for pixmap in pixmaps:
+            if pixmap is not None and not pixmap.isNull():
+                total += pixmap.width() * pixmap.height() * pixmap.depth() // 8
+        if self.image is not None:
+            total += self.image.nbytes
+        total += len(self.boxes) * 8 * 8
+        total += sum(len(text) * 4 for text in self.texts if text)
+        total += sum(len(text) * 4 for text in self.translated_text if text)
+        return total
         
+    def update_lines(self, start, texts):
+        """填充一批已识别的文本行
+
+        Args:
+            start: 该批首行在文本框列表中的下标
+            texts: 该批识别文本
+        """
+        indices = [start + offset for offset in range(len(texts)) if start + offset < len(self.texts)]
+        old_texts = self._overlay_texts()
+        old_texts = [old_texts[index] for index in indices]
+        for index in indices:
+            self.texts[index] = texts[index - start]
+        if self._frame is None:
+            self.update()
+            return
+        # 排版不变，只在缓存的叠加层中重画这些行所在的区域
+        self._redraw_labels(indices, old_texts)
+
+    def set_result(self, ocr_result):
+        """设置完整识别结果，替换全部占位符并启用翻译"""
+        self.ocr_result = ocr_result
+        self.boxes = list(ocr_result.boxes)
+        self.texts = list(ocr_result.text)
+        self.translate_btn.setEnabled(True)
+        self.invalidate_overlay()
+        self.start_speculative_translation()
+
+    def start_speculative_translation(self):
+        """开启预翻译时，在后台把识别结果提前翻译进缓存"""
+        budget = self.parent.get_speculative_budget()
+        if budget is None or not self.texts:
+            return
+        if self.speculative_thread is not None:
+            # 复用窗口时上一张截图的预翻译可能仍在收尾，等其结束后再开始
+            self._speculative_pending = True
+            return
+        self._speculative_pending = False
+        settings = self.parent.get_translation_settings()
+        self.speculative_thread = SpeculativeTranslationThread(
+            self.parent.get_translator(),
+            list(self.texts),
+            settings.get('from_lang', 'auto'),
+            settings.get('to_lang', 'zh'),
+            budget,
+            boxes=self._paragraph_boxes()
+        )
+        self.speculative_thread.finished.connect(self._on_speculative_finished)
+        self.speculative_thread.start(QThread.Priority.LowPriority)
+
+    def _on_speculative_finished(self):
+        # 线程结束后才释放引用，运行中的 QThread 被销毁会导致程序中止
+        self.speculative_thread = None
+        if self._speculative_pending and self.ocr_result is not None:
+            self.start_speculative_translation()
+
+    def _paragraph_boxes(self):
+        """开启段落合并时返回用于合并的文本框，否则返回 None"""
+        if self.parent.get_translation_options().get('merge_paragraphs', True):
+            return list(self.boxes)
+        return None
+
     def toggle_translation(self):
         if not self.translated_text and not self.translation_thread:
             self.translate_text()
         elif not self.translation_thread:  # 只在没有正在进行的翻译时切换
             self.is_translated = not self.is_translated
             self.translate_btn.setText('原文' if self.is_translated else '翻译')
-            self.update()
+            self.invalidate_overlay()
         
     def translate_text(self):
         # 从主窗口获取翻译设置
         settings = self.parent.get_translation_settings()
-        if not settings or not settings.get('secret_id') or not settings.get('secret_key'):
+        if not self.parent.is_translation_configured():
             QMessageBox.warning(self, '错误', '请先在设置中配置腾讯云SecretId和SecretKey')
             return
             
+        # 预翻译仍在进行时等待其写入缓存，随后直接从缓存取得译文
+        if self.speculative_thread is not None:
+            self.translate_btn.setEnabled(False)
+            self.loading_label.setText('正在翻译...')
+            self.loading_label.show()
+            self.speculative_thread.finished.connect(self.translate_text)
+            return
+
         # 准备待翻译的文本
         texts = self.ocr_result.text
         
         try:
-            # 创建翻译器实例
-            translator = TencentTranslator(settings['secret_id'], settings['secret_key'])
+            # 使用主窗口共享的翻译器，复用其中的长连接
+            translator = self.parent.get_translator()
             
             # 创建并启动翻译线程
             self.translation_thread = TranslationThread(
                 translator,
                 texts,
                 settings.get('from_lang', 'auto'),
-                settings.get('to_lang', 'zh')
+                settings.get('to_lang', 'zh'),
+                boxes=self._paragraph_boxes()
             )
             
             # 连接信号
@@ -134,6 +400,7 @@ class PreviewWindow(QWidget):
             
             # 显示加载提示
             self.translate_btn.setEnabled(False)
+            self.loading_label.setText('正在翻译...')
             self.loading_label.show()
             
             # 启动线程
@@ -146,13 +413,19 @@ class PreviewWindow(QWidget):
             self.loading_label.hide()
             
     def on_translation_finished(self, translated_texts):
+        # 翻译失败的行为 None，绘制时回退显示原文
         self.translated_text = translated_texts
         self.is_translated = True
         self.translate_btn.setText('原文')
         self.translate_btn.setEnabled(True)
-        self.loading_label.hide()
         self.translation_thread = None
-        self.update()
+        failed = sum(1 for text in translated_texts if text is None)
+        if failed:
+            self.loading_label.setText(f'{failed}行翻译失败')
+            QTimer.singleShot(3000, self.loading_label.hide)
+        else:
+            self.loading_label.hide()
+        self.invalidate_overlay()
         
     def on_translation_error(self, error_msg):
         QMessageBox.warning(self, '错误', f'翻译出错: {error_msg}')
@@ -160,50 +433,219 @@ class PreviewWindow(QWidget):
         self.loading_label.hide()
         self.translation_thread = None
         
-    def closeEvent(self, event):
+    def _stop_threads(self):
+        # 预翻译线程只能取消，正在发送的请求结束后线程才退出，引用保留到 finished
+        self._speculative_pending = False
+        if self.speculative_thread is not None:
+            try:
+                self.speculative_thread.finished.disconnect(self.translate_text)
+            except TypeError:
+                pass  # 用户未在预翻译期间点击翻译
+            self.speculative_thread.cancel()
         if self.translation_thread and self.translation_thread.isRunning():
             self.translation_thread.terminate()
             self.translation_thread.wait()
+        self.translation_thread = None
+
+    def closeEvent(self, event):
+        self._stop_threads()
         event.accept()
+        self.closed.emit(self)
         
-    def paintEvent(self, event):
-        painter = QPainter(self)
+    def invalidate_overlay(self):
+        """文本集合变化后丢弃缓存的叠加层，下次重绘时重新排版"""
+        self._frame = None
+        self.update()
+
+    def resizeEvent(self, event):
+        self._frame = None
+        if self.image_size[0]:
+            self._clamp_offset()
+        super().resizeEvent(event)
+
+    def _overlay_texts(self):
+        """当前应显示的文本：译文或原文，失败的译文回退原文，未识别的行为 None"""
+        if not (self.is_translated and self.translated_text):
+            return self.texts
+        return [translated if translated is not None else original
+                for translated, original in zip(self.translated_text, self.texts)]
+
+    def _frame_region(self):
+        """叠加层的范围：放大后在可见区域四周各多绘制至多半个窗口，拖动平移时直接复用
+
+        边距取整数个物理像素，平移拷贝时不会产生半像素错位。
+
+        Returns:
+            (叠加层左上角对应的原图坐标, 物理像素宽度, 物理像素高度)
+        """
+        ratio = self.devicePixelRatioF()
+        pixel_scale = self.fit_scale * self.zoom * ratio
+        view_width, view_height = math.ceil(self.width() * ratio), math.ceil(self.height() * ratio)
+        margin_x, margin_y = (view_width // 2, view_height // 2) if self.zoom > 1.0 else (0, 0)
+        # 各方向的边距不超出原图
+        left = min(margin_x, math.floor(self.offset.x() * pixel_scale))
+        top = min(margin_y, math.floor(self.offset.y() * pixel_scale))
+        right = min(margin_x, max(0, math.floor((self.image_size[0] - self.offset.x()) * pixel_scale) - view_width))
+        bottom = min(margin_y, max(0, math.floor((self.image_size[1] - self.offset.y()) * pixel_scale) - view_height))
+        origin = QPointF(self.offset.x() - left / pixel_scale, self.offset.y() - top / pixel_scale)
+        return origin, view_width + left + right, view_height + top + bottom
+
+    def _frame_shift(self):
+        """当前可见区域左上角在叠加层中的物理像素位置"""
+        pixel_scale = self.fit_scale * self.zoom * self._frame.devicePixelRatio()
+        return (round((self.offset.x() - self._frame_origin.x()) * pixel_scale),
+                round((self.offset.y() - self._frame_origin.y()) * pixel_scale))
+
+    def _frame_covers_view(self):
+        """缓存的叠加层是否仍覆盖当前可见区域"""
+        ratio = self._frame.devicePixelRatio()
+        shift_x, shift_y = self._frame_shift()
+        return (shift_x >= 0 and shift_y >= 0
+                and shift_x + math.ceil(self.width() * ratio) <= self._frame.width()
+                and shift_y + math.ceil(self.height() * ratio) <= self._frame.height())
+
+    def _render_frame(self):
+        """将图片与全部文本框一次性绘制到缓存位图"""
+        ratio = self.devicePixelRatioF()
+        origin, width, height = self._frame_region()
+        frame = QPixmap(width, height)
+        frame.setDevicePixelRatio(ratio)
+        frame.fill(Qt.GlobalColor.transparent)
+        self._frame_origin = origin
+
+        painter = QPainter(frame)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)  # 启用抗锯齿
-        painter.drawPixmap(0, 0, self.pixmap)
-        
-        # 设置字体
-        font = QFont('Microsoft YaHei', 11)  # 使用微软雅黑字体
-        font.setWeight(QFont.Weight.Medium)
-        painter.setFont(font)
-        
-        texts = self.translated_text if self.is_translated and self.translated_text else self.ocr_result.text
-        
-        for box, text in zip(self.ocr_result.boxes, texts):
-            x, y = int(box[0]), int(box[1])
-            
-            # 计算文本区域
-            fm = painter.fontMetrics()
-            text_width = fm.horizontalAdvance(text)
-            text_height = fm.height()
-            padding = 4
-            vertical_offset = 2  # 向下偏移量
-            
-            # 绘制半透明背景
-            bg_rect = QRect(x - padding, y - text_height + vertical_offset,
-                          text_width + padding * 2, text_height + padding * 2)
-            bg_color = QColor(0, 0, 0, 160)  # 黑色背景，透明度为160
-            painter.fillRect(bg_rect, bg_color)
-            
-            # 绘制文本边框
-            border_color = QColor(46, 204, 113, 200)  # 绿色边框
-            painter.setPen(border_color)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        transform = self._transform(origin)
+        source = self._source_pixmap()
+        painter.setTransform(transform)
+        painter.drawPixmap(QRectF(0, 0, *self.image_size), source, QRectF(source.rect()))
+        painter.resetTransform()
+        self._draw_labels(painter, transform)
+        painter.end()
+        return frame
+
+    def _redraw_labels(self, indices, old_texts):
+        """在缓存的叠加层中重画部分文本行，只重绘受影响的窗口区域
+
+        Args:
+            indices: 文本已变化的行下标
+            old_texts: 这些行变化前显示的文本
+        """
+        painter = QPainter(self._frame)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.setFont(self.OVERLAY_FONT)
+        fm = painter.fontMetrics()
+        transform = self._transform(self._frame_origin)
+        texts = self._overlay_texts()
+        damaged = QRect()
+        for index, old_text in zip(indices, old_texts):
+            box = self.boxes[index]
+            damaged = damaged.united(self._label_geometry(fm, transform, box, old_text)[0])
+            damaged = damaged.united(self._label_geometry(fm, transform, box, texts[index])[0])
+        if damaged.isEmpty():
+            painter.end()
+            return
+        damaged.adjust(-2, -2, 2, 2)  # 包含边框的描边
+
+        # 先恢复该区域的图片，再按原顺序重画与之相交的全部文本框，重叠关系保持不变
+        painter.setClipRect(damaged)
+        source = self._source_pixmap()
+        painter.setTransform(transform)
+        painter.drawPixmap(QRectF(0, 0, *self.image_size), source, QRectF(source.rect()))
+        painter.resetTransform()
+        self._draw_labels(painter, transform, damaged)
+        painter.end()
+
+        ratio = self._frame.devicePixelRatio()
+        shift_x, shift_y = self._frame_shift()
+        self.update(QRectF(damaged).translated(-shift_x / ratio, -shift_y / ratio).toAlignedRect())
+
+    def _label_geometry(self, fm, transform, box, text):
+        """文本框标签在叠加层中的背景矩形与文本位置
+
+        Returns:
+            (背景矩形, 文本基线起点, 显示的文本)
+        """
+        padding = 4
+        vertical_offset = 2  # 向下偏移量
+        mapped = transform.map(QPointF(box[0], box[1]))
+        # 叠加层原点不同时映射结果相差整数像素，容差避免浮点误差使取整差一像素
+        x, y = math.floor(mapped.x() + 1e-6), math.floor(mapped.y() + 1e-6)
+        if text is None:
+            text = self.PLACEHOLDER_TEXT
+        bg_rect = QRect(x - padding, y - fm.height() + vertical_offset,
+                        fm.horizontalAdvance(text) + padding * 2, fm.height() + padding * 2)
+        return bg_rect, QPoint(x, y + vertical_offset * 2), text
+
+    def _draw_labels(self, painter, transform, region=None):
+        """绘制文本框标签，提供 region 时只绘制与之相交的标签"""
+        painter.setFont(self.OVERLAY_FONT)
+        fm = painter.fontMetrics()
+        for box, text in zip(self.boxes, self._overlay_texts()):
+            bg_rect, position, label = self._label_geometry(fm, transform, box, text)
+            if region is not None and not bg_rect.adjusted(-2, -2, 2, 2).intersects(region):
+                continue
+
+            # 绘制半透明背景与文本边框
+            painter.fillRect(bg_rect, self.BG_COLOR)
+            painter.setPen(self.BORDER_COLOR)
             painter.drawRect(bg_rect)
+
+            # 绘制文本，占位符使用灰色
+            painter.setPen(self.PLACEHOLDER_COLOR if text is None else self.TEXT_COLOR)
+            painter.drawText(position, label)
+
+    def paintEvent(self, event):
+        if self._frame is None or not self._frame_covers_view():
+            self._frame = self._render_frame()
+
+        # 只从缓存位图中拷贝需要重绘的区域，拖动平移时按偏移量错位拷贝
+        ratio = self._frame.devicePixelRatio()
+        shift_x, shift_y = self._frame_shift()
+        target = QRectF(event.rect())
+        source = QRectF(target.x() * ratio + shift_x, target.y() * ratio + shift_y,
+                        target.width() * ratio, target.height() * ratio)
+        painter = QPainter(self)
+        painter.drawPixmap(target, self._frame, source)
             
-            # 绘制文本
-            text_color = QColor(255, 255, 255)  # 白色文本
-            painter.setPen(text_color)
-            painter.drawText(x, y + vertical_offset * 2, text)
-            
+    def wheelEvent(self, event):
+        # Ctrl+滚轮缩放
+        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            step = self.ZOOM_STEP if event.angleDelta().y() > 0 else 1 / self.ZOOM_STEP
+            self.set_zoom(self.zoom * step, event.position())
+            event.accept()
+        else:
+            super().wheelEvent(event)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton and self.zoom > 1.0:
+            self._drag_pos = event.position()
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        # 放大后拖动平移
+        if self._drag_pos is not None:
+            delta = event.position() - self._drag_pos
+            self._drag_pos = event.position()
+            self.offset -= delta / (self.fit_scale * self.zoom)
+            self._clamp_offset()
+            # 只平移缓存的叠加层，超出其覆盖范围时 paintEvent 才重新绘制
+            self.update()
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        self._drag_pos = None
+        super().mouseReleaseEvent(event)
+
     def keyPressEvent(self, event):
+        ctrl = event.modifiers() & Qt.KeyboardModifier.ControlModifier
         if event.key() == Qt.Key.Key_Escape:
-            self.close() 
\ No newline at end of file
+            self.close()
+        elif ctrl and event.key() in (Qt.Key.Key_Plus, Qt.Key.Key_Equal):
+            self.set_zoom(self.zoom * self.ZOOM_STEP)
+        elif ctrl and event.key() == Qt.Key.Key_Minus:
+            self.set_zoom(self.zoom / self.ZOOM_STEP)
+        elif ctrl and event.key() == Qt.Key.Key_0:
+            self.set_zoom(1.0) 
\ No newline at end of file
@@ -0,0 +1,191 @@
+"""
+延迟追踪模块
+为每次截图记录各阶段时间戳，并在内存中按阶段汇总延迟直方图
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+
+from src.utils.metrics import STAGE_LATENCY
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+# 截图处理流水线的阶段，按发生顺序排列
+STAGES = ('file_event', 'ready', 'decode', 'det', 'cls', 'rec',
+          'layout', 'file_write', 'clipboard', 'preview_shown')
+# 直方图桶上界（毫秒）
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, float('inf'))
+# 每个直方图保留用于计算分位数的最近样本数
+RECENT_SAMPLES = 1000
+# 未完成追踪的最大数量，超出时丢弃最早的追踪
+MAX_PENDING = 32
+
+
+class CaptureTrace:
+    def __init__(self, image_path):
+        """单次截图的阶段时间戳
+
+        Args:
+            image_path: 截图路径
+        """
+        self.image_path = image_path
+        self.wall_time = time.time()
+        self.marks = OrderedDict()
+
+    def mark(self, stage):
+        """记录阶段完成时刻"""
+        self.marks[stage] = time.perf_counter()
+
+    def durations(self):
+        """各阶段耗时（毫秒），即该阶段与上一个已记录阶段的时间差"""
+        result = OrderedDict()
+        previous = None
+        for stage in STAGES:
+            if stage not in self.marks:
+                continue
+            if previous is not None:
+                result[stage] = (self.marks[stage] - previous) * 1000
+            previous = self.marks[stage]
+        return result
+
+    def total(self):
+        """从文件事件到最后一个阶段的总耗时（毫秒）"""
+        if len(self.marks) < 2:
+            return 0.0
+        times = list(self.marks.values())
+        return (max(times) - min(times)) * 1000
+
+    def to_dict(self):
+        return {
+            'image_path': self.image_path,
+            'time': self.wall_time,
+            'durations_ms': {stage: round(ms, 3) for stage, ms in self.durations().items()},
+            'total_ms': round(self.total(), 3),
+        }
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, ms):
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+        self.recent.append(ms)
+
+    def percentile(self, p):
+        """最近样本的第 p 百分位数（毫秒），没有样本时返回 None"""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum_ms': round(self.sum, 3),
+            'min_ms': self.min,
+            'max_ms': self.max,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'buckets': [{'le': 'inf' if bound == float('inf') else bound, 'count': count}
+                        for bound, count in zip(BUCKETS_MS, self.counts)],
+        }
+
+
+class LatencyRecorder:
+    def __init__(self, keep_traces=100):
+        """线程安全的延迟记录器
+
+        Args:
+            keep_traces: 保留的最近完成追踪数量
+        """
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()
+        self.histograms = OrderedDict((stage, LatencyHistogram()) for stage in STAGES[1:])
+        self.histograms['total'] = LatencyHistogram()
+        self.traces = deque(maxlen=keep_traces)
+
+    def start(self, image_path):
+        """开始追踪一次截图，并记录文件事件时刻"""
+        trace = CaptureTrace(image_path)
+        trace.mark('file_event')
+        with self._lock:
+            self._pending[image_path] = trace
+            while len(self._pending) > MAX_PENDING:
+                self._pending.popitem(last=False)
+        return trace
+
+    def get(self, image_path):
+        """返回尚未完成的追踪，没有时返回 None"""
+        with self._lock:
+            return self._pending.get(image_path)
+
+    def discard(self, image_path):
+        """丢弃未完成的追踪，不计入直方图"""
+        with self._lock:
+            self._pending.pop(image_path, None)
+
+    def finish(self, image_path):
+        """结束追踪并计入各阶段直方图"""
+        with self._lock:
+            trace = self._pending.pop(image_path, None)
+            if trace is None:
+                return None
+            for stage, ms in trace.durations().items():
+                self.histograms[stage].observe(ms)
+                STAGE_LATENCY.observe(ms / 1000, stage=stage)
+            self.histograms['total'].observe(trace.total())
+            STAGE_LATENCY.observe(trace.total() / 1000, stage='total')
+            self.traces.append(trace)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Capture latency %.0f ms: %s", trace.total(),
+                        ", ".join(f"{stage}={ms:.0f}" for stage, ms in trace.durations().items()),
+                        extra={'capture': trace.to_dict()})
+        return trace
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'histograms': {stage: histogram.to_dict() for stage, histogram in self.histograms.items()},
+                'traces': [trace.to_dict() for trace in self.traces],
+            }
+
+    def summary(self):
+        """各阶段延迟的文本摘要"""
+        with self._lock:
+            lines = [f"{'阶段':<14}{'次数':>4}{'p50':>9}{'p95':>9}{'p99':>9}{'最大':>7}"]
+            for stage, histogram in self.histograms.items():
+                if not histogram.count:
+                    continue
+                lines.append(f"{stage:<16}{histogram.count:>6}"
+                             f"{histogram.percentile(50):>9.1f}{histogram.percentile(95):>9.1f}"
+                             f"{histogram.percentile(99):>9.1f}{histogram.max:>9.1f}")
+        return "\n".join(lines)
+
+    def export_json(self, path):
+        """导出直方图与最近追踪为 JSON 文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        logger.info(f"Exported latency statistics to {path}")
+
+
+# 进程内共享的记录器
+latency_recorder = LatencyRecorder()
@@ -1,44 +1,150 @@
 import os
+import json
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime
 
-def setup_logging():
-    # Create logs directory if it doesn't exist
-    logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'logs')
-    os.makedirs(logs_dir, exist_ok=True)
-
-    # Create log filename with timestamp
-    log_filename = os.path.join(logs_dir, f'snipaste_ocr_{datetime.now().strftime("%Y%m%d")}.log')
-
-    # Create formatters
-    file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    console_formatter = logging.Formatter('%(levelname)s: %(message)s')
-
-    # Setup file handler with rotation
-    file_handler = RotatingFileHandler(
-        log_filename,
-        maxBytes=5*1024*1024,  # 5MB
-        backupCount=5,
-        encoding='utf-8'
-    )
-    file_handler.setFormatter(file_formatter)
-    file_handler.setLevel(logging.INFO)
-
-    # Setup console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(console_formatter)
-    console_handler.setLevel(logging.INFO)
-
-    # Get root logger and configure it
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-    
-    # Remove any existing handlers
-    root_logger.handlers = []
-    
-    # Add our handlers
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
-
-    return root_logger 
\ No newline at end of file
+import yaml
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+# 日志截断长度，超出部分以字符数代替
+SUMMARY_LIMIT = 200
+
+_listener = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志输出为一行 JSON，携带 extra 中的 capture 计时字段"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        capture = getattr(record, 'capture', None)
+        if capture is not None:
+            entry['capture'] = capture
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def summarize(value, limit=SUMMARY_LIMIT):
+    """将较大的对象压缩为便于写入日志的摘要"""
+    text = str(value)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... ({len(text)} chars)"
+
+
+def _load_logging_config():
+    try:
+        with open(os.path.join(ROOT_DIR, 'config.yml'), 'r', encoding='utf-8') as f:
+            return (yaml.safe_load(f) or {}).get('logging') or {}
+    except (OSError, yaml.YAMLError):
+        return {}
+
+
+def setup_logging(level=None, json_log=None):
+    """初始化日志，仅首次调用生效
+
+    日志记录只在调用线程放入队列，格式化后的磁盘与控制台写入由后台
+    QueueListener 线程完成。
+
+    Args:
+        level: 日志级别，默认读取配置文件 logging.level，缺省为 INFO
+        json_log: 是否额外输出 JSON 结构化日志，默认读取配置文件 logging.json
+    """
+    global _listener
+    with _lock:
+        root_logger = logging.getLogger()
+        if _listener is not None:
+            return root_logger
+
+        config = _load_logging_config()
+        if level is None:
+            level = config.get('level', 'INFO')
+        invalid_level = None
+        if isinstance(level, str):
+            resolved = logging.getLevelName(level.upper())
+            if isinstance(resolved, int):
+                level = resolved
+            else:
+                # 配置了不存在的级别时不让启动失败，回退到 INFO
+                invalid_level, level = level, logging.INFO
+        elif not isinstance(level, int):
+            invalid_level, level = level, logging.INFO
+        if json_log is None:
+            json_log = config.get('json', False)
+
+        # Create logs directory if it doesn't exist
+        logs_dir = os.path.join(ROOT_DIR, 'logs')
+        os.makedirs(logs_dir, exist_ok=True)
+
+        # Create log filename with timestamp
+        log_filename = os.path.join(logs_dir, f'snipaste_ocr_{datetime.now().strftime("%Y%m%d")}.log')
+
+        # Create formatters
+        file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        console_formatter = logging.Formatter('%(levelname)s: %(message)s')
+
+        # Setup file handler with rotation
+        file_handler = RotatingFileHandler(
+            log_filename,
+            maxBytes=5*1024*1024,  # 5MB
+            backupCount=5,
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(file_formatter)
+        file_handler.setLevel(level)
+
+        # Setup console handler
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(console_formatter)
+        console_handler.setLevel(level)
+
+        handlers = [file_handler, console_handler]
+        if json_log:
+            json_handler = RotatingFileHandler(
+                os.path.join(logs_dir, f'snipaste_ocr_{datetime.now().strftime("%Y%m%d")}.jsonl'),
+                maxBytes=5*1024*1024,
+                backupCount=5,
+                encoding='utf-8'
+            )
+            json_handler.setFormatter(JsonFormatter())
+            json_handler.setLevel(level)
+            handlers.append(json_handler)
+
+        # 根日志器只挂队列处理器，写入在监听线程中完成
+        log_queue = queue.SimpleQueue()
+        root_logger.setLevel(level)
+        root_logger.handlers = [QueueHandler(log_queue)]
+
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+        if invalid_level is not None:
+            logging.getLogger(__name__).warning("Invalid logging level %r, falling back to INFO",
+                                                invalid_level)
+
+    return root_logger
+
+
+def shutdown_logging():
+    """停止监听线程并写出队列中剩余的日志"""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
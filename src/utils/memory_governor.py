@@ -0,0 +1,127 @@
+"""
+内存管控模块
+定期检查进程常驻内存与各组件占用，接近上限时先清理缓存，
+原生内存仍持续增长时在后台回收重建 OCR 引擎
+"""
+
+import time
+import logging
+
+from src.utils.metrics import COMPONENT_MEMORY, process_rss_bytes
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class MemoryComponent:
+    def __init__(self, name, usage, shrink=None):
+        """受管控的组件
+
+        Args:
+            name: 组件名称
+            usage: 返回当前占用字节数的函数
+            shrink: 释放可丢弃内存的函数，没有时为 None
+        """
+        self.name = name
+        self.usage = usage
+        self.shrink = shrink
+
+
+class MemoryGovernor:
+    def __init__(self, ceiling_mb=1536, soft_ratio=0.8, growth_mb=200, growth_checks=3,
+                 recycle_cooldown_s=600):
+        """初始化内存管控
+
+        Args:
+            ceiling_mb: 常驻内存上限
+            soft_ratio: 达到上限的该比例时开始清理
+            growth_mb: 清理后原生内存较基线增长超过该值视为持续增长
+            growth_checks: 连续多少次检查仍在增长时回收引擎
+            recycle_cooldown_s: 两次回收引擎的最短间隔
+        """
+        self.ceiling = ceiling_mb * MB
+        self.soft_limit = self.ceiling * soft_ratio
+        self.growth = growth_mb * MB
+        self.growth_checks = growth_checks
+        self.recycle_cooldown = recycle_cooldown_s
+        self.components = []
+        self.recycle = None  # 回收引擎的函数，返回是否开始了回收
+        self.external_rss = None  # 返回子进程（如引擎工作进程）常驻内存之和的函数，计入总内存
+        self.baseline = None  # 引擎加载后除缓存外的常驻内存基线
+        self._strikes = 0
+        self._last_recycle = None
+
+    def register(self, name, usage, shrink=None):
+        self.components.append(MemoryComponent(name, usage, shrink))
+
+    def usage(self):
+        """各组件当前占用字节数"""
+        usage = {}
+        for component in self.components:
+            try:
+                usage[component.name] = component.usage()
+            except Exception as e:
+                logger.debug("Memory usage of %s unavailable: %s", component.name, e)
+                usage[component.name] = 0
+        return usage
+
+    def rss(self):
+        """本进程与子进程的常驻内存之和"""
+        rss = process_rss_bytes()
+        if rss and self.external_rss is not None:
+            try:
+                rss += self.external_rss()
+            except Exception as e:
+                logger.debug("Child process memory unavailable: %s", e)
+        return rss
+
+    def check(self):
+        """检查一次内存，必要时清理缓存或回收引擎
+
+        Returns:
+            本次采取的动作：None、'evict' 或 'recycle'
+        """
+        rss = self.rss()
+        usage = self.usage()
+        for name, value in usage.items():
+            COMPONENT_MEMORY.set(value, component=name)
+        if not rss:
+            return None
+
+        if rss < self.soft_limit:
+            if self.baseline is None and usage.get('engines'):
+                self.baseline = self._native(rss, usage)
+            self._strikes = 0
+            return None
+
+        logger.warning("RSS %.0f MB is above %.0f MB, evicting caches (%s)", rss / MB, self.soft_limit / MB,
+                       ", ".join(f"{name}={value / MB:.1f}MB" for name, value in usage.items()))
+        for component in self.components:
+            if component.shrink is not None:
+                component.shrink()
+        action = 'evict'
+
+        native = self._native(self.rss(), self.usage())
+        if self.baseline is not None and native - self.baseline > self.growth:
+            self._strikes += 1
+            logger.warning("Native memory grew %.0f MB over baseline (%d/%d)",
+                           (native - self.baseline) / MB, self._strikes, self.growth_checks)
+        else:
+            self._strikes = 0
+
+        if (self._strikes >= self.growth_checks and self.recycle is not None
+                and (self._last_recycle is None
+                     or time.monotonic() - self._last_recycle > self.recycle_cooldown)):
+            if self.recycle():
+                self._last_recycle = time.monotonic()
+                self._strikes = 0
+                self.baseline = None  # 新引擎加载完成后重新建立基线
+                action = 'recycle'
+        return action
+
+    @staticmethod
+    def _native(rss, usage):
+        """常驻内存中扣除可清理缓存后的部分，主要为引擎与解释器的原生内存"""
+        return rss - sum(value for name, value in usage.items() if name != 'engines')
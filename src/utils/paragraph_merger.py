@@ -0,0 +1,151 @@
+"""
+段落合并模块
+根据文本框几何位置把折行的文本行合并为段落，翻译后再按原文长度拆回各行
+"""
+
+import re
+
+# 行间距不超过行高的该倍数时视为同一段落
+MAX_LINE_GAP = 0.8
+# 相邻行高度之比超过该值时视为不同段落（如标题与正文）
+MAX_HEIGHT_RATIO = 1.5
+# 左边缘偏差不超过行高的该倍数时视为对齐
+MAX_INDENT = 1.5
+# 上一行右边缘距段落右边界超过行高的该倍数时，认为上一行是段落末行
+MAX_RAGGED_RIGHT = 2.0
+
+_CJK = re.compile(r'[぀-ヿ㐀-䶿一-鿿가-힯＀-￯　-〿]')
+
+
+def _geometry(box):
+    xs = box[0::2]
+    ys = box[1::2]
+    left, right, top, bottom = min(xs), max(xs), min(ys), max(ys)
+    return left, right, top, bottom, max(1, bottom - top)
+
+
+def build_paragraphs(boxes, texts):
+    """把文本行分组为段落
+
+    Args:
+        boxes: 按阅读顺序排列的文本框，每个为 [x1, y1, ..., x4, y4]
+        texts: 与文本框对应的识别文本
+
+    Returns:
+        段落列表，每个段落为按顺序排列的行下标列表
+    """
+    paragraphs = []
+    # 每个仍可续接的段落：(行下标列表, 段落右边界)
+    open_paragraphs = []
+    for i, (box, text) in enumerate(zip(boxes, texts)):
+        if not text or not text.strip():
+            paragraphs.append([i])
+            continue
+        left, right, top, bottom, height = _geometry(box)
+
+        target = None
+        for paragraph in open_paragraphs:
+            lines, para_right = paragraph
+            p_left, p_right, p_top, p_bottom, p_height = _geometry(boxes[lines[-1]])
+            gap = top - p_bottom
+            if not (-0.5 * p_height <= gap <= MAX_LINE_GAP * p_height):
+                continue
+            if max(height, p_height) / min(height, p_height) > MAX_HEIGHT_RATIO:
+                continue
+            if abs(left - p_left) > MAX_INDENT * p_height:
+                continue
+            if para_right - p_right > MAX_RAGGED_RIGHT * p_height:
+                continue  # 上一行明显短于段落宽度，说明段落已结束
+            target = paragraph
+            break
+
+        if target is None:
+            target = [[i], right]
+            open_paragraphs.append(target)
+            paragraphs.append(target[0])
+        else:
+            target[0].append(i)
+            target[1] = max(target[1], right)
+
+        # 已经远离当前行的段落不会再续接
+        open_paragraphs = [p for p in open_paragraphs
+                           if top - _geometry(boxes[p[0][-1]])[3] <= MAX_LINE_GAP * height * 2]
+    return paragraphs
+
+
+def join_lines(texts):
+    """把一个段落的各行拼接为完整文本，中日韩文字之间不加空格，行尾连字符会被去除"""
+    joined = ''
+    for text in texts:
+        text = text.strip()
+        if not joined:
+            joined = text
+        elif joined.endswith('-') and text[:1].islower():
+            joined = joined[:-1] + text
+        elif _CJK.match(joined[-1]) or _CJK.match(text[:1]):
+            joined += text
+        else:
+            joined += ' ' + text
+    return joined
+
+
+def split_translation(translation, lines):
+    """把段落译文按各行原文长度的比例拆分回各行
+
+    Args:
+        translation: 段落译文
+        lines: 该段落各行原文
+
+    Returns:
+        与 lines 一一对应的译文片段
+    """
+    if len(lines) == 1:
+        return [translation]
+    # 含空格的译文按词切分，否则按字符切分
+    tokens = re.findall(r'\S+\s*', translation) if ' ' in translation.strip() else list(translation)
+    total = sum(len(line) for line in lines) or 1
+
+    pieces = []
+    cursor = 0
+    consumed = 0
+    for line in lines[:-1]:
+        consumed += len(line)
+        end = round(len(tokens) * consumed / total)
+        end = max(cursor, min(end, len(tokens)))
+        pieces.append(''.join(tokens[cursor:end]).strip())
+        cursor = end
+    pieces.append(''.join(tokens[cursor:]).strip())
+    return pieces
+
+
+def paragraph_sources(boxes, texts):
+    """合并段落并拼接出每个段落的待翻译原文
+
+    Returns:
+        (段落行下标列表, 段落原文列表)
+    """
+    paragraphs = build_paragraphs(boxes, texts)
+    return paragraphs, [join_lines([texts[i] for i in lines]) for lines in paragraphs]
+
+
+def translate_by_paragraph(translate_batch, boxes, texts):
+    """合并段落后翻译，再把译文映射回原来的每一行
+
+    Args:
+        translate_batch: 接收文本列表、返回对应译文列表的函数
+        boxes: 文本框列表
+        texts: 各行文本
+
+    Returns:
+        (与 texts 一一对应的译文列表，失败的行为 None, 段落数量)
+    """
+    paragraphs, sources = paragraph_sources(boxes, texts)
+    translations = translate_batch(sources)
+
+    results = [None] * len(texts)
+    for lines, translation in zip(paragraphs, translations):
+        if translation is None:
+            continue
+        for i, piece in zip(lines, split_translation(translation, [texts[i] for i in lines])):
+            results[i] = piece
+    return results, len(paragraphs)
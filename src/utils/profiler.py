@@ -0,0 +1,207 @@
+"""
+按需性能分析模块
+在运行中的进程内对 OCR 工作线程启停 cProfile 或栈采样分析，
+按秒数或截图次数结束，结果写入 pstats / collapsed-stack 文件并附带各阶段计时
+"""
+
+import os
+import sys
+import json
+import time
+import cProfile
+import logging
+import pstats
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from src.utils.latency_trace import latency_recorder
+from src.utils.logging_config import ROOT_DIR
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('cprofile', 'sampling')
+DEFAULT_INTERVAL = 0.005  # 采样间隔（秒）
+
+
+def default_output_dir():
+    return os.path.join(ROOT_DIR, 'logs', 'profiles')
+
+
+class ProfileSession:
+    def __init__(self, mode='sampling', seconds=None, captures=None,
+                 output_dir=None, interval=DEFAULT_INTERVAL):
+        """一次分析会话
+
+        Args:
+            mode: 'cprofile' 记录完整调用统计，'sampling' 定时采样调用栈，开销更低
+            seconds: 持续秒数，与 captures 都为空时需手动停止
+            captures: 分析的截图次数
+            output_dir: 结果目录，默认为 logs/profiles
+            interval: 采样间隔（秒）
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}, expected one of {PROFILE_MODES}")
+        self.mode = mode
+        self.seconds = seconds
+        self.captures = captures
+        self.output_dir = output_dir or default_output_dir()
+        self.interval = interval
+        self.started = time.time()
+        self.captures_done = 0
+        self.profile = cProfile.Profile() if mode == 'cprofile' else None
+        self.stacks = Counter()
+        self._active_threads = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._sampler = None
+        if mode == 'sampling':
+            self._sampler = threading.Thread(target=self._sample_loop, name='profile-sampler', daemon=True)
+            self._sampler.start()
+
+    @contextmanager
+    def capture(self):
+        """在当前线程分析一次截图处理"""
+        ident = threading.get_ident()
+        if self.profile is not None:
+            with self._lock:
+                self.profile.enable()
+        else:
+            self._active_threads.add(ident)
+        try:
+            yield
+        finally:
+            if self.profile is not None:
+                with self._lock:
+                    self.profile.disable()
+            else:
+                self._active_threads.discard(ident)
+            self.captures_done += 1
+
+    @property
+    def expired(self):
+        if self.captures is not None and self.captures_done >= self.captures:
+            return True
+        return self.seconds is not None and time.time() - self.started >= self.seconds
+
+    def _sample_loop(self):
+        while not self._stop_event.wait(self.interval):
+            if not self._active_threads:
+                continue
+            frames = sys._current_frames()
+            for ident in list(self._active_threads):
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[';'.join(reversed(stack))] += 1
+
+    def finish(self):
+        """结束分析并写出结果文件
+
+        Returns:
+            写出的文件路径列表
+        """
+        self._stop_event.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir,
+                            f"profile_{time.strftime('%Y%m%d_%H%M%S', time.localtime(self.started))}_{self.mode}")
+        paths = []
+
+        if self.profile is not None:
+            self.profile.dump_stats(base + '.pstats')
+            with open(base + '.txt', 'w', encoding='utf-8') as f:
+                pstats.Stats(self.profile, stream=f).sort_stats('cumulative').print_stats(60)
+            paths += [base + '.pstats', base + '.txt']
+        else:
+            with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+                for stack, count in self.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            paths.append(base + '.collapsed')
+
+        snapshot = latency_recorder.snapshot()
+        timings = {
+            'mode': self.mode,
+            'started': self.started,
+            'duration_s': round(time.time() - self.started, 3),
+            'captures': self.captures_done,
+            'samples': sum(self.stacks.values()),
+            'traces': [trace for trace in snapshot['traces'] if trace['time'] >= self.started],
+            'histograms': snapshot['histograms'],
+        }
+        with open(base + '.timings.json', 'w', encoding='utf-8') as f:
+            json.dump(timings, f, ensure_ascii=False, indent=2)
+        paths.append(base + '.timings.json')
+        logger.info("Profile (%s, %d captures) written to %s", self.mode, self.captures_done, base)
+        return paths
+
+
+class ProfilerController:
+    """进程内唯一的分析开关，OCR 工作线程通过 capture() 接入"""
+
+    def __init__(self):
+        self.session = None
+        self.on_finished = None  # 回调，参数为写出的文件路径列表
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @property
+    def active(self):
+        return self.session is not None
+
+    def start(self, mode='sampling', seconds=None, captures=None, **kwargs):
+        """开始分析，已有会话时抛出 RuntimeError"""
+        with self._lock:
+            if self.session is not None:
+                raise RuntimeError("A profiling session is already running")
+            self.session = ProfileSession(mode, seconds, captures, **kwargs)
+            if seconds is not None:
+                self._timer = threading.Timer(seconds, self.stop)
+                self._timer.daemon = True
+                self._timer.start()
+        logger.info("Started %s profiling (seconds=%s, captures=%s)", mode, seconds, captures)
+        return self.session
+
+    def stop(self):
+        """结束当前会话，返回写出的文件路径，没有会话时返回空列表"""
+        with self._lock:
+            session, self.session = self.session, None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if session is None:
+            return []
+        paths = session.finish()
+        if self.on_finished is not None:
+            self.on_finished(paths)
+        return paths
+
+    def status(self):
+        session = self.session
+        if session is None:
+            return {'active': False}
+        return {'active': True, 'mode': session.mode, 'captures': session.captures_done,
+                'elapsed_s': round(time.time() - session.started, 1),
+                'seconds': session.seconds, 'capture_limit': session.captures}
+
+    @contextmanager
+    def capture(self):
+        """包裹一次截图处理，未开启分析时几乎没有开销"""
+        session = self.session
+        if session is None:
+            yield
+            return
+        with session.capture():
+            yield
+        if session.expired and session is self.session:
+            self.stop()
+
+
+# 进程内共享的分析开关
+profiler = ProfilerController()
@@ -0,0 +1,123 @@
+"""
+腾讯云 TC3-HMAC-SHA256 签名模块
+按日期缓存派生签名密钥，并按接口预先拼好规范请求中的固定部分
+"""
+
+import hashlib
+import hmac
+import threading
+import time
+
+
+def _hmac_sha256(key, msg):
+    return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+
+
+class _ActionTemplate:
+    """单个接口的签名模板：规范请求前缀与固定请求头"""
+
+    __slots__ = ("canonical_prefix", "headers")
+
+    def __init__(self, canonical_prefix, headers):
+        self.canonical_prefix = canonical_prefix
+        self.headers = headers
+
+
+class TC3Signer:
+    SIGNED_HEADERS = "content-type;host;x-tc-action"
+    CONTENT_TYPE = "application/json; charset=utf-8"
+
+    def __init__(self, secret_id, secret_key, service, host, version, region,
+                 algorithm="TC3-HMAC-SHA256"):
+        """初始化签名器
+
+        Args:
+            secret_id: 腾讯云 SecretId
+            secret_key: 腾讯云 SecretKey
+            service: 服务名，如 tmt
+            host: 接口域名
+            version: 接口版本
+            region: 地域
+            algorithm: 签名算法
+        """
+        self.secret_id = secret_id
+        self.secret_key = secret_key
+        self.service = service
+        self.host = host
+        self.version = version
+        self.region = region
+        self.algorithm = algorithm
+
+        self._lock = threading.Lock()
+        self._day = None          # 缓存对应的 UTC 日序号
+        self._date = None         # 形如 2024-01-01 的日期串
+        self._signing_key = None  # 当日派生出的签名密钥
+        self._templates = {}
+
+    def signing_key(self, timestamp):
+        """返回时间戳所在 UTC 日期及其派生签名密钥，同一天内只计算一次"""
+        day = timestamp // 86400
+        with self._lock:
+            if day != self._day:
+                date = time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+                secret_date = _hmac_sha256(f"TC3{self.secret_key}".encode("utf-8"), date)
+                secret_service = _hmac_sha256(secret_date, self.service)
+                self._signing_key = _hmac_sha256(secret_service, "tc3_request")
+                self._date = date
+                self._day = day
+            return self._date, self._signing_key
+
+    def _template(self, action):
+        template = self._templates.get(action)
+        if template is None:
+            canonical_prefix = (
+                "POST\n/\n\n"
+                f"content-type:{self.CONTENT_TYPE}\n"
+                f"host:{self.host}\n"
+                f"x-tc-action:{action.lower()}\n"
+                "\n"
+                f"{self.SIGNED_HEADERS}\n"
+            )
+            headers = {
+                "Content-Type": self.CONTENT_TYPE,
+                "Host": self.host,
+                "Connection": "keep-alive",
+                "X-TC-Action": action,
+                "X-TC-Version": self.version,
+                "X-TC-Region": self.region
+            }
+            template = self._templates[action] = _ActionTemplate(canonical_prefix, headers)
+        return template
+
+    def sign(self, action, payload, timestamp=None):
+        """为一次请求生成带签名的请求头
+
+        Args:
+            action: 接口名称
+            payload: 请求体字节串
+            timestamp: 签名时间戳，默认取当前时间
+
+        Returns:
+            请求头字典
+        """
+        if timestamp is None:
+            timestamp = int(time.time())
+        date, signing_key = self.signing_key(timestamp)
+        template = self._template(action)
+
+        credential_scope = f"{date}/{self.service}/tc3_request"
+        canonical_request = template.canonical_prefix + hashlib.sha256(payload).hexdigest()
+        string_to_sign = (
+            f"{self.algorithm}\n{timestamp}\n{credential_scope}\n" +
+            hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()
+        )
+        signature = hmac.new(signing_key, string_to_sign.encode("utf-8"),
+                             hashlib.sha256).hexdigest()
+
+        headers = dict(template.headers)
+        headers["Authorization"] = (
+            f"{self.algorithm} Credential={self.secret_id}/{credential_scope}, "
+            f"SignedHeaders={self.SIGNED_HEADERS}, Signature={signature}"
+        )
+        headers["X-TC-Timestamp"] = str(timestamp)
+        return headers
@@ -0,0 +1,180 @@
+"""
+腾讯云 TMT 接口本地替身服务
+模拟 TextTranslate 与 TextTranslateBatch 接口，可配置延迟、错误率和限流，
+用于在无网络的机器上压测批量、缓存与并发翻译
+
+用法:
+    python -m src.utils.tmt_standin --port 8900 --latency 50 --error-rate 0.05
+"""
+
+import json
+import time
+import uuid
+import random
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+# 与线上接口一致的单次请求字符上限
+MAX_REQUEST_CHARS = 6000
+
+
+class _StandinHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 才会保持长连接
+    protocol_version = "HTTP/1.1"
+    # 响应头与响应体分两次写出，关闭 Nagle 避免与延迟确认叠加产生 40ms 停顿
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            params = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            params = None
+        response = self.server.standin.handle(
+            self.headers.get("X-TC-Action", ""),
+            self.headers.get("Authorization", ""),
+            params)
+
+        body = json.dumps({"Response": response}, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandinServer:
+    """在后台线程运行的 TMT 替身服务"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0, jitter_ms=0,
+                 error_rate=0.0, qps_limit=None, ssl_context=None, seed=None):
+        """初始化替身服务
+
+        Args:
+            host: 监听地址
+            port: 监听端口，为 0 时自动分配
+            latency_ms: 每个请求的基础延迟（毫秒）
+            jitter_ms: 在基础延迟上叠加的随机延迟上限（毫秒）
+            error_rate: 返回 InternalError 的概率
+            qps_limit: 每秒请求数上限，超出时返回 RequestLimitExceeded
+            ssl_context: 提供时以 HTTPS 方式服务
+            seed: 随机数种子，便于复现压测
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.qps_limit = qps_limit
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = (0, 0)  # (秒级时间窗口, 窗口内请求数)
+
+        self.httpd = ThreadingHTTPServer((host, port), _StandinHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.standin = self
+        if ssl_context is not None:
+            self.httpd.socket = ssl_context.wrap_socket(self.httpd.socket, server_side=True)
+        self.host, self.port = self.httpd.server_address[:2]
+        self._thread = None
+
+    def handle(self, action, authorization, params):
+        """处理一次接口调用，返回 Response 字段内容"""
+        with self._lock:
+            self.requests += 1
+            throttled = self._over_limit()
+            failed = self._random.random() < self.error_rate
+            delay = (self.latency_ms + self._random.uniform(0, self.jitter_ms)) / 1000
+
+        if delay:
+            time.sleep(delay)
+        if not authorization.startswith("TC3-HMAC-SHA256 Credential="):
+            return self._error("AuthFailure.SignatureFailure", "The provided credentials could not be validated.")
+        if params is None:
+            return self._error("InvalidParameter", "Request body is not valid JSON.")
+        if throttled:
+            return self._error("RequestLimitExceeded", "Your current request rate is too high.")
+        if failed:
+            return self._error("InternalError", "Simulated internal error.")
+
+        target = params.get("Target", "zh")
+        if action == "TextTranslate":
+            texts = [params.get("SourceText", "")]
+        elif action == "TextTranslateBatch":
+            texts = params.get("SourceTextList") or []
+        else:
+            return self._error("InvalidAction", f"The action {action} is not supported.")
+        if sum(len(text) for text in texts) > MAX_REQUEST_CHARS:
+            return self._error("UnsupportedOperation.TextTooLong", "The text length exceeds the limit.")
+
+        translated = [f"[{target}] {text}" for text in texts]
+        response = {"Source": params.get("Source", "auto"), "Target": target,
+                    "RequestId": str(uuid.uuid4())}
+        if action == "TextTranslate":
+            response["TargetText"] = translated[0]
+        else:
+            response["TargetTextList"] = translated
+        return response
+
+    def _over_limit(self):
+        if not self.qps_limit:
+            return False
+        second = int(time.monotonic())
+        window, count = self._window
+        count = count + 1 if window == second else 1
+        self._window = (second, count)
+        return count > self.qps_limit
+
+    def _error(self, code, message):
+        with self._lock:
+            self.errors += 1
+        return {"Error": {"Code": code, "Message": message}, "RequestId": str(uuid.uuid4())}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"TMT stand-in listening on {self.host}:{self.port}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0, help="基础延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=0, help="随机延迟上限（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 InternalError 的概率")
+    parser.add_argument("--qps-limit", type=int, default=None, help="每秒请求数上限")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    server = StandinServer(args.host, args.port, args.latency, args.jitter,
+                           args.error_rate, args.qps_limit)
+    logger.info(f"TMT stand-in listening on {server.host}:{server.port}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
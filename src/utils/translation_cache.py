@@ -0,0 +1,299 @@
+"""
+翻译缓存模块
+内存 LRU 与 SQLite 持久化两级缓存，键为 (原文, 源语言, 目标语言, 翻译引擎)
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+
+from src.utils.metrics import CACHE_LOOKUPS
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+# 每写入这么多条目后执行一次持久层淘汰
+EVICT_INTERVAL = 1000
+
+
+def default_cache_path():
+    """默认的缓存数据库路径，位于项目根目录的 cache 目录下"""
+    cache_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'cache')
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, 'translation_cache.db')
+
+
+class TranslationCache:
+    def __init__(self, db_path=None, memory_size=2048, max_entries=50000, max_age_days=30):
+        """初始化翻译缓存
+
+        Args:
+            db_path: SQLite 数据库路径，为 None 时使用默认路径
+            memory_size: 内存 LRU 层最多保存的条目数
+            max_entries: 持久层最多保存的条目数，超出后淘汰最久未使用的条目
+            max_age_days: 持久层条目的最长保存天数
+        """
+        self.db_path = db_path or default_cache_path()
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self._writes_since_evict = 0
+
+        self._memory = OrderedDict()  # 键 -> (译文, 写入时间)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS translations (
+                source_text TEXT NOT NULL,
+                source_lang TEXT NOT NULL,
+                target_lang TEXT NOT NULL,
+                engine TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (source_text, source_lang, target_lang, engine)
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations (last_used)")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS daily_usage (
+                day TEXT PRIMARY KEY,
+                chars INTEGER NOT NULL
+            )
+        """)
+        self._db.commit()
+        self.evict()
+        logger.info(f"Translation cache opened at {self.db_path}")
+
+    def get_many(self, texts, source_lang, target_lang, engine, count=True):
+        """批量查询缓存
+
+        Args:
+            texts: 原文列表
+            source_lang: 源语言
+            target_lang: 目标语言
+            engine: 翻译引擎名称
+            count: 是否计入命中率统计，后台预取的查询不计入
+
+        Returns:
+            命中条目的 {原文: 译文} 字典
+        """
+        found = {}
+        pending = []
+        now = time.time()
+        with self._lock:
+            for text in dict.fromkeys(texts):
+                key = (text, source_lang, target_lang, engine)
+                entry = self._memory.get(key)
+                if entry is not None and now - entry[1] > self.max_age:
+                    # 与持久层相同按保存时长过期
+                    del self._memory[key]
+                    entry = None
+                if entry is not None:
+                    self._memory.move_to_end(key)
+                    found[text] = entry[0]
+                else:
+                    pending.append(text)
+
+            if pending:
+                for text in pending:
+                    row = self._db.execute(
+                        "SELECT translation, created_at FROM translations "
+                        "WHERE source_text = ? AND source_lang = ? AND target_lang = ? AND engine = ?",
+                        (text, source_lang, target_lang, engine)).fetchone()
+                    if row is None or now - row[1] > self.max_age:
+                        continue
+                    found[text] = row[0]
+                    self._remember((text, source_lang, target_lang, engine), row[0], row[1])
+                self._db.executemany(
+                    "UPDATE translations SET last_used = ? "
+                    "WHERE source_text = ? AND source_lang = ? AND target_lang = ? AND engine = ?",
+                    [(now, text, source_lang, target_lang, engine) for text in pending if text in found])
+                self._db.commit()
+
+            if count:
+                hits = sum(1 for text in texts if text in found)
+                self.hits += hits
+                self.misses += len(texts) - hits
+                CACHE_LOOKUPS.inc(hits, result="hit")
+                CACHE_LOOKUPS.inc(len(texts) - hits, result="miss")
+        return found
+
+    def put_many(self, entries, source_lang, target_lang, engine):
+        """批量写入缓存
+
+        Args:
+            entries: {原文: 译文} 字典
+            source_lang: 源语言
+            target_lang: 目标语言
+            engine: 翻译引擎名称
+        """
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            for text, translation in entries.items():
+                self._remember((text, source_lang, target_lang, engine), translation, now)
+            self._db.executemany(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(text, source_lang, target_lang, engine, translation, now, now)
+                 for text, translation in entries.items()])
+            self._db.commit()
+            self._writes_since_evict += len(entries)
+            should_evict = self._writes_since_evict >= EVICT_INTERVAL
+        if should_evict:
+            self._writes_since_evict = 0
+            self.evict()
+
+    def _remember(self, key, translation, created_at):
+        self._memory[key] = (translation, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def evict(self):
+        """按保存时长和条目上限淘汰持久层中的旧条目"""
+        with self._lock:
+            expired = self._db.execute(
+                "DELETE FROM translations WHERE created_at < ?",
+                (time.time() - self.max_age,)).rowcount
+            overflow = self._db.execute(
+                "DELETE FROM translations WHERE rowid IN ("
+                "SELECT rowid FROM translations ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)).rowcount
+            self._db.commit()
+        if expired or overflow:
+            logger.info(f"Evicted {expired} expired and {overflow} overflow translation cache entries")
+
+    def charge(self, chars, limit=None):
+        """记录当日发往翻译接口的字符数
+
+        Args:
+            chars: 本次字符数，负数表示退还
+            limit: 每日字符预算，超出预算时不记账
+
+        Returns:
+            是否在预算内并已记账
+        """
+        day = time.strftime('%Y-%m-%d')
+        with self._lock:
+            row = self._db.execute("SELECT chars FROM daily_usage WHERE day = ?", (day,)).fetchone()
+            used = row[0] if row else 0
+            if limit is not None and chars > 0 and used + chars > limit:
+                return False
+            self._db.execute("INSERT OR REPLACE INTO daily_usage VALUES (?, ?)", (day, max(0, used + chars)))
+            self._db.execute("DELETE FROM daily_usage WHERE day < date('now', 'localtime', '-30 day')")
+            self._db.commit()
+        return True
+
+    def clear_memory(self):
+        """清空内存层，持久层不受影响"""
+        with self._lock:
+            self._memory.clear()
+
+    def memory_usage(self):
+        """估算内存层占用的字节数"""
+        with self._lock:
+            return sum(sys.getsizeof(key[0]) + sys.getsizeof(translation) + 200
+                       for key, (translation, _) in self._memory.items())
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        """缓存统计信息"""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hit_rate,
+                'memory_entries': len(self._memory),
+                'disk_entries': entries,
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class CachedTranslator:
+    """在翻译器前加一层缓存，全部命中时不发起任何网络请求"""
+
+    def __init__(self, translator, cache):
+        self.translator = translator
+        self.cache = cache
+
+    @property
+    def engine(self):
+        return self.translator.engine
+
+    def translate(self, text, source_lang='en', target_lang='zh'):
+        return self.translate_batch([text], source_lang, target_lang)[0]
+
+    def translate_batch(self, texts, source_lang='en', target_lang='zh'):
+        """批量翻译，仅将未命中缓存的文本交给底层翻译器"""
+        # 空行不计入缓存统计，直接保持为空
+        lines = [text for text in texts if text and text.strip()]
+        cached = self.cache.get_many(lines, source_lang, target_lang, self.engine)
+        missing = [text for text in dict.fromkeys(lines) if text not in cached]
+
+        if missing:
+            translated = self.translator.translate_batch(missing, source_lang, target_lang)
+            fresh = {text: result for text, result in zip(missing, translated) if result}
+            self.cache.put_many(fresh, source_lang, target_lang, self.engine)
+            cached.update(zip(missing, translated))
+
+        logger.info("Translated %d lines, %d sent to %s, cache hit rate %.1f%%",
+                    len(lines), len(missing), self.engine, self.cache.hit_rate * 100)
+        return [cached.get(text, '') for text in texts]
+
+    def prefetch(self, texts, source_lang, target_lang, daily_char_budget, cancel_event=None):
+        """后台预翻译未命中缓存的文本，结果只写入缓存
+
+        Args:
+            texts: 原文列表
+            source_lang: 源语言
+            target_lang: 目标语言
+            daily_char_budget: 预翻译每日可消耗的字符数
+            cancel_event: 取消事件
+
+        Returns:
+            本次新翻译并写入缓存的条数
+        """
+        lines = [text for text in texts if text and text.strip()]
+        cached = self.cache.get_many(lines, source_lang, target_lang, self.engine, count=False)
+        missing = [text for text in dict.fromkeys(lines) if text not in cached]
+        if not missing:
+            return 0
+
+        chars = sum(len(text) for text in missing)
+        if not self.cache.charge(chars, daily_char_budget):
+            logger.info("Skipped speculative translation of %d chars, daily budget exhausted", chars)
+            return 0
+
+        try:
+            translated = self.translator.translate_batch(missing, source_lang, target_lang,
+                                                         cancel_event=cancel_event, background=True)
+        except Exception:
+            self.cache.charge(-chars)
+            raise
+        fresh = {text: result for text, result in zip(missing, translated) if result}
+        self.cache.put_many(fresh, source_lang, target_lang, self.engine)
+        # 取消或失败的行并未真正计费，退还预算
+        unsent = sum(len(text) for text, result in zip(missing, translated) if result is None)
+        if unsent:
+            self.cache.charge(-unsent)
+        logger.info("Speculatively translated %d of %d lines", len(fresh), len(missing))
+        return len(fresh)
+
+    def close(self):
+        self.translator.close()
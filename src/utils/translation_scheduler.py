@@ -0,0 +1,189 @@
+"""
+翻译调度模块
+按令牌桶限制请求速率并发翻译，对限流和临时错误做带抖动的指数退避重试
+"""
+
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.translator import TranslationError
+
+# Initialize logger for this module
+logger = logging.getLogger(__name__)
+
+# 可重试的错误码：限流、后端临时故障、网络错误和无法解析的响应
+RETRYABLE_CODES = {
+    "RequestLimitExceeded",
+    "LimitExceeded",
+    "InternalError",
+    "NetworkError",
+    "InvalidResponse",
+}
+
+# 只与个别行有关的错误码，分片失败时二分定位出错的行；
+# 此外 FailedOperation 下与文本相关的错误码也按行处理
+PER_LINE_CODES = {
+    "UnsupportedOperation.TextTooLong",
+    "FailedOperation.LanguageRecognitionErr",
+}
+
+
+def is_retryable(error):
+    """判断翻译错误是否值得重试"""
+    code = getattr(error, 'code', None) or ''
+    return code in RETRYABLE_CODES or code.split('.')[0] in RETRYABLE_CODES
+
+
+def is_per_line(error):
+    """判断翻译错误是否只由分片中的个别行引起"""
+    code = getattr(error, 'code', None) or ''
+    category, _, detail = code.partition('.')
+    return code in PER_LINE_CODES or (category == "FailedOperation" and "Text" in detail)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        """初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数，即允许的 QPS
+            capacity: 桶容量，即允许的突发请求数，默认等于 rate
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """取出一个令牌，令牌不足时阻塞等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class TranslationScheduler:
+    """将翻译请求分片后并发发送，单个分片失败不影响其他行"""
+
+    def __init__(self, translator, qps=5, concurrency=4, chunk_lines=20,
+                 max_retries=3, base_delay=0.5, max_delay=8.0):
+        """初始化翻译调度器
+
+        Args:
+            translator: 底层翻译器，需提供 translate_batch
+            qps: 每秒最多发出的请求数
+            concurrency: 同时进行的请求数上限
+            chunk_lines: 每个分片的行数，分片之间并发翻译
+            max_retries: 可重试错误的最大重试次数
+            base_delay: 退避的基础等待时间（秒）
+            max_delay: 单次退避的最长等待时间（秒）
+        """
+        self.translator = translator
+        self.chunk_lines = chunk_lines
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.bucket = TokenBucket(qps)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency,
+                                           thread_name_prefix='translation')
+
+    @property
+    def engine(self):
+        return self.translator.engine
+
+    def translate(self, text, source_lang='en', target_lang='zh'):
+        return self.translate_batch([text], source_lang, target_lang)[0]
+
+    def translate_batch(self, texts, source_lang='en', target_lang='zh',
+                        cancel_event=None, background=False):
+        """并发翻译全部文本
+
+        Args:
+            texts: 待翻译文本列表
+            source_lang: 源语言
+            target_lang: 目标语言
+            cancel_event: 取消事件，置位后尚未发出的分片不再翻译
+            background: 为 True 时在调用线程中逐个分片翻译，不占用并发线程池，
+                让出配额给用户主动发起的翻译
+
+        Returns:
+            与 texts 一一对应的译文列表，翻译失败的行为 None；
+            全部失败时抛出最后一个错误
+        """
+        results = [None] * len(texts)
+        # 鉴权、计费、参数等与具体行无关的错误出现后，其余分片不再发送
+        abort_event = threading.Event()
+        chunks = [(start, texts[start:start + self.chunk_lines])
+                  for start in range(0, len(texts), self.chunk_lines)]
+        if background:
+            outcomes = ((start, self._translate_partial(chunk, source_lang, target_lang,
+                                                        cancel_event, abort_event))
+                        for start, chunk in chunks)
+        else:
+            futures = [(start, self.executor.submit(
+                self._translate_partial, chunk, source_lang, target_lang, cancel_event, abort_event))
+                for start, chunk in chunks]
+            outcomes = ((start, future.result()) for start, future in futures)
+
+        errors = []
+        for start, (translated, error) in outcomes:
+            results[start:start + len(translated)] = translated
+            if error is not None:
+                errors.append(error)
+
+        if errors and all(result is None for result, text in zip(results, texts) if text):
+            raise errors[-1]
+        return results
+
+    def _translate_partial(self, chunk, source_lang, target_lang, cancel_event=None, abort_event=None):
+        """翻译一个分片，因个别行失败时二分定位出错的行，其余行照常返回
+
+        Returns:
+            (译文列表，失败或已取消的行为 None, 最后一个错误)
+        """
+        if any(event is not None and event.is_set() for event in (cancel_event, abort_event)):
+            return [None] * len(chunk), None
+        try:
+            return self._translate_chunk(chunk, source_lang, target_lang), None
+        except TranslationError as e:
+            if len(chunk) == 1 or not is_per_line(e):
+                logger.error("Translation of %d lines failed: %s", len(chunk), e)
+                if abort_event is not None and not is_retryable(e) and not is_per_line(e):
+                    abort_event.set()
+                return [None] * len(chunk), e
+            middle = len(chunk) // 2
+            head, head_error = self._translate_partial(chunk[:middle], source_lang, target_lang,
+                                                       cancel_event, abort_event)
+            tail, tail_error = self._translate_partial(chunk[middle:], source_lang, target_lang,
+                                                       cancel_event, abort_event)
+            return head + tail, tail_error or head_error
+
+    def _translate_chunk(self, chunk, source_lang, target_lang):
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                return self.translator.translate_batch(chunk, source_lang, target_lang)
+            except TranslationError as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                # 全抖动指数退避，避免多个分片同时重试
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                attempt += 1
+                logger.warning("Retrying translation (%d/%d) after %.2fs: %s",
+                               attempt, self.max_retries, delay, e.code)
+                time.sleep(delay)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.translator.close()
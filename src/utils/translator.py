@@ -1,97 +1,294 @@
 # -*- coding: utf-8 -*-
-import hashlib
-import hmac
+import abc
 import json
-import time
-from datetime import datetime
-from http.client import HTTPSConnection
+import queue
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
 
-class TencentTranslator:
-    def __init__(self, secret_id, secret_key):
+from src.utils.metrics import TRANSLATION_BYTES, TRANSLATION_REQUESTS
+from src.utils.tc3_signer import TC3Signer
+
+# 已注册的翻译后端：名称 -> 翻译器类
+TRANSLATOR_BACKENDS = {}
+
+
+def register_translator(name):
+    """注册翻译后端的类装饰器，名称同时作为翻译缓存中的引擎标识"""
+    def decorator(cls):
+        cls.engine = name
+        TRANSLATOR_BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def create_translator(engine, settings):
+    """按名称创建翻译后端
+
+    Args:
+        engine: 后端名称，如 tencent、standin
+        settings: 翻译配置，包含密钥以及各后端自己的配置分组
+
+    Returns:
+        翻译器实例
+    """
+    if engine not in TRANSLATOR_BACKENDS:
+        raise ValueError(f"Unknown translation engine: {engine}")
+    return TRANSLATOR_BACKENDS[engine].from_settings(settings)
+
+
+class TranslationError(Exception):
+    """翻译失败，code 为接口返回的错误码，网络错误时为 NetworkError"""
+
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+
+class BaseTranslator(abc.ABC):
+    """翻译后端接口"""
+
+    engine = None
+    # 是否需要在设置中填写 SecretId/SecretKey
+    requires_credentials = True
+
+    @classmethod
+    @abc.abstractmethod
+    def from_settings(cls, settings):
+        """按翻译配置创建翻译器"""
+
+    def translate(self, text, source_lang='en', target_lang='zh'):
+        return self.translate_batch([text], source_lang, target_lang)[0]
+
+    @abc.abstractmethod
+    def translate_batch(self, texts, source_lang='en', target_lang='zh'):
+        """批量翻译，返回与 texts 一一对应的译文列表，失败时抛出 TranslationError"""
+
+    def close(self):
+        pass
+
+
+@register_translator("tencent")
+class TencentTranslator(BaseTranslator):
+    # TextTranslateBatch 单次请求的文本条数与字符总数上限
+    MAX_BATCH_SIZE = 100
+    MAX_BATCH_CHARS = 6000
+
+    def __init__(self, secret_id, secret_key, host=None, port=None,
+                 ssl_context=None, pool_size=4, timeout=10):
+        """初始化翻译器
+
+        Args:
+            secret_id: 腾讯云 SecretId
+            secret_key: 腾讯云 SecretKey
+            host: 接口域名，默认为腾讯云 TMT 域名，可指向本地桩服务用于压测
+            port: 接口端口，默认 443
+            ssl_context: 自定义 SSL 上下文，例如信任本地自签名证书
+            pool_size: 保持的空闲长连接数量，为 0 时每次请求新建连接
+            timeout: 单次请求超时时间（秒）
+        """
         self.secret_id = secret_id
         self.secret_key = secret_key
         self.service = "tmt"
-        self.host = "tmt.tencentcloudapi.com"
+        self.host = host or "tmt.tencentcloudapi.com"
+        self.port = port
+        self.ssl_context = ssl_context
+        self.timeout = timeout
         self.version = "2018-03-21"
         self.region = "ap-beijing"
-        self.action = "TextTranslate"
         self.algorithm = "TC3-HMAC-SHA256"
+        # 签名器缓存当日派生密钥与各接口的固定签名片段
+        self.signer = TC3Signer(secret_id, secret_key, self.service, self.host,
+                                self.version, self.region, self.algorithm)
+        # 空闲长连接池，多个线程可并发取用各自的连接
+        self._pool = queue.LifoQueue(maxsize=pool_size) if pool_size > 0 else None
 
-    def _sign(self, key, msg):
-        return hmac.new(key.encode("utf-8") if isinstance(key, str) else key,
-                       msg.encode("utf-8"), hashlib.sha256).digest()
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(settings.get('secret_id', ''), settings.get('secret_key', ''))
 
     def translate(self, text, source_lang='en', target_lang='zh'):
-        timestamp = int(time.time())
-        date = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d")
-
-        # 准备请求体
-        payload = json.dumps({
+        response = self._request("TextTranslate", {
             "SourceText": text,
             "Source": source_lang,
             "Target": target_lang,
             "ProjectId": 0
         })
+        if "TargetText" in response:
+            return response["TargetText"]
+        raise TranslationError(f"Translation failed: {response}")
 
-        # 构建签名所需信息
-        canonical_headers = (
-            f"content-type:application/json; charset=utf-8\n"
-            f"host:{self.host}\n"
-            f"x-tc-action:{self.action.lower()}\n"
-        )
-        signed_headers = "content-type;host;x-tc-action"
-
-        # 构建规范请求串
-        canonical_request = (
-            "POST\n/\n\n" +
-            canonical_headers + "\n" +
-            signed_headers + "\n" +
-            hashlib.sha256(payload.encode("utf-8")).hexdigest()
-        )
-
-        # 构建待签名字符串
-        credential_scope = f"{date}/{self.service}/tc3_request"
-        string_to_sign = (
-            f"{self.algorithm}\n{timestamp}\n{credential_scope}\n" +
-            hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()
-        )
-
-        # 计算签名
-        secret_date = self._sign(f"TC3{self.secret_key}", date)
-        secret_service = self._sign(secret_date, self.service)
-        secret_signing = self._sign(secret_service, "tc3_request")
-        signature = hmac.new(secret_signing,
-                           string_to_sign.encode("utf-8"),
-                           hashlib.sha256).hexdigest()
-
-        # 构建授权信息
-        authorization = (
-            f"{self.algorithm} Credential={self.secret_id}/{credential_scope}, "
-            f"SignedHeaders={signed_headers}, Signature={signature}"
-        )
-
-        # 发送请求
-        headers = {
-            "Authorization": authorization,
-            "Content-Type": "application/json; charset=utf-8",
-            "Host": self.host,
-            "X-TC-Action": self.action,
-            "X-TC-Timestamp": str(timestamp),
-            "X-TC-Version": self.version,
-            "X-TC-Region": self.region
-        }
+    def translate_batch(self, texts, source_lang='en', target_lang='zh'):
+        """批量翻译，按接口的条数和字符数限制自动分片
 
+        Args:
+            texts: 待翻译文本列表
+            source_lang: 源语言
+            target_lang: 目标语言
+
+        Returns:
+            与 texts 一一对应的译文列表
+        """
+        translated = [''] * len(texts)
+        chunks = self._split_batches(texts)
+        payloads = [self._encode({
+            "SourceTextList": [texts[i] for i in chunk],
+            "Source": source_lang,
+            "Target": target_lang,
+            "ProjectId": 0
+        }) for chunk in chunks]
+        for chunk, payload in zip(chunks, payloads):
+            # 发送前才签名，分片较多时后面的请求也不会超出时间戳的有效期
+            response = self._call(payload, self.signer.sign("TextTranslateBatch", payload))
+            target_list = response.get("TargetTextList")
+            if target_list is None or len(target_list) != len(chunk):
+                raise TranslationError(f"Translation failed: {response}", code="InvalidResponse")
+            for i, target in zip(chunk, target_list):
+                translated[i] = target
+        return translated
+
+    def _split_batches(self, texts):
+        """将非空文本的下标按批量接口限制切分成多个分片"""
+        chunks = []
+        chunk, chunk_chars = [], 0
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                continue  # 空行无需翻译，保持为空字符串
+            if chunk and (len(chunk) >= self.MAX_BATCH_SIZE
+                          or chunk_chars + len(text) > self.MAX_BATCH_CHARS):
+                chunks.append(chunk)
+                chunk, chunk_chars = [], 0
+            chunk.append(i)
+            chunk_chars += len(text)
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _request(self, action, params):
+        """签名并发送一次 TMT 接口请求
+
+        Args:
+            action: 接口名称，如 TextTranslate
+            params: 请求参数
+
+        Returns:
+            响应中的 Response 字段
+        """
+        payload = self._encode(params)
+        return self._call(payload, self.signer.sign(action, payload))
+
+    def _encode(self, params):
+        return json.dumps(params).encode("utf-8")
+
+    def _call(self, payload, headers):
+        """发送已签名的请求并解析响应
+
+        Returns:
+            响应中的 Response 字段
+        """
+        try:
+            result = json.loads(self._post(payload, headers))
+        except TranslationError as e:
+            TRANSLATION_REQUESTS.inc(engine=self.engine, status=e.code)
+            raise
+        except ValueError as e:
+            # 网关等返回的 HTML 错误页，按可重试的错误处理
+            TRANSLATION_REQUESTS.inc(engine=self.engine, status="InvalidResponse")
+            raise TranslationError(f"Translation failed: invalid response ({str(e)})",
+                                   code="InvalidResponse") from e
+
+        if "Response" not in result:
+            TRANSLATION_REQUESTS.inc(engine=self.engine, status="InvalidResponse")
+            raise TranslationError(f"Translation failed: {result}", code="InvalidResponse")
+        if "Error" in result["Response"]:
+            error = result["Response"]["Error"]
+            TRANSLATION_REQUESTS.inc(engine=self.engine, status=error.get("Code"))
+            raise TranslationError(f"Translation failed: {error.get('Message', result)}",
+                                   code=error.get("Code"))
+        TRANSLATION_REQUESTS.inc(engine=self.engine, status="ok")
+        return result["Response"]
+
+    def _post(self, payload, headers):
+        """通过连接池发送 POST 请求，复用的连接失效时自动重连重试一次
+
+        Returns:
+            响应体文本
+        """
+        conn, reused = self._acquire()
         try:
-            conn = HTTPSConnection(self.host)
-            conn.request("POST", "/", payload, headers)
-            response = conn.getresponse()
-            result = json.loads(response.read().decode())
-            
-            if "Response" in result and "TargetText" in result["Response"]:
-                return result["Response"]["TargetText"]
-            else:
-                raise Exception(f"Translation failed: {result}")
+            try:
+                body, reusable = self._send(conn, payload, headers)
+            except (HTTPException, OSError):
+                if not reused:
+                    raise
+                # 服务端可能已关闭空闲连接，换新连接重试一次
+                conn.close()
+                conn = self._new_connection()
+                body, reusable = self._send(conn, payload, headers)
         except Exception as e:
-            raise Exception(f"Translation request failed: {str(e)}")
-        finally:
-            conn.close() 
\ No newline at end of file
+            conn.close()
+            raise TranslationError(f"Translation request failed: {str(e)}", code="NetworkError")
+
+        if reusable:
+            self._release(conn)
+        else:
+            conn.close()
+        return body
+
+    def _send(self, conn, payload, headers):
+        conn.request("POST", "/", payload, headers)
+        response = conn.getresponse()
+        raw = response.read()
+        TRANSLATION_BYTES.inc(len(payload), direction="sent")
+        TRANSLATION_BYTES.inc(len(raw), direction="received")
+        return raw.decode(), not response.will_close
+
+    def _new_connection(self):
+        return HTTPSConnection(self.host, self.port, timeout=self.timeout,
+                               context=self.ssl_context)
+
+    def _acquire(self):
+        """取出一个空闲连接，没有时新建
+
+        Returns:
+            (连接, 是否为复用的连接)
+        """
+        if self._pool is not None:
+            try:
+                return self._pool.get_nowait(), True
+            except queue.Empty:
+                pass
+        return self._new_connection(), False
+
+    def _release(self, conn):
+        if self._pool is None:
+            conn.close()
+            return
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        """关闭连接池中的全部空闲连接"""
+        if self._pool is None:
+            return
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+@register_translator("standin")
+class StandinTranslator(TencentTranslator):
+    """连接本地 TMT 替身服务的翻译器，协议与签名与腾讯云一致，使用明文 HTTP"""
+
+    requires_credentials = False
+
+    @classmethod
+    def from_settings(cls, settings):
+        standin = settings.get('standin') or {}
+        return cls(settings.get('secret_id') or 'standin', settings.get('secret_key') or 'standin',
+                   host=standin.get('host', '127.0.0.1'), port=standin.get('port', 8900))
+
+    def _new_connection(self):
+        return HTTPConnection(self.host, self.port, timeout=self.timeout)
\ No newline at end of file